@@ -0,0 +1,564 @@
+import numpy as np
+import pygame
+
+from fixed_timestep import EPSILON, FixedTimestep
+from frame_profiler import FrameProfiler
+from snake_match import (FPS, BOT_DECISION_INTERVAL, FREEZE_DURATION, BOOST_DURATION, BOOST_MULTIPLIER,
+                         FLASH_FIRST_SPAWN, SNOW_FIRST_SPAWN, SNOW_RESPAWN_DELAY)
+from snake_pathfinding import DIRECTIONS
+from text_cache import shared_cache
+
+# Direction codes are indices into DIRECTIONS (0 up, 1 right, 2 down, 3 left)
+MOVE_TABLE = np.array(DIRECTIONS, dtype=np.int32)
+DIRECTION_CODES = {'UP': 0, 'RIGHT': 1, 'DOWN': 2, 'LEFT': 3}
+UNREACHABLE = np.iinfo(np.int32).max
+
+# Arena settings
+GRID_WIDTH, GRID_HEIGHT = 160, 120  # Cells; at 5 px a cell this fills an 800x600 window
+CELL_PIXELS = 5
+POWERUP_CELLS = 3  # Power-ups cover 3x3 cells, as in the two-player game
+SNOW_RADIUS = 15  # The freeze power-up freezes every other snake within this many cells
+SNAKES_PER_FOOD = 2
+FOOD_SPAWN_TRIES = 8  # Random cells tried for a food before picking among the free ones
+POWERUP_SPAWN_TRIES = 100  # Random spots tried for a power-up before putting it off
+SNAKES_PER_POWERUP = 20
+FLASH, SNOW = 0, 1
+
+# The game rules run at a fixed rate, as in game_loop
+SIM_STEP = 1.0 / 60
+MAX_CATCH_UP_STEPS = 5
+
+# Colors
+BACKGROUND = (0, 0, 0)
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+FLASH_COLOR = (255, 200, 0)
+SNOW_COLOR = (150, 220, 255)
+PLAYER_COLORS = [(255, 0, 0), (0, 0, 255)]  # Humans are red and blue, as in the two-player game
+
+
+class Arena:
+    """Any number of snakes on a large wrapping grid, as struct-of-arrays
+
+    SnakeMatch keeps one SnakeState object per snake and runs every rule
+    once per snake. Here each per-snake field is one NumPy column indexed by
+    snake: heads (N, 2) in cells, direction, score, move tick progress,
+    freeze and boost timers, and the bodies as ring buffers of packed cells
+    (y * grid_width + x) in bodies (N, capacity) with body_start and
+    body_length. step() runs every rule as one array pass over all snakes:
+    bot decisions, freeze expiry, movement, eating, tails, power-up pickup
+    and boost expiry.
+
+    The first `humans` snakes are steered with turn() (through step's
+    inputs); the rest are bots. All bots decide together every
+    BOT_DECISION_INTERVAL from one distance-to-nearest-food field (a
+    multi-source breadth-first search over free cells), so a decision costs
+    the same for 1 bot or 1000.
+
+    Foods and power-ups are indexed in food_at / powerup_at, grids holding
+    the index of the pickup covering each cell (-1 for none), so finding
+    what every head is on is one array lookup. The snow power-up freezes
+    every other snake within SNOW_RADIUS cells of the one that picks it up.
+    As in the two-player game, snakes pass through each other.
+
+    All randomness comes from one seeded numpy Generator.
+    """
+
+    def __init__(self, num_snakes=100, humans=0, grid_width=GRID_WIDTH, grid_height=GRID_HEIGHT,
+                 duration=None, seed=None, food_count=None, powerup_count=None, capacity=64):
+        self.num_snakes = num_snakes
+        self.humans = humans
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.duration = duration  # None plays until the window is closed
+        self.rng = np.random.default_rng(seed)
+        self.time = 0.0
+        self.finished = False
+        self.decision_time = float('-inf')
+        self.profiler = None  # Set to a FrameProfiler to time the phases of step()
+
+        # Per-snake columns
+        n = num_snakes
+        self.heads = np.zeros((n, 2), dtype=np.int32)
+        self.direction = np.zeros(n, dtype=np.int8)
+        self.scores = np.zeros(n, dtype=np.int32)
+        self.speed_boost = np.ones(n)
+        self.move_progress = np.ones(n)  # TickRate progress: moves on the first step
+        self.frozen = np.zeros(n, dtype=bool)
+        self.frozen_start_time = np.zeros(n)
+        self.boost_active = np.zeros(n, dtype=bool)
+        self.boost_start_time = np.zeros(n)
+        self.is_bot = np.arange(n) >= humans
+
+        self.bodies = np.zeros((n, capacity), dtype=np.int32)
+        self.body_start = np.zeros(n, dtype=np.int32)
+        self.body_length = np.zeros(n, dtype=np.int32)
+        self.occupancy = np.zeros((grid_height, grid_width), dtype=np.uint16)
+        self.distance = np.full((grid_height, grid_width), UNREACHABLE, dtype=np.int32)
+        self._frontier = np.zeros((grid_height, grid_width), dtype=bool)
+        self._grown = np.zeros_like(self._frontier)
+        self._visited = np.zeros_like(self._frontier)
+        self._shifted = np.zeros(grid_width * grid_height, dtype=bool)
+        self._visit_counts = np.zeros((grid_height, grid_width), dtype=np.uint16)
+        column = np.arange(grid_width * grid_height) % grid_width
+        self._not_first_column = column != 0
+        self._not_last_column = column != grid_width - 1
+
+        # Pickups
+        if food_count is None:
+            food_count = max(1, n // SNAKES_PER_FOOD)
+        elif food_count > grid_width * grid_height:
+            raise ValueError(f"{food_count} foods do not fit on {grid_width * grid_height} cells")
+        if powerup_count is None:
+            powerup_count = max(2, n // SNAKES_PER_POWERUP)
+        self.food = np.zeros((food_count, 2), dtype=np.int32)
+        self.food_at = np.full((grid_height, grid_width), -1, dtype=np.int32)
+        self.powerup_kind = np.arange(powerup_count) % 2  # Alternating FLASH and SNOW
+        self.powerup_pos = np.zeros((powerup_count, 2), dtype=np.int32)
+        self.powerup_active = np.zeros(powerup_count, dtype=bool)
+        self.powerup_spawn_time = np.where(self.powerup_kind == FLASH, FLASH_FIRST_SPAWN, SNOW_FIRST_SPAWN) * 1.0
+        self.powerup_at = np.full((grid_height, grid_width), -1, dtype=np.int32)
+
+        self._place_snakes()
+        for food in range(food_count):
+            self._spawn_food(food)
+
+    def _place_snakes(self):
+        """Two-block snakes on distinct random cells, heading in random directions"""
+        n = self.num_snakes
+        cells = self.rng.choice(self.grid_width * self.grid_height, n, replace=False)
+        self.heads[:, 0] = cells % self.grid_width
+        self.heads[:, 1] = cells // self.grid_width
+        self.direction[:] = self.rng.integers(0, 4, n)
+        tails = (self.heads - MOVE_TABLE[self.direction]) % (self.grid_width, self.grid_height)
+        self.bodies[:, 0] = tails[:, 1] * self.grid_width + tails[:, 0]
+        self.bodies[:, 1] = cells
+        self.body_length[:] = 2
+        np.add.at(self.occupancy, (tails[:, 1], tails[:, 0]), 1)
+        np.add.at(self.occupancy, (self.heads[:, 1], self.heads[:, 0]), 1)
+
+    def _spawn_food(self, food):
+        """Move a food to a random cell without food"""
+        x, y = self.food[food]
+        if self.food_at[y, x] == food:
+            self.food_at[y, x] = -1
+        # Random cells are tried first, which is cheap while food is sparse;
+        # past that, pick among the free cells (there always is one, as
+        # there are never more foods than cells)
+        for _ in range(FOOD_SPAWN_TRIES):
+            x = self.rng.integers(self.grid_width)
+            y = self.rng.integers(self.grid_height)
+            if self.food_at[y, x] == -1:
+                break
+        else:
+            y, x = divmod(int(self.rng.choice(np.flatnonzero(self.food_at == -1))), self.grid_width)
+        self.food[food] = (x, y)
+        self.food_at[y, x] = food
+
+    def _spawn_powerup(self, powerup, now):
+        """Put a power-up on a random spot clear of the other power-ups
+
+        On a board too crowded to find one, the power-up is tried again
+        SNOW_RESPAWN_DELAY later, as if it had just been picked up, instead
+        of on every step.
+        """
+        size = POWERUP_CELLS
+        for _ in range(POWERUP_SPAWN_TRIES):
+            x = self.rng.integers(self.grid_width - size + 1)
+            y = self.rng.integers(self.grid_height - size + 1)
+            if (self.powerup_at[y:y + size, x:x + size] == -1).all():
+                self.powerup_pos[powerup] = (x, y)
+                self.powerup_at[y:y + size, x:x + size] = powerup
+                self.powerup_active[powerup] = True
+                return
+        self.powerup_spawn_time[powerup] = now + SNOW_RESPAWN_DELAY
+
+    def _despawn_powerups(self, powerups, respawn_time):
+        size = POWERUP_CELLS
+        for powerup in powerups:
+            x, y = self.powerup_pos[powerup]
+            self.powerup_at[y:y + size, x:x + size] = -1
+        self.powerup_active[powerups] = False
+        self.powerup_spawn_time[powerups] = respawn_time
+
+    def _grow(self):
+        """Double the body capacity, unrolling every ring so it starts at 0"""
+        capacity = self.bodies.shape[1]
+        offsets = (self.body_start[:, None] + np.arange(capacity)) % capacity
+        unrolled = np.take_along_axis(self.bodies, offsets, axis=1)
+        self.bodies = np.concatenate([unrolled, np.zeros_like(unrolled)], axis=1)
+        self.body_start[:] = 0
+
+    def body_cells(self):
+        """(owner snake, packed cell) of every body segment, tails first"""
+        capacity = self.bodies.shape[1]
+        offsets = np.arange(capacity)
+        valid = offsets < self.body_length[:, None]
+        cells = np.take_along_axis(self.bodies, (self.body_start[:, None] + offsets) % capacity, axis=1)
+        owners = np.broadcast_to(np.arange(self.num_snakes)[:, None], cells.shape)
+        return owners[valid], cells[valid]
+
+    def turn(self, snake, direction):
+        """Change a snake's direction code, unless it would reverse onto itself"""
+        if direction != (self.direction[snake] + 2) % 4:
+            self.direction[snake] = direction
+
+    def _rebuild_distance(self, heads):
+        """Breadth-first distance from the nearest food over the free cells (wrapping)
+
+        Stops as soon as the wavefront has reached a neighbor of every head
+        in heads: the first neighbor reached is the nearest one, which is
+        all a bot needs, and cells further out are left UNREACHABLE.
+
+        Rather than writing each wavefront's distance (a masked write of the
+        whole grid per step), every step adds the visited mask to a counter;
+        a cell reached in step s is counted steps - s + 1 times, and the
+        distances are worked out from the counts once at the end.
+        """
+        frontier, grown, visited, shifted = self._frontier, self._grown, self._visited, self._shifted
+        counts = self._visit_counts
+        width = self.grid_width
+        blocked = self.occupancy != 0
+        np.copyto(visited, blocked)  # Blocked cells count as visited
+        frontier[:] = False
+        frontier[self.food[:, 1], self.food[:, 0]] = True
+        visited |= frontier
+        counts[:] = visited
+
+        flat_frontier, flat_grown = frontier.ravel(), grown.ravel()
+        pending = heads[:, 1] * width + heads[:, 0]
+        steps = 0
+        while len(pending):
+            # Grow the wavefront by one cell in every direction, wrapping at
+            # the edges. Shifts are done on the flat arrays (contiguous, so
+            # much faster than column slices); a flat shift by one carries
+            # the end of each row into the next, which the column masks
+            # drop before the wrapped columns are added
+            flat_grown[width:] = flat_frontier[:-width]
+            flat_grown[:width] = flat_frontier[-width:]
+            flat_grown[:-width] |= flat_frontier[width:]
+            flat_grown[-width:] |= flat_frontier[:width]
+            shifted[1:] = flat_frontier[:-1]
+            shifted &= self._not_first_column
+            flat_grown |= shifted
+            shifted[:-1] = flat_frontier[1:]
+            shifted &= self._not_last_column
+            flat_grown |= shifted
+            grown[:, 0] |= frontier[:, -1]
+            grown[:, -1] |= frontier[:, 0]
+
+            pending = pending[~flat_grown[pending]]
+            np.greater(grown, visited, out=grown)  # grown and not visited
+            if not grown.any():
+                break
+            visited |= grown
+            np.add(counts, visited, out=counts, casting='unsafe')
+            steps += 1
+            frontier, grown = grown, frontier
+            flat_frontier, flat_grown = flat_grown, flat_frontier
+
+        distance = self.distance
+        np.subtract(steps + 1, counts, out=distance, casting='unsafe')
+        distance[counts == 0] = UNREACHABLE
+        distance[blocked & (self.food_at < 0)] = UNREACHABLE
+
+    def decide_bots(self):
+        """Turn every unfrozen bot toward its nearest food, all in one pass"""
+        bots = np.nonzero(self.is_bot & ~self.frozen)[0]
+        if not len(bots):
+            return
+        heads = self.heads[bots]
+        self._rebuild_distance(heads)
+
+        # Distances of the four neighbors of every bot head, never backwards
+        nx = (heads[:, 0, None] + MOVE_TABLE[:, 0]) % self.grid_width
+        ny = (heads[:, 1, None] + MOVE_TABLE[:, 1]) % self.grid_height
+        distance = self.distance[ny, nx]
+        rows = np.arange(len(bots))
+        backwards = (self.direction[bots] + 2) % 4
+        distance[rows, backwards] = UNREACHABLE
+        best = np.argmin(distance, axis=1)
+
+        # Cut off from every food: a random free direction, if there is one
+        stuck = distance[rows, best] == UNREACHABLE
+        if stuck.any():
+            options = self.occupancy[ny[stuck], nx[stuck]] == 0
+            options[np.arange(int(stuck.sum())), backwards[stuck]] = False
+            choice = np.argmax(self.rng.random(options.shape) * options, axis=1)
+            best[stuck] = np.where(options.any(axis=1), choice, self.direction[bots[stuck]])
+        self.direction[bots] = best
+
+    def step(self, dt, inputs=()):
+        """Advance the arena by dt seconds
+
+        inputs is a sequence of (snake index, direction code) for the human
+        snakes. Returns a bool array of which snakes ate food this step.
+        """
+        self.time += dt
+        now = self.time
+        profiler = self.profiler
+
+        for snake, direction in inputs:
+            self.turn(snake, direction)
+
+        # Bot decision making, for all bots at once
+        if now - self.decision_time > BOT_DECISION_INTERVAL:
+            self.decide_bots()
+            self.decision_time = now
+        if profiler is not None:
+            profiler.mark('bot')
+
+        # Check which snakes are frozen and update frozen status
+        self.frozen &= ~(now - self.frozen_start_time > FREEZE_DURATION)
+
+        # Move snakes based on their individual tick rates, if not frozen
+        ticking = ~self.frozen
+        moving = ticking & (self.move_progress + EPSILON >= 1.0)
+        self.move_progress[moving] -= 1.0
+        self.move_progress[ticking] = np.minimum(self.move_progress[ticking] + dt * (FPS * self.speed_boost[ticking]), 2.0)
+        movers = np.nonzero(moving)[0]
+        ate = np.zeros(self.num_snakes, dtype=bool)
+        if len(movers):
+            heads = (self.heads[movers] + MOVE_TABLE[self.direction[movers]]) % (self.grid_width, self.grid_height)
+            self.heads[movers] = heads
+            hx, hy = heads[:, 0], heads[:, 1]
+
+            if (self.body_length[movers] >= self.bodies.shape[1]).any():
+                self._grow()
+            capacity = self.bodies.shape[1]
+
+            # Push the new heads
+            slot = (self.body_start[movers] + self.body_length[movers]) % capacity
+            self.bodies[movers, slot] = hy * self.grid_width + hx
+            self.body_length[movers] += 1
+            np.add.at(self.occupancy, (hy, hx), 1)
+
+            # Food under the new heads (several snakes can eat the same food in the same step)
+            food = self.food_at[hy, hx]
+            eats = food >= 0
+            ate[movers[eats]] = True
+            self.scores[movers[eats]] += 1
+
+            # Everyone else drops their tail
+            tails = movers[~eats]
+            tail = self.bodies[tails, self.body_start[tails]]
+            self.body_start[tails] = (self.body_start[tails] + 1) % capacity
+            self.body_length[tails] -= 1
+            np.subtract.at(self.occupancy, (tail // self.grid_width, tail % self.grid_width), 1)
+
+            # Respawn eaten food
+            for eaten in np.unique(food[eats]):
+                self._spawn_food(eaten)
+        if profiler is not None:
+            profiler.mark('movement')
+
+        # Spawn power-ups whose time has come
+        for powerup in np.nonzero(~self.powerup_active & (now > self.powerup_spawn_time))[0]:
+            self._spawn_powerup(powerup, now)
+
+        # Power-ups under the heads; the lowest snake index on one gets it
+        touched = self.powerup_at[self.heads[:, 1], self.heads[:, 0]]
+        touching = np.nonzero(touched >= 0)[0]
+        if len(touching):
+            powerups, first = np.unique(touched[touching], return_index=True)
+            collectors = touching[first]
+            flash = self.powerup_kind[powerups] == FLASH
+
+            # Flash: speed boost for the collector
+            boosted = collectors[flash]
+            self.boost_active[boosted] = True
+            self.boost_start_time[boosted] = now
+            self.speed_boost[boosted] = BOOST_MULTIPLIER
+
+            # Snow: freeze every other snake near the collector
+            freezers = collectors[~flash]
+            if len(freezers):
+                offset = np.abs(self.heads[None, :, :] - self.heads[freezers, None, :])
+                offset = np.minimum(offset, (self.grid_width, self.grid_height) - offset)  # Wrapping distance
+                near = (offset.max(axis=2) <= SNOW_RADIUS).any(axis=0)
+                near[freezers] = False
+                self.frozen |= near
+                self.frozen_start_time[near] = now
+
+            self._despawn_powerups(powerups, now + SNOW_RESPAWN_DELAY)
+
+        # End power-up effects after 5 seconds
+        ended = self.boost_active & (now - self.boost_start_time > BOOST_DURATION)
+        self.boost_active &= ~ended
+        self.speed_boost[ended] = 1.0
+
+        # Check game duration
+        if self.duration is not None and now >= self.duration:
+            self.finished = True
+        if profiler is not None:
+            profiler.mark('power-ups')
+
+        return ate
+
+
+def snake_colors(num_snakes, humans):
+    """Red and blue for the humans, hues spread around the wheel for the bots"""
+    colors = []
+    for snake in range(num_snakes):
+        if snake < humans and snake < len(PLAYER_COLORS):
+            colors.append(PLAYER_COLORS[snake])
+        else:
+            color = pygame.Color(0)
+            color.hsva = ((snake * 137.5) % 360, 70, 90, 100)
+            colors.append(tuple(color)[:3])
+    return colors
+
+
+class ArenaRenderer:
+    """Draws the whole arena as one image, whatever the number of snakes
+
+    Every cell's color is written into a (grid_height, grid_width) array of
+    mapped pixel values in a few array assignments (power-ups, food, all
+    body segments, heads), copied to a one-pixel-per-cell surface with
+    surfarray.blit_array, and scaled onto the screen. The cost depends on
+    the grid size, not on how many snakes or segments there are.
+    """
+
+    def __init__(self, screen, arena):
+        self.screen = screen
+        self.arena = arena
+        self.small = pygame.Surface((arena.grid_width, arena.grid_height), 0, screen)
+        self.grid = np.zeros((arena.grid_height, arena.grid_width), dtype=np.uint32)
+        self.background = self.small.map_rgb(BACKGROUND)
+        self.head = self.small.map_rgb(WHITE)
+        self.food = self.small.map_rgb(GREEN)
+        self.powerups = np.array([self.small.map_rgb(FLASH_COLOR), self.small.map_rgb(SNOW_COLOR)], dtype=np.uint32)
+        self.snakes = np.array([self.small.map_rgb(color) for color in snake_colors(arena.num_snakes, arena.humans)],
+                               dtype=np.uint32)
+
+    def draw(self):
+        arena = self.arena
+        grid = self.grid
+        grid.fill(self.background)
+
+        covered = arena.powerup_at >= 0
+        grid[covered] = self.powerups[arena.powerup_kind[arena.powerup_at[covered]]]
+        grid[arena.food[:, 1], arena.food[:, 0]] = self.food
+        owners, cells = arena.body_cells()
+        grid.flat[cells] = self.snakes[owners]
+        grid[arena.heads[:, 1], arena.heads[:, 0]] = self.head
+
+        pygame.surfarray.blit_array(self.small, grid.T)
+        pygame.transform.scale(self.small, self.screen.get_size(), self.screen)
+
+
+def run_arena(bots=100, humans=1, duration=None, seed=None, profile=False):
+    """Play an arena in a window: WASD (and arrow keys for a second human), Esc quits"""
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((GRID_WIDTH * CELL_PIXELS, GRID_HEIGHT * CELL_PIXELS))
+    pygame.display.set_caption("Python Chaser Arena")
+    clock = pygame.time.Clock()
+    font = pygame.font.Font(None, 24)
+
+    arena = Arena(bots + humans, humans, duration=duration, seed=seed)
+    renderer = ArenaRenderer(screen, arena)
+    timestep = FixedTimestep(SIM_STEP, MAX_CATCH_UP_STEPS)
+    profiler = FrameProfiler(profile)
+    arena.profiler = profiler
+    keys = [{pygame.K_w: 'UP', pygame.K_s: 'DOWN', pygame.K_a: 'LEFT', pygame.K_d: 'RIGHT'},
+            {pygame.K_UP: 'UP', pygame.K_DOWN: 'DOWN', pygame.K_LEFT: 'LEFT', pygame.K_RIGHT: 'RIGHT'}]
+    inputs = []
+    running = True
+
+    while running:
+        profiler.begin_frame()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_F3:
+                    profiler.toggle()
+                elif event.key == pygame.K_F4 and profiler.frames:
+                    print(f"Frame profile written to {profiler.dump_csv()}")
+                for snake, controls in enumerate(keys[:humans]):
+                    if event.key in controls:
+                        inputs.append((snake, DIRECTION_CODES[controls[event.key]]))
+        profiler.mark('events')
+
+        for _ in range(timestep.advance()):
+            arena.step(SIM_STEP, inputs)
+            inputs = []
+            if arena.finished:
+                running = False
+                break
+
+        renderer.draw()
+
+        # Leaderboard and frame rate
+        leaders = np.argsort(-arena.scores, kind='stable')[:5]
+        for rank, snake in enumerate(leaders):
+            name = f"Player {snake + 1}" if snake < humans else f"Bot {snake - humans + 1}"
+            screen.blit(shared_cache.render(font, f"{rank + 1}. {name}: {arena.scores[snake]}", WHITE), (10, 10 + 20 * rank))
+        screen.blit(shared_cache.render(font, f"{clock.get_fps():.0f} fps", WHITE), (screen.get_width() - 70, 10))
+        if profiler.enabled:
+            _, rect, overlay = profiler.overlay_item(screen.get_width() - 220, 35)
+            screen.blit(overlay, rect)
+        profiler.mark('draw')
+
+        pygame.display.flip()
+        profiler.mark('display.update')
+        clock.tick(60)
+
+    pygame.quit()
+    return arena
+
+
+def benchmark(bots, frames=600, seed=0):
+    """Mean and worst simulation and render milliseconds per 60 Hz frame"""
+    import os
+    import time
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.display.init()
+    screen = pygame.display.set_mode((GRID_WIDTH * CELL_PIXELS, GRID_HEIGHT * CELL_PIXELS))
+    arena = Arena(bots, 0, seed=seed)
+    renderer = ArenaRenderer(screen, arena)
+    simulate, render = [], []
+    for _ in range(frames):
+        start = time.perf_counter()
+        arena.step(SIM_STEP)
+        drawn = time.perf_counter()
+        renderer.draw()
+        pygame.display.flip()
+        simulate.append(drawn - start)
+        render.append(time.perf_counter() - drawn)
+    pygame.quit()
+    total = sorted(s + r for s, r in zip(simulate, render))
+    return {
+        'simulate_ms': 1000 * sum(simulate) / frames,
+        'render_ms': 1000 * sum(render) / frames,
+        'p99_ms': 1000 * total[int(0.99 * frames)],
+        'max_ms': 1000 * total[-1],
+        'segments': int(arena.body_length.sum())
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Many-snake arena")
+    parser.add_argument("--bots", type=int, default=100)
+    parser.add_argument("--humans", type=int, default=1, choices=[0, 1, 2])
+    parser.add_argument("--seconds", type=float, help="end the arena after this long")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--profile", action="store_true", help="start with the frame profiler overlay (F3)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="time 10 s of simulation and rendering per bot count, headless")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print(f"{'bots':>6}{'sim ms':>9}{'draw ms':>9}{'p99 ms':>9}{'max ms':>9}{'segments':>10}")
+        for bots in (10, 100, 300, 1000):
+            result = benchmark(bots)
+            print(f"{bots:>6}{result['simulate_ms']:>9.3f}{result['render_ms']:>9.3f}"
+                  f"{result['p99_ms']:>9.3f}{result['max_ms']:>9.3f}{result['segments']:>10}")
+    else:
+        run_arena(args.bots, args.humans, args.seconds, args.seed, args.profile)
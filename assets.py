@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pygame
+
+
+class AssetManager:
+    """Loads the game's images and sounds in a background thread
+
+    start() decodes the files on a worker thread, in the order given, while
+    the main thread is already drawing the intro screen. image(name, size)
+    waits for just that file if it is not loaded yet, then converts it to
+    the display format (convert_alpha for images with transparency) and
+    scales it, once per size: every variant is cached, so blits never pay
+    for pixel format conversion or rescaling.
+
+    Files that fail to load are reported once and come back as None.
+    timings records how long every load and variant took; see report().
+    """
+
+    def __init__(self):
+        self.raw = {}  # name -> loaded Surface or Sound, None if it failed
+        self.ready = {}  # name -> threading.Event set once the load finished
+        self.variants = {}  # (name, size) -> converted and scaled Surface
+        self.timings = {}  # what -> seconds
+        self.threads = []
+
+    def start(self, images=(), sounds=()):
+        """Begin loading in the background; names are loaded in order
+
+        Can be called again to queue more files on another thread (sounds
+        can only be decoded once the mixer is initialized).
+        """
+        jobs = [(name, pygame.image.load) for name in images] + [(name, pygame.mixer.Sound) for name in sounds]
+        for name, _ in jobs:
+            self.ready[name] = threading.Event()
+        thread = threading.Thread(target=self._load_all, args=(jobs, time.perf_counter()), daemon=True)
+        self.threads.append(thread)
+        thread.start()
+
+    def _load_all(self, jobs, started):
+        for name, load in jobs:
+            start = time.perf_counter()
+            try:
+                self.raw[name] = load(name)
+            except Exception:  # Missing file, unsupported format, no audio device...
+                print(f"Warning: Could not load file '{name}'")
+                self.raw[name] = None
+            self.timings[f"load {name}"] = time.perf_counter() - start
+            self.ready[name].set()
+        self.timings[f"background total ({', '.join(name for name, _ in jobs)})"] = time.perf_counter() - started
+
+    def _get(self, name):
+        if name not in self.ready:
+            raise KeyError(f"asset '{name}' was never queued")
+        event = self.ready[name]
+        if not event.is_set():
+            start = time.perf_counter()
+            event.wait()
+            self.timings[f"waited for {name}"] = time.perf_counter() - start
+        return self.raw[name]
+
+    def image(self, name, size=None):
+        """The image in display format, scaled to size (cached), or None"""
+        key = (name, size)
+        if key in self.variants:
+            return self.variants[key]
+        # Scaled variants are made from the converted full-size image
+        surface = self._get(name) if size is None else self.image(name)
+        if surface is not None:
+            start = time.perf_counter()
+            if size is not None:
+                surface = pygame.transform.scale(surface, size)
+            elif surface.get_flags() & pygame.SRCALPHA:
+                surface = surface.convert_alpha()
+            else:
+                surface = surface.convert()
+            self.timings[f"variant {name} {size}"] = time.perf_counter() - start
+        self.variants[key] = surface
+        return surface
+
+    def sound(self, name):
+        """The loaded Sound, or None"""
+        return self._get(name)
+
+    def wait(self):
+        """Block until everything queued is loaded"""
+        for thread in self.threads:
+            thread.join()
+
+    def report(self):
+        """Load timings in milliseconds, one per line"""
+        return "\n".join(f"{what:<60}{1000 * seconds:8.2f} ms" for what, seconds in self.timings.items())
+
+
+if __name__ == "__main__":
+    import os
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    pygame.display.set_mode((800, 600))
+
+    # Load the game's assets and every variant it draws
+    assets = AssetManager()
+    assets.start(images=["rsu_logo.png", "flash.png", "snow.jpg"], sounds=["pop.mp3"])
+    assets.image("rsu_logo.png", (140, 200))
+    assets.image("flash.png", (60, 60))
+    assets.image("flash.png", (32, 32))
+    assets.image("snow.jpg", (40, 40))
+    assets.image("snow.jpg", (32, 32))
+    assets.sound("pop.mp3")
+    assets.wait()
+    print(assets.report())
+    pygame.quit()
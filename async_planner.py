@@ -0,0 +1,300 @@
+import atexit
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from snake_pathfinding import (SNAKE_SIZE, DIRECTIONS, OccupancyGrid, SearchGrid, find_path, get_search_grid,
+                               merge_search_stats, random_free_move)
+
+# Each worker thread (or process) searches on its own grid, built there
+_worker = threading.local()
+
+_executors = {}
+
+
+def shared_executor(kind="process"):
+    """The pool every AsyncPlanner of that kind submits to, started on first use
+
+    "process" runs the search in a separate interpreter, at the cost of
+    pickling every snapshot; "thread" keeps it in this process, where it
+    holds the GIL while it runs, so a frame that lands on a search can take
+    longer than if it had searched itself.
+    """
+    executor = _executors.get(kind)
+    if executor is None:
+        if kind == "process":
+            executor = ProcessPoolExecutor(max_workers=1)
+            executor.submit(int).result()  # Start the worker now, not on a frame's first search
+        else:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bot-planner")
+        if not _executors:
+            atexit.register(shutdown_executors)  # The games never stop the pools themselves
+        _executors[kind] = executor
+    return executor
+
+
+def shutdown_executors():
+    """Stop the shared pools, cancelling searches that have not started
+
+    A process pool is waited for (a search takes milliseconds): left running,
+    its management thread fails at interpreter exit. Registered with atexit
+    when the first pool starts, so the games need not call it.
+    """
+    for kind, executor in _executors.items():
+        executor.shutdown(wait=kind == "process", cancel_futures=True)
+    _executors.clear()
+
+
+def plan_path(grid_width, grid_height, wrap, blocked, start, goal, tick):
+    """Worker side: A* over an occupancy snapshot
+
+    Returns (tick, start, goal, path, search seconds, search stats) with
+    path as from find_path (goal first, next step last), or None if the goal
+    is cut off. The search is counted in its own stats dict, for the planner
+    to merge when it collects the result: nothing the main thread uses (the
+    module's search_stats, get_search_grid's cache) is touched here.
+    """
+    grids = getattr(_worker, 'grids', None)
+    if grids is None:
+        grids = _worker.grids = {}
+    key = (grid_width, grid_height, wrap)
+    grid = grids.get(key)
+    if grid is None:
+        grid = grids[key] = SearchGrid(grid_width, grid_height, wrap)
+    stats = {'searches': 0, 'expansions': 0, 'last_expansions': 0}
+    started = time.perf_counter()
+    path = find_path(grid, start, goal, blocked, stats)
+    return tick, start, goal, path, time.perf_counter() - started, stats
+
+
+class AsyncPlanner:
+    """Bot that searches off the main thread and never waits for the result
+
+    When it needs a path (no plan, the food moved or the plan was cut) it
+    submits a snapshot of the occupancy counts, the food cell and the cell
+    its head will be in after this decision's move to a worker pool, tagged
+    with the decision number. next_move only checks whether that search is
+    done; until then the snake keeps its heading (or dodges randomly when
+    that cell is taken).
+
+    A finished path is only applied if it still fits the board: the food
+    has not moved, the head is on the path, and the next cell on it is free.
+    Anything else is counted as stale and searched again. The plan is then
+    followed like BotPlanner's, and dropped as soon as a cell on it is taken.
+
+    Which moves it makes depends on how fast the worker is, so matches with
+    it are not deterministic; MatchLog records its turns as key presses
+    instead (deterministic = False). Latency (submit to result), how many
+    decisions old results are when collected and the stale rate are in
+    stats and report(). Searches count in snake_pathfinding.search_stats
+    when their result is collected, whichever pool ran them.
+    """
+
+    deterministic = False
+
+    def __init__(self, grid_width, grid_height, wrap=False, occupancy=None, rng=random, executor=None,
+                 clock=time.perf_counter):
+        # Own random source, seeded from the state of the given one without
+        # drawing from it: that would change the match's food and power-ups,
+        # and a replay, which has no bot in this snake, would not draw
+        self.rng = random.Random(hash(rng.getstate()))
+        self.grid = get_search_grid(grid_width, grid_height, wrap)  # tables only, never searched here
+        if occupancy is None:
+            occupancy = OccupancyGrid(grid_width, grid_height)
+        self.occupancy = occupancy
+        self.blocked = occupancy.counts  # read directly, copied into each snapshot
+        self.executor = executor if executor is not None else shared_executor()
+        self.clock = clock
+        self.pending = None  # [future, submit time, done time] of the search in flight
+        self.plan = []  # remaining cells, goal first and next step last
+        self.goal = None  # food cell the plan leads to
+        self.heading = None  # last move returned
+        self.decisions = 0
+        self.latencies = deque(maxlen=500)  # submit to result seconds of the recent searches
+        self.ages = deque(maxlen=500)  # decisions between submitting and collecting them
+
+        self.stats = {
+            'decisions': 0,
+            'submitted': 0,
+            'applied': 0,
+            'stale': 0,
+            'unreachable': 0,
+            'waiting': 0  # decisions made without a plan while a search was in flight
+        }
+
+    def cell(self, pos):
+        """Cell index of a pixel position"""
+        return self.grid.index(pos[0] // SNAKE_SIZE, pos[1] // SNAKE_SIZE)
+
+    def _submit(self, start, goal):
+        grid = self.grid
+        future = self.executor.submit(plan_path, grid.width, grid.height, grid.wrap, bytes(self.blocked),
+                                      start, goal, self.decisions)
+        pending = [future, self.clock(), None]
+        # Stamped by the worker when it finishes, so latency does not include waiting for the next decision
+        future.add_done_callback(lambda _, pending=pending: pending.__setitem__(2, self.clock()))
+        self.pending = pending
+        self.stats['submitted'] += 1
+
+    def _collect(self, start, goal):
+        """Take the result of the search in flight if it is done; apply it if it is still valid"""
+        future, submitted, done = self.pending
+        if not future.done():
+            return
+        self.pending = None
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.latencies.append((done if done is not None else self.clock()) - submitted)
+        tick, path_start, path_goal, path, _, search_stats = future.result()
+        merge_search_stats(search_stats)
+        self.ages.append(self.decisions - tick)
+        if path is None:
+            self.stats['unreachable'] += 1
+            return
+        if start == goal:
+            return  # Reached the food before the path arrived
+
+        # The snake may have moved on along the path since the snapshot
+        if path_goal != goal:
+            position = None  # the food respawned
+        elif start == path_start:
+            position = len(path)
+        elif start in path:
+            position = path.index(start)
+        else:
+            position = None  # the head is off the path
+        if position is None or self.blocked[path[position - 1]]:
+            self.stats['stale'] += 1
+            return
+        self.stats['applied'] += 1
+        self.plan = path[:position]
+        self.goal = goal
+
+    def _plan_valid(self, start, goal):
+        plan = self.plan
+        while plan and plan[-1] == start:
+            plan.pop()
+        if not plan or goal != self.goal or self.grid.direction_to(start, plan[-1]) is None:
+            return False
+        blocked = self.blocked
+        for cell in plan:
+            if blocked[cell]:
+                return False
+        return True
+
+    def next_move(self, snake_head, food_pos):
+        """Next move for the bot, with the same return contract as find_path_to_food"""
+        self.decisions += 1
+        self.stats['decisions'] += 1
+        grid = self.grid
+        start = self.cell(snake_head)
+        goal = self.cell(food_pos)
+
+        if self.pending is not None:
+            self._collect(start, goal)
+
+        if start == goal:
+            # Already on the food, move in any valid direction
+            self.plan = []
+            for neighbor, d in grid.neighbors[start]:
+                if not self.blocked[neighbor]:
+                    return self._move(start, d)
+            return self._move(start, None)
+
+        if self._plan_valid(start, goal):
+            return self._move(start, grid.direction_to(start, self.plan[-1]))
+
+        self.plan = []
+        if self.pending is not None:
+            self.stats['waiting'] += 1
+        move = self._move(start, self._fallback(start))
+        if self.pending is None:
+            # Search from where this move takes the head, which is where the next decision starts
+            x, y = grid.cell_x[start] + move[0] // SNAKE_SIZE, grid.cell_y[start] + move[1] // SNAKE_SIZE
+            if grid.wrap:
+                x, y = x % grid.width, y % grid.height
+            if 0 <= x < grid.width and 0 <= y < grid.height and grid.index(x, y) != goal:
+                self._submit(grid.index(x, y), goal)
+        return move
+
+    def _fallback(self, start):
+        """Direction index to keep the heading while no plan is ready, None to dodge"""
+        if self.heading is not None:
+            for neighbor, d in self.grid.neighbors[start]:
+                if DIRECTIONS[d] == self.heading and not self.blocked[neighbor]:
+                    return d
+        return None
+
+    def _move(self, start, d):
+        """Move of direction index d, or a random free one for None; remembered as the heading"""
+        if d is None:
+            move = random_free_move(self.grid, start, self.blocked, self.rng)
+        else:
+            move = (DIRECTIONS[d][0] * SNAKE_SIZE, DIRECTIONS[d][1] * SNAKE_SIZE)
+        self.heading = (move[0] // SNAKE_SIZE, move[1] // SNAKE_SIZE)
+        return move
+
+    def report(self):
+        """Search latency (ms) and stale-result rate of the recent searches"""
+        latencies = sorted(self.latencies)
+        results = self.stats['applied'] + self.stats['stale']
+        return {
+            'searches': self.stats['submitted'],
+            'mean_latency_ms': 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            'p95_latency_ms': 1000 * latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else 0.0,
+            'max_latency_ms': 1000 * latencies[-1] if latencies else 0.0,
+            'mean_age': sum(self.ages) / len(self.ages) if self.ages else 0.0,
+            'stale_rate': self.stats['stale'] / results if results else 0.0
+        }
+
+    def overlay_rows(self):
+        """(label, value) rows for the FrameProfiler overlay"""
+        stats = self.report()
+        return [("search latency", f"{stats['mean_latency_ms']:.2f} ms"),
+                ("search p95", f"{stats['p95_latency_ms']:.2f} ms"),
+                ("stale results", f"{100 * stats['stale_rate']:.0f}%")]
+
+
+def async_bot(grid_width, grid_height, occupancy, rng):
+    """SnakeMatch bot factory: an AsyncPlanner on the shared process pool"""
+    return AsyncPlanner(grid_width, grid_height, wrap=True, occupancy=occupancy, rng=rng)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from snake_match import SnakeMatch, search_bot
+
+    parser = argparse.ArgumentParser(description="Frame cost of synchronous and asynchronous bot searches")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per match, played in real time")
+    parser.add_argument("--pool", choices=["thread", "process"], default="process")
+    args = parser.parse_args()
+
+    def pooled_bot(grid_width, grid_height, occupancy, rng):
+        return AsyncPlanner(grid_width, grid_height, wrap=True, occupancy=occupancy, rng=rng,
+                            executor=shared_executor(args.pool))
+
+    # Both snakes driven by the same kind of bot, stepped at 60 Hz in real
+    # time like game_loop, so the worker gets the time between frames
+    for label, bot in (("search_bot", search_bot), (f"async ({args.pool})", pooled_bot)):
+        match = SnakeMatch("PVE", args.duration, 0, bots={0: bot, 1: bot})
+        steps = []
+        deadline = time.perf_counter()
+        while not match.finished:
+            start = time.perf_counter()
+            match.step((), 1.0 / 60)
+            steps.append(time.perf_counter() - start)
+            deadline += 1.0 / 60
+            time.sleep(max(0.0, deadline - time.perf_counter()))
+        steps.sort()
+        print(f"{label:>16}: step p99 {1000 * steps[int(0.99 * len(steps))]:.3f} ms, "
+              f"max {1000 * steps[-1]:.3f} ms, scores {match.scores()}")
+        for snake in match.snakes:
+            if isinstance(snake.planner, AsyncPlanner):
+                stats = snake.planner.report()
+                print(f"{'':>18}{stats['searches']} searches, latency mean {stats['mean_latency_ms']:.2f} ms "
+                      f"p95 {stats['p95_latency_ms']:.2f} ms, {stats['mean_age']:.1f} decisions old, "
+                      f"{100 * stats['stale_rate']:.0f}% stale")
+    shutdown_executors()
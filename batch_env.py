@@ -0,0 +1,258 @@
+import numpy as np
+
+from snake_match import (WIDTH, HEIGHT, FPS, SNAKE_SIZE, FREEZE_DURATION, BOOST_DURATION,
+                         BOOST_MULTIPLIER, FLASH_FIRST_SPAWN, SNOW_FIRST_SPAWN,
+                         SNOW_RESPAWN_DELAY, POWERUP_SIZE)
+from fixed_timestep import EPSILON
+from snake_pathfinding import DIRECTIONS
+
+# Action codes are indices into DIRECTIONS (0 up, 1 right, 2 down, 3 left); -1 keeps going
+NO_TURN = -1
+MOVE_TABLE = np.array(DIRECTIONS, dtype=np.int32) * SNAKE_SIZE
+BOARD_SIZE = np.array([WIDTH, HEIGHT], dtype=np.int32)
+
+# Starting state of the two snakes, as in SnakeMatch (tail first, head last)
+START_BODIES = [[[100, 50], [80, 50]], [[700, 550], [720, 550]]]
+START_DIRECTIONS = [1, 3]  # RIGHT, LEFT
+
+
+class BatchSnakeEnv:
+    """N two-snake matches stepped in lockstep with NumPy array operations
+
+    The state of every match lives in arrays with the match as the first
+    axis: heads (N, 2, 2) in pixels, food (N, 2), scores (N, 2), freeze and
+    boost timers (N, 2), and both bodies as ring buffers of packed positions
+    (y * WIDTH + x) in bodies (N, 2, capacity) with body_start/body_length.
+    step() applies the same rules as SnakeMatch.step (turns, frozen/boosted
+    move tick rates, wrapping, food, power-ups) to all matches at once.
+
+    Only the random streams differ from SnakeMatch: spawns are drawn from a
+    seeded numpy Generator. Bots are not run here; the caller chooses the
+    actions, which is what a training loop wants.
+
+    observe() returns read-only views of the state arrays, so reading an
+    observation never copies.
+    """
+
+    def __init__(self, num_envs, duration=60, seed=None, capacity=256):
+        self.num_envs = num_envs
+        self.duration = duration
+        self.rng = np.random.default_rng(seed)
+        self.grid_width = WIDTH // SNAKE_SIZE
+        self.grid_height = HEIGHT // SNAKE_SIZE
+
+        n = num_envs
+        self.time = np.zeros(n)
+        self.done = np.zeros(n, dtype=bool)
+        self.heads = np.zeros((n, 2, 2), dtype=np.int32)
+        self.direction = np.zeros((n, 2), dtype=np.int8)
+        self.scores = np.zeros((n, 2), dtype=np.int32)
+        self.speed_boost = np.ones((n, 2))
+        self.move_progress = np.ones((n, 2))  # TickRate progress: moves on the first step
+        self.frozen = np.zeros((n, 2), dtype=bool)
+        self.frozen_start_time = np.zeros((n, 2))
+        self.boost_active = np.zeros((n, 2), dtype=bool)
+        self.boost_start_time = np.zeros((n, 2))
+
+        self.bodies = np.zeros((n, 2, capacity), dtype=np.int32)
+        self.body_start = np.zeros((n, 2), dtype=np.int32)
+        self.body_length = np.zeros((n, 2), dtype=np.int32)
+        self.occupancy = np.zeros((n, self.grid_height, self.grid_width), dtype=np.uint8)
+
+        self.food = np.zeros((n, 2), dtype=np.int32)
+        self.flash_active = np.zeros(n, dtype=bool)
+        self.flash_pos = np.zeros((n, 2), dtype=np.int32)
+        self.snow_active = np.zeros(n, dtype=bool)
+        self.snow_pos = np.zeros((n, 2), dtype=np.int32)
+        self.snow_last_spawn_time = np.full(n, np.nan)  # nan: never picked up
+
+        self.reset()
+
+    def _random_positions(self, count, cell_size):
+        """count random [x, y] positions on a cell_size grid, excluding row/column 0"""
+        xs = self.rng.integers(1, WIDTH // cell_size, count)
+        ys = self.rng.integers(1, HEIGHT // cell_size, count)
+        return np.stack([xs, ys], axis=1).astype(np.int32) * cell_size
+
+    def reset(self, envs=None):
+        """Restart the given matches (all of them by default)"""
+        if envs is None:
+            envs = np.arange(self.num_envs)
+        envs = np.asarray(envs)
+        if envs.dtype == bool:
+            envs = np.nonzero(envs)[0]
+
+        self.time[envs] = 0.0
+        self.done[envs] = False
+        self.scores[envs] = 0
+        self.speed_boost[envs] = 1.0
+        self.move_progress[envs] = 1.0
+        self.frozen[envs] = False
+        self.boost_active[envs] = False
+        self.flash_active[envs] = False
+        self.snow_active[envs] = False
+        self.snow_last_spawn_time[envs] = np.nan
+
+        self.occupancy[envs] = 0
+        self.body_start[envs] = 0
+        for snake, body in enumerate(START_BODIES):
+            self.heads[envs, snake] = body[0]  # the game keeps its head position at the first block
+            self.direction[envs, snake] = START_DIRECTIONS[snake]
+            self.body_length[envs, snake] = len(body)
+            for i, (x, y) in enumerate(body):
+                self.bodies[envs, snake, i] = y * WIDTH + x
+                self.occupancy[envs, y // SNAKE_SIZE, x // SNAKE_SIZE] += 1
+
+        self.food[envs] = self._random_positions(len(envs), SNAKE_SIZE)
+
+    def _grow(self):
+        """Double the body capacity, unrolling every ring so it starts at 0"""
+        capacity = self.bodies.shape[2]
+        offsets = (self.body_start[:, :, None] + np.arange(capacity)) % capacity
+        unrolled = np.take_along_axis(self.bodies, offsets, axis=2)
+        self.bodies = np.concatenate([unrolled, np.zeros_like(unrolled)], axis=2)
+        self.body_start[:] = 0
+
+    def step(self, actions=None, dt=1.0 / 60):
+        """Advance every unfinished match by dt seconds
+
+        actions is an (N, 2) array of direction codes (NO_TURN to keep going).
+        Returns a bool array (N, 2) of which snakes ate food this step.
+        """
+        active = ~self.done
+        self.time[active] += dt
+        now = self.time[:, None]
+
+        # Turn, unless it would reverse onto itself
+        if actions is not None:
+            actions = np.asarray(actions)
+            turn = active[:, None] & (actions >= 0) & (actions != (self.direction + 2) % 4)
+            self.direction[turn] = actions[turn]
+
+        # Check if a snake is frozen and update frozen status
+        self.frozen &= ~(now - self.frozen_start_time > FREEZE_DURATION)
+
+        # Move snakes based on their individual tick rates, if not frozen
+        ticking = active[:, None] & ~self.frozen
+        moving = ticking & (self.move_progress + EPSILON >= 1.0)
+        self.move_progress[moving] -= 1.0
+        self.move_progress[ticking] = np.minimum(self.move_progress[ticking] + dt * (FPS * self.speed_boost[ticking]), 2.0)
+        env, snake = np.nonzero(moving)
+        ate = np.zeros((self.num_envs, 2), dtype=bool)
+        if len(env):
+            heads = (self.heads[env, snake] + MOVE_TABLE[self.direction[env, snake]]) % BOARD_SIZE
+            self.heads[env, snake] = heads
+
+            if (self.body_length[env, snake] >= self.bodies.shape[2]).any():
+                self._grow()
+            capacity = self.bodies.shape[2]
+
+            # Push the new head
+            slot = (self.body_start[env, snake] + self.body_length[env, snake]) % capacity
+            self.bodies[env, snake, slot] = heads[:, 1] * WIDTH + heads[:, 0]
+            self.body_length[env, snake] += 1
+            np.add.at(self.occupancy, (env, heads[:, 1] // SNAKE_SIZE, heads[:, 0] // SNAKE_SIZE), 1)
+
+            # Check which snakes eat the food (both can eat it in the same step)
+            eats = (np.abs(heads - self.food[env]) < SNAKE_SIZE).all(axis=1)
+            ate[env[eats], snake[eats]] = True
+            self.scores[env[eats], snake[eats]] += 1
+
+            # Everyone else drops their tail
+            tail_env, tail_snake = env[~eats], snake[~eats]
+            tail = self.bodies[tail_env, tail_snake, self.body_start[tail_env, tail_snake]]
+            self.body_start[tail_env, tail_snake] = (self.body_start[tail_env, tail_snake] + 1) % capacity
+            self.body_length[tail_env, tail_snake] -= 1
+            np.subtract.at(self.occupancy, (tail_env, tail // WIDTH // SNAKE_SIZE, tail % WIDTH // SNAKE_SIZE), 1)
+
+        # Respawn food
+        eaten = ate.any(axis=1)
+        if eaten.any():
+            self.food[eaten] = self._random_positions(int(eaten.sum()), SNAKE_SIZE)
+
+        elapsed = self.time
+
+        # Spawn speed power-up after 10 seconds, again once nobody is boosted
+        spawn = active & (elapsed > FLASH_FIRST_SPAWN) & ~self.flash_active & ~self.boost_active.any(axis=1)
+        if spawn.any():
+            self.flash_pos[spawn] = self._random_positions(int(spawn.sum()), POWERUP_SIZE)
+            self.flash_active |= spawn
+
+        # Spawn freeze power-up after 15 seconds and every 10 seconds after it disappears
+        spawn = (active & (elapsed > SNOW_FIRST_SPAWN) & ~self.snow_active &
+                 (np.isnan(self.snow_last_spawn_time) | (elapsed - self.snow_last_spawn_time > SNOW_RESPAWN_DELAY)))
+        if spawn.any():
+            self.snow_pos[spawn] = self._random_positions(int(spawn.sum()), POWERUP_SIZE)
+            self.snow_active |= spawn
+
+        # Check if a snake touches the speed power-up (Player 1 checked first)
+        touch = self._touching(self.flash_pos) & (self.flash_active & active)[:, None]
+        touch[:, 1] &= ~touch[:, 0]
+        picked = touch.any(axis=1)
+        self.flash_active &= ~picked
+        self.boost_active |= touch
+        self.boost_start_time[touch] = np.broadcast_to(now, touch.shape)[touch]
+        self.speed_boost[touch] = BOOST_MULTIPLIER
+
+        # Check if a snake touches the freeze power-up, which freezes the opponent
+        touch = self._touching(self.snow_pos) & (self.snow_active & active)[:, None]
+        touch[:, 1] &= ~touch[:, 0]
+        picked = touch.any(axis=1)
+        self.snow_active &= ~picked
+        self.snow_last_spawn_time[picked] = elapsed[picked]
+        opponent = touch[:, ::-1]
+        self.frozen |= opponent
+        self.frozen_start_time[opponent] = np.broadcast_to(now, opponent.shape)[opponent]
+
+        # End power-up effects after 5 seconds
+        ended = self.boost_active & (now - self.boost_start_time > BOOST_DURATION)
+        self.boost_active &= ~ended
+        self.speed_boost[ended] = 1.0
+
+        # Check game duration
+        self.done |= active & (elapsed >= self.duration)
+
+        return ate
+
+    def _touching(self, powerup_pos):
+        """(N, 2) bool: which heads are inside each match's power-up square"""
+        corner = powerup_pos[:, None, :]
+        inside = (corner <= self.heads) & (self.heads < corner + POWERUP_SIZE)
+        return inside.all(axis=2)
+
+    def observe(self):
+        """Read-only views of the match state (no copies)"""
+        observation = {}
+        for name in ('time', 'done', 'heads', 'direction', 'scores', 'food', 'frozen',
+                     'boost_active', 'occupancy', 'flash_active', 'flash_pos', 'snow_active',
+                     'snow_pos', 'bodies', 'body_start', 'body_length'):
+            view = getattr(self, name).view()
+            view.flags.writeable = False
+            observation[name] = view
+        return observation
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Random policy on many matches at once")
+    parser.add_argument("--envs", type=int, default=4096, help="matches stepped together")
+    parser.add_argument("--steps", type=int, help="stop after this many steps (default: when every match is over)")
+    parser.add_argument("--seed", type=int, default=0, help="seeds the matches; the policy uses seed + 1")
+    args = parser.parse_args()
+    if args.envs < 1:
+        parser.error("--envs must be at least 1")
+
+    num_envs = args.envs
+    env = BatchSnakeEnv(num_envs, duration=60, seed=args.seed)
+    rng = np.random.default_rng(args.seed + 1)
+    start = time.perf_counter()
+    steps = 0
+    while not env.done.all() and (args.steps is None or steps < args.steps):
+        env.step(rng.integers(-1, 4, (num_envs, 2)), 1.0 / 60)
+        steps += 1
+    elapsed = time.perf_counter() - start
+    print(f"{num_envs} matches x {steps} steps in {elapsed:.2f}s "
+          f"({num_envs * steps / elapsed:.0f} match-steps/s)")
+    print(f"mean scores: {env.scores.mean(axis=0)}")
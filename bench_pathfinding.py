@@ -0,0 +1,341 @@
+# Pathfinding benchmark: time the bot planners on reproducible grid scenarios.
+# Scenarios are generated from a seed (grid size, snake length, obstacle
+# density, reachable or walled-off food). For each planner we record the
+# decision time, node expansions per decision, peak memory and whether the
+# first step is valid (and on a shortest path), and write everything to JSON
+# so runs from different commits can be compared.
+#
+#     python bench_pathfinding.py --json before.json
+#     python bench_pathfinding.py --json after.json --compare before.json
+import argparse
+import heapq
+import json
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from array import array
+from collections import deque
+
+from snake_pathfinding import (SNAKE_SIZE, DIRECTIONS, BotPlanner, OccupancyGrid, SearchBot,
+                               find_path_to_food, get_search_grid, reset_search_stats, search_stats)
+
+try:
+    from flow_field import FlowField
+    has_flow_field = True
+except ImportError:
+    has_flow_field = False
+
+
+def reference_find_path_to_food(snake_head, food_pos, obstacles, grid_width, grid_height):
+    """find_path_to_food as it was before the flat-grid A*, kept as a baseline
+
+    Every heap entry carries a copy of its whole path. No wrap support.
+    """
+    start = (snake_head[0] // SNAKE_SIZE, snake_head[1] // SNAKE_SIZE)
+    goal = (food_pos[0] // SNAKE_SIZE, food_pos[1] // SNAKE_SIZE)
+    obstacle_set = set((pos[0] // SNAKE_SIZE, pos[1] // SNAKE_SIZE) for pos in obstacles)
+    queue = [(0, start, [])]
+    visited = set()
+    directions = list(DIRECTIONS)
+
+    while queue:
+        cost, current, path = heapq.heappop(queue)
+        current_x, current_y = current
+        if current == goal:
+            if not path:
+                for dx, dy in directions:
+                    nx, ny = current_x + dx, current_y + dy
+                    if 0 <= nx < grid_width and 0 <= ny < grid_height and (nx, ny) not in obstacle_set:
+                        return (dx * SNAKE_SIZE, dy * SNAKE_SIZE)
+            else:
+                first_step = path[0]
+                return ((first_step[0] - start[0]) * SNAKE_SIZE, (first_step[1] - start[1]) * SNAKE_SIZE)
+        if current in visited:
+            continue
+        visited.add(current)
+        search_stats['expansions'] += 1
+        for dx, dy in directions:
+            nx, ny = current_x + dx, current_y + dy
+            if 0 <= nx < grid_width and 0 <= ny < grid_height and (nx, ny) not in obstacle_set and (nx, ny) not in visited:
+                h = abs(nx - goal[0]) + abs(ny - goal[1])
+                heapq.heappush(queue, (cost + 1 + h, (nx, ny), path + [(nx, ny)]))
+
+    random.shuffle(directions)
+    for dx, dy in directions:
+        nx, ny = start[0] + dx, start[1] + dy
+        if 0 <= nx < grid_width and 0 <= ny < grid_height and (nx, ny) not in obstacle_set:
+            return (dx * SNAKE_SIZE, dy * SNAKE_SIZE)
+    return (0, -SNAKE_SIZE)
+
+
+class Scenario:
+    """One reproducible board: a snake, random obstacles, a head and a food cell"""
+
+    def __init__(self, grid_width, grid_height, snake_length, density, reachable, wrap, seed):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.snake_length = snake_length
+        self.density = density
+        self.reachable = reachable
+        self.wrap = wrap
+        self.seed = seed
+        self.name = (f"{grid_width}x{grid_height} len={snake_length} density={density} "
+                     f"{'reachable' if reachable else 'unreachable'}{' wrap' if wrap else ''}")
+
+        rng = random.Random(f"{seed}-{self.name}")
+        size = grid_width * grid_height
+        blocked = bytearray(size)
+
+        # Snake body as a random walk; its last cell is the head, which stays free
+        x, y = rng.randrange(grid_width), rng.randrange(grid_height)
+        body = [(x, y)]
+        for _ in range(snake_length - 1):
+            dx, dy = rng.choice(DIRECTIONS)
+            x, y = x + dx, y + dy
+            if wrap:
+                x %= grid_width
+                y %= grid_height
+            else:
+                x = min(max(x, 0), grid_width - 1)
+                y = min(max(y, 0), grid_height - 1)
+            body.append((x, y))
+        head = body[-1]
+        for bx, by in body[:-1]:
+            blocked[by * grid_width + bx] = 1
+
+        # Random obstacles
+        for _ in range(int(density * size)):
+            blocked[rng.randrange(size)] = 1
+        head_cell = head[1] * grid_width + head[0]
+        blocked[head_cell] = 0
+
+        if reachable:
+            # Food somewhere in the head's open region (unboxing the head if needed)
+            from_head = self.distances_from(head_cell, blocked)
+            candidates = [i for i in range(size) if from_head[i] > 0]
+            if not candidates:
+                for nx, ny in self.neighbors(head[0], head[1]):
+                    blocked[ny * grid_width + nx] = 0
+                from_head = self.distances_from(head_cell, blocked)
+                candidates = [i for i in range(size) if from_head[i] > 0]
+            food_cell = rng.choice(candidates)
+        else:
+            # Food away from the head, walled in on all sides
+            while True:
+                food_cell = rng.randrange(size)
+                if food_cell != head_cell and food_cell not in self.cells_around(head_cell):
+                    break
+            blocked[food_cell] = 0
+            for neighbor in self.cells_around(food_cell):
+                blocked[neighbor] = 1
+            # Make sure the head itself is not boxed in
+            walls = self.cells_around(food_cell)
+            if all(blocked[cell] for cell in self.cells_around(head_cell)):
+                for cell in self.cells_around(head_cell):
+                    if cell not in walls:
+                        blocked[cell] = 0
+                        break
+        food = (food_cell % grid_width, food_cell // grid_width)
+        self.distance = self.distances_from(food_cell, blocked)
+
+        self.blocked = blocked
+        self.head = (head[0] * SNAKE_SIZE, head[1] * SNAKE_SIZE)
+        self.food = (food[0] * SNAKE_SIZE, food[1] * SNAKE_SIZE)
+        self.obstacles = [((i % grid_width) * SNAKE_SIZE, (i // grid_width) * SNAKE_SIZE)
+                          for i in range(size) if blocked[i]]
+
+    def neighbors(self, x, y):
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if self.wrap:
+                yield nx % self.grid_width, ny % self.grid_height
+            elif 0 <= nx < self.grid_width and 0 <= ny < self.grid_height:
+                yield nx, ny
+
+    def cells_around(self, cell):
+        width = self.grid_width
+        return [ny * width + nx for nx, ny in self.neighbors(cell % width, cell // width)]
+
+    def distances_from(self, cell, blocked):
+        """BFS distance of every cell to the given cell (-1 if unreachable)"""
+        width = self.grid_width
+        distance = array('i', [-1]) * (width * self.grid_height)
+        distance[cell] = 0
+        queue = deque([cell])
+        while queue:
+            current = queue.popleft()
+            for nx, ny in self.neighbors(current % width, current // width):
+                neighbor = ny * width + nx
+                if distance[neighbor] < 0 and not blocked[neighbor]:
+                    distance[neighbor] = distance[current] + 1
+                    queue.append(neighbor)
+        return distance
+
+    def check_move(self, move):
+        """(valid, shortest) for the move a planner chose from the head"""
+        x = self.head[0] // SNAKE_SIZE + move[0] // SNAKE_SIZE
+        y = self.head[1] // SNAKE_SIZE + move[1] // SNAKE_SIZE
+        if self.wrap:
+            x %= self.grid_width
+            y %= self.grid_height
+        elif not (0 <= x < self.grid_width and 0 <= y < self.grid_height):
+            return False, False
+        cell = y * self.grid_width + x
+        if self.blocked[cell] or abs(move[0]) + abs(move[1]) != SNAKE_SIZE:
+            return False, False
+        head_cell = (self.head[1] // SNAKE_SIZE) * self.grid_width + self.head[0] // SNAKE_SIZE
+        shortest = self.reachable and self.distance[cell] == self.distance[head_cell] - 1
+        return True, shortest
+
+
+def occupancy_for(scenario):
+    occupancy = OccupancyGrid(scenario.grid_width, scenario.grid_height)
+    occupancy.reset(scenario.obstacles)
+    return occupancy
+
+
+# Planners: name -> setup(scenario) returning a zero-argument decision function
+def setup_find_path_to_food(s):
+    return lambda: find_path_to_food(s.head, s.food, s.obstacles, s.grid_width, s.grid_height, s.wrap)
+
+def setup_reference(s):
+    return lambda: reference_find_path_to_food(s.head, s.food, s.obstacles, s.grid_width, s.grid_height)
+
+def setup_search_bot(s):
+    bot = SearchBot(s.grid_width, s.grid_height, s.wrap, occupancy_for(s), random.Random(0))
+    return lambda: bot.next_move(s.head, s.food)
+
+def setup_bot_planner(s):
+    # A fresh planner, so this is the cost of a full plan (later decisions are lookups)
+    planner = BotPlanner(s.grid_width, s.grid_height, s.wrap, occupancy_for(s), random.Random(0))
+    return lambda: planner.next_move(s.head, s.food)
+
+def setup_flow_field(s):
+    field = FlowField(s.grid_width, s.grid_height, s.wrap, occupancy_for(s), random.Random(0))
+    return lambda: field.next_move(s.head, s.food)
+
+PLANNERS = {
+    'find_path_to_food': setup_find_path_to_food,
+    'search_bot': setup_search_bot,
+    'bot_planner': setup_bot_planner,
+    'reference': setup_reference
+}
+if has_flow_field:
+    PLANNERS['flow_field'] = setup_flow_field
+
+
+def bench(scenario, name, repeat):
+    setup = PLANNERS[name]
+    times = []
+    for _ in range(repeat):
+        decide = setup(scenario)
+        reset_search_stats()
+        start = time.perf_counter()
+        move = decide()
+        times.append(time.perf_counter() - start)
+    # Counted since the reset above: the one decision of the last repeat
+    expansions = search_stats['expansions']
+
+    # Separate run for memory, tracemalloc slows everything down
+    decide = setup(scenario)
+    tracemalloc.start()
+    decide()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    valid, shortest = scenario.check_move(move)
+    return {
+        'scenario': scenario.name,
+        'planner': name,
+        'median_ms': 1000 * statistics.median(times),
+        'min_ms': 1000 * min(times),
+        'expansions_per_decision': expansions,
+        'peak_kb': peak / 1024,
+        'valid': valid,
+        'shortest': shortest
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_list(text, convert):
+    return [convert(item) for item in text.split(",") if item.strip()]
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the snake bot planners")
+    parser.add_argument("--sizes", default="40x30,100x75,250x250,1000x1000")
+    parser.add_argument("--lengths", default="20,200", help="snake lengths")
+    parser.add_argument("--densities", default="0.05,0.2", help="fraction of cells with obstacles")
+    parser.add_argument("--planners", default=",".join(PLANNERS))
+    parser.add_argument("--wrap", action="store_true", help="plan on a wrapping board (skips 'reference')")
+    parser.add_argument("--reference-max-cells", type=int, default=250 * 250,
+                        help="skip the path-copying baseline on larger grids")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=positive_int, default=3, help="timed decisions per planner and scenario")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="earlier --json output to compare against")
+    args = parser.parse_args()
+
+    planners = parse_list(args.planners, str.strip)
+    for name in planners:
+        if name not in PLANNERS:
+            parser.error(f"unknown planner '{name}' (available: {', '.join(PLANNERS)})")
+
+    results = []
+    for grid_width, grid_height in parse_list(args.sizes, parse_size):
+        # Table building is a one-off per board size, report it separately
+        start = time.perf_counter()
+        get_search_grid(grid_width, grid_height, args.wrap)
+        print(f"{grid_width}x{grid_height}: grid tables built in {time.perf_counter() - start:.2f}s")
+
+        for length in parse_list(args.lengths, int):
+            for density in parse_list(args.densities, float):
+                for reachable in (True, False):
+                    scenario = Scenario(grid_width, grid_height, length, density, reachable, args.wrap, args.seed)
+                    for name in planners:
+                        if name == 'reference' and (args.wrap or grid_width * grid_height > args.reference_max_cells):
+                            continue
+                        result = bench(scenario, name, args.repeat)
+                        results.append(result)
+                        print(f"  {scenario.name:<50} {name:<18} {result['median_ms']:>10.3f} ms "
+                              f"{result['expansions_per_decision']:>9} exp/decision {result['peak_kb']:>10.1f} KB "
+                              f"{'ok' if result['valid'] else 'INVALID'}"
+                              f"{' shortest' if result['shortest'] else ''}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = {(r['scenario'], r['planner']): r for r in json.load(f)['results']}
+        print(f"\nCompared with {args.compare}:")
+        for result in results:
+            before = old.get((result['scenario'], result['planner']))
+            if before and result['median_ms'] > 0:
+                print(f"  {result['scenario']:<50} {result['planner']:<18} "
+                      f"{before['median_ms'] / result['median_ms']:>6.2f}x speed")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({'commit': git_commit(), 'seed': args.seed, 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# Startup benchmark for the two games: how long importing the module takes,
+# whether the import has side effects (window, mixer, fonts, importing
+# NumPy), and how long init() and the first frame of the first screen take.
+# Every run is a fresh interpreter with the dummy SDL drivers.
+#
+# The import time of each game module (not counting pygame itself) must
+# stay under --budget-ms and the import must not open anything; otherwise
+# the exit status is 1, so this can guard the budget in a script or CI job.
+#
+#     python bench_startup.py --repeat 5 --budget-ms 50
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+GAMES = ["pChaser_1.0.py", "double_snake.py"]
+
+# Runs in the child interpreter and prints one JSON line
+PROBE = r'''
+import importlib.util
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import pygame
+pygame_imported = time.perf_counter()
+modules_before = set(sys.modules)  # pygame may pull in NumPy itself
+
+spec = importlib.util.spec_from_file_location("game", sys.argv[1])
+game = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(game)
+imported = time.perf_counter()
+
+side_effects = [name for name, active in [
+    ("display", pygame.display.get_init()),
+    ("mixer", bool(pygame.mixer.get_init())),
+    ("font", pygame.font.get_init()),
+    ("numpy", "numpy" in sys.modules and "numpy" not in modules_before)
+] if active]
+
+game.init()
+initialized = time.perf_counter()
+
+# Time to the first display update of the first screen, then leave it
+first_frame = []
+real_update = pygame.display.update
+def update(*args):
+    if not first_frame:
+        first_frame.append(time.perf_counter())
+    real_update(*args)
+pygame.display.update = update
+
+if hasattr(game, "show_intro_screen"):
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+    game.show_intro_screen()
+else:
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_1))
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a))
+    game.start_page()
+
+print(json.dumps({
+    "pygame_import_ms": 1000 * (pygame_imported - start),
+    "import_ms": 1000 * (imported - pygame_imported),
+    "init_ms": 1000 * (initialized - imported),
+    "first_frame_ms": 1000 * (first_frame[0] - initialized),
+    "time_to_first_frame_ms": 1000 * (first_frame[0] - start),
+    "side_effects": side_effects
+}))
+'''
+
+
+def probe(game):
+    """One fresh-interpreter measurement of a game module"""
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, "-c", PROBE, game], cwd=here, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def positive_float(text):
+    value = float(text)
+    if not value > 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure and enforce the games' startup cost")
+    parser.add_argument("--games", default=",".join(GAMES), help="comma separated game files")
+    parser.add_argument("--repeat", type=positive_int, default=5, help="runs per game (medians are reported)")
+    parser.add_argument("--budget-ms", type=positive_float, default=50.0,
+                        help="maximum import time of a game module, not counting pygame")
+    parser.add_argument("--json", help="write the measurements to this file")
+    args = parser.parse_args()
+
+    games = [name.strip() for name in args.games.split(",") if name.strip()]
+    keys = ["pygame_import_ms", "import_ms", "init_ms", "first_frame_ms", "time_to_first_frame_ms"]
+    print(f"{'game':<18}{'pygame ms':>11}{'import ms':>11}{'init ms':>9}{'1st frame':>11}{'total ms':>10}  side effects")
+
+    results = {}
+    failed = False
+    for game in games:
+        runs = [probe(game) for _ in range(args.repeat)]
+        row = {key: statistics.median(run[key] for run in runs) for key in keys}
+        row["side_effects"] = sorted({effect for run in runs for effect in run["side_effects"]})
+        results[game] = row
+        print(f"{game:<18}{row['pygame_import_ms']:>11.1f}{row['import_ms']:>11.1f}{row['init_ms']:>9.1f}"
+              f"{row['first_frame_ms']:>11.1f}{row['time_to_first_frame_ms']:>10.1f}  "
+              f"{', '.join(row['side_effects']) or 'none'}")
+
+        if row["import_ms"] > args.budget_ms:
+            print(f"  FAIL: import takes {row['import_ms']:.1f} ms, budget is {args.budget_ms:.1f} ms")
+            failed = True
+        if row["side_effects"]:
+            print(f"  FAIL: importing initializes {', '.join(row['side_effects'])}")
+            failed = True
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"budget_ms": args.budget_ms, "games": results}, f, indent=2)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
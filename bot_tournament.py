@@ -0,0 +1,167 @@
+# Bot tournament: play bot variants against each other on the PVE rules.
+# Every pair of variants plays one match per seed on each side of the board,
+# spread over a process pool, and the results are aggregated into win rates,
+# scores and per-decision latency.
+#
+#     python bot_tournament.py --bots planner,astar,flow --seeds 50 --workers 8
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from snake_match import SnakeMatch, default_bot, search_bot
+
+# Bot variants by name (factories for SnakeMatch)
+BOTS = {
+    'planner': default_bot,
+    'astar': search_bot
+}
+
+# The flow-field variant needs NumPy
+try:
+    from flow_field import FlowField
+
+    def flow_bot(grid_width, grid_height, occupancy, rng):
+        # Not shared here: each side of a match gets its own field
+        return FlowField(grid_width, grid_height, wrap=True, occupancy=occupancy, rng=rng)
+
+    BOTS['flow'] = flow_bot
+except ImportError:
+    pass
+
+
+class TimedBot:
+    """Wraps a bot and records how long each decision takes"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.latencies = []
+
+    def next_move(self, snake_head, food_pos):
+        start = time.perf_counter()
+        move = self.bot.next_move(snake_head, food_pos)
+        self.latencies.append(time.perf_counter() - start)
+        return move
+
+
+def timed(make_bot, timers):
+    """Factory that wraps every bot it makes in a TimedBot, collected in timers"""
+    def make_timed_bot(grid_width, grid_height, occupancy, rng):
+        bot = TimedBot(make_bot(grid_width, grid_height, occupancy, rng))
+        timers.append(bot)
+        return bot
+    return make_timed_bot
+
+
+def play_match(bot1, bot2, seed, duration, dt):
+    """Play one match in a worker process; returns a picklable result dict"""
+    timers1, timers2 = [], []
+    match = SnakeMatch("PVE", duration, seed,
+                       bots={0: timed(BOTS[bot1], timers1), 1: timed(BOTS[bot2], timers2)})
+    while not match.finished:
+        match.step((), dt)
+
+    score1, score2 = match.scores()
+    return {
+        'bots': [bot1, bot2],
+        'seed': seed,
+        'scores': [score1, score2],
+        'latencies': [timers1[0].latencies, timers2[0].latencies]
+    }
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def aggregate(results):
+    """Per-bot totals from a list of play_match results"""
+    table = {}
+    for result in results:
+        scores = result['scores']
+        for side in (0, 1):
+            name = result['bots'][side]
+            row = table.setdefault(name, {'matches': 0, 'wins': 0, 'losses': 0, 'ties': 0,
+                                          'score': 0, 'latencies': []})
+            row['matches'] += 1
+            row['score'] += scores[side]
+            row['latencies'].extend(result['latencies'][side])
+            if scores[side] > scores[1 - side]:
+                row['wins'] += 1
+            elif scores[side] < scores[1 - side]:
+                row['losses'] += 1
+            else:
+                row['ties'] += 1
+
+    summary = {}
+    for name, row in table.items():
+        latencies = row['latencies']
+        summary[name] = {
+            'matches': row['matches'],
+            'wins': row['wins'],
+            'losses': row['losses'],
+            'ties': row['ties'],
+            'win_rate': row['wins'] / row['matches'],
+            'mean_score': row['score'] / row['matches'],
+            'decisions': len(latencies),
+            'mean_latency_ms': 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            'p95_latency_ms': 1000 * percentile(latencies, 0.95),
+            'max_latency_ms': 1000 * max(latencies) if latencies else 0.0
+        }
+    return summary
+
+
+def run_tournament(bots, seeds, duration=60, dt=1.0 / 60, workers=None):
+    """Play every ordered pair of different bots once per seed, in parallel"""
+    jobs = [(bot1, bot2, seed) for bot1, bot2 in itertools.permutations(bots, 2) for seed in seeds]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_match, bot1, bot2, seed, duration, dt) for bot1, bot2, seed in jobs]
+        return [future.result() for future in futures]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play snake bot variants against each other")
+    parser.add_argument("--bots", default=",".join(BOTS),
+                        help=f"comma separated bot variants (available: {', '.join(BOTS)})")
+    parser.add_argument("--seeds", type=int, default=20, help="number of seeds per pairing")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--duration", type=float, default=60, help="match length in seconds")
+    parser.add_argument("--fps", type=float, default=60, help="simulated frames per second")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--json", help="write the summary and all match results to this file")
+    args = parser.parse_args()
+
+    bots = [name.strip() for name in args.bots.split(",") if name.strip()]
+    for name in bots:
+        if name not in BOTS:
+            parser.error(f"unknown bot '{name}' (available: {', '.join(BOTS)})")
+    if len(bots) < 2:
+        parser.error("need at least two bots")
+
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    start = time.perf_counter()
+    results = run_tournament(bots, seeds, args.duration, 1.0 / args.fps, args.workers)
+    elapsed = time.perf_counter() - start
+    summary = aggregate(results)
+
+    print(f"{len(results)} matches in {elapsed:.1f}s on {args.workers} workers")
+    print(f"{'bot':<10}{'win rate':>10}{'W/L/T':>12}{'score':>8}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for name, row in sorted(summary.items(), key=lambda item: item[1]['win_rate'], reverse=True):
+        wlt = f"{row['wins']}/{row['losses']}/{row['ties']}"
+        print(f"{name:<10}{row['win_rate']:>10.2%}{wlt:>12}{row['mean_score']:>8.2f}"
+              f"{row['mean_latency_ms']:>10.3f}{row['p95_latency_ms']:>10.3f}{row['max_latency_ms']:>10.3f}")
+
+    if args.json:
+        for result in results:
+            del result['latencies']  # per-decision samples are too big to keep
+        with open(args.json, "w") as f:
+            json.dump({'summary': summary, 'matches': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import time
+
+import pygame
+
+from snake_sprites import shared_sprites
+from text_cache import shared_cache
+
+
+def block_item(color, x, y, sprites=shared_sprites):
+    """Scene item for a solid square (a snake block or the food)"""
+    sprite = sprites.sprite(color)
+    return ('block', color, x, y), sprite.get_rect(topleft=(x, y)), sprite
+
+
+def image_item(name, image, x, y):
+    """Scene item for an image; name identifies the image in the key"""
+    return ('image', name, x, y), image.get_rect(topleft=(x, y)), image
+
+
+def text_item(font, msg, color, x, y, cache=shared_cache):
+    """Scene item for a line of text, rendered through the text surface cache"""
+    text = cache.render(font, msg, color)
+    return ('text', msg, color, x, y), text.get_rect(topleft=(x, y)), text
+
+
+def merge_overlapping(rects):
+    """Replace overlapping rects by their bounding box until none overlap
+
+    Text is antialiased with per-pixel alpha, so drawing it twice into two
+    overlapping dirty rects would make its edges brighter.
+    """
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class DirtyRectRenderer:
+    """Draws a frame's scene and updates only the parts of the screen that changed
+
+    A scene is a list of items (key, rect, surface) in drawing order, where
+    key identifies what is drawn and where (see block_item, image_item and
+    text_item) and surface is blitted at rect. Between two frames only the items whose
+    key appeared or disappeared are dirty: a new head, a freed tail, food or
+    a power-up spawning or being picked up, HUD text that changed. Their
+    rects are cleared to the background, every item overlapping them is
+    redrawn clipped to them, and only those rects are passed to
+    pygame.display.update().
+
+    With enabled=False every frame is a full redraw (fill, draw everything,
+    update the whole screen), the old behaviour. stats keeps the cost of
+    each mode for comparison. If profiler is set (a FrameProfiler), the
+    drawing is marked as its 'draw' phase right before the display update.
+    """
+
+    def __init__(self, surface, background, enabled=True):
+        self.surface = surface
+        self.background = background
+        self.enabled = enabled
+        self.items = {}  # key -> rect of what is on screen now
+        self.needs_full_redraw = True
+        self.profiler = None
+        self.stats = {
+            'full': {'frames': 0, 'seconds': 0.0, 'pixels': 0},
+            'dirty': {'frames': 0, 'seconds': 0.0, 'pixels': 0}
+        }
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.needs_full_redraw = True
+
+    def invalidate(self):
+        """Redraw everything next frame (after something else drew on the screen)"""
+        self.needs_full_redraw = True
+
+    def render(self, scene):
+        start = time.perf_counter()
+        items = {key: (surface, rect) for key, rect, surface in scene}
+
+        if not self.enabled or self.needs_full_redraw:
+            self.surface.fill(self.background)
+            self.surface.blits(list(items.values()), doreturn=False)
+            if self.profiler is not None:
+                self.profiler.mark('draw')
+            pygame.display.update()
+            pixels = self.surface.get_width() * self.surface.get_height()
+            self.needs_full_redraw = False
+        else:
+            # Rects of items that appeared or disappeared since the last frame
+            dirty = [rect for key, rect in self.items.items() if key not in items]
+            dirty += [rect for key, (surface, rect) in items.items() if key not in self.items]
+            dirty = merge_overlapping(dirty)
+            for rect in dirty:
+                self.surface.fill(self.background, rect)
+            if dirty:
+                # Redraw everything under each of them in order, clipped so
+                # nothing outside the dirty rect is painted over
+                for dirty_rect in dirty:
+                    self.surface.set_clip(dirty_rect)
+                    self.surface.blits([item for item in items.values() if dirty_rect.colliderect(item[1])],
+                                       doreturn=False)
+                self.surface.set_clip(None)
+            if self.profiler is not None:
+                self.profiler.mark('draw')
+            if dirty:
+                pygame.display.update(dirty)
+            pixels = sum(rect.width * rect.height for rect in dirty)
+
+        self.items = {key: rect for key, (surface, rect) in items.items()}
+        stats = self.stats['dirty' if self.enabled else 'full']
+        stats['frames'] += 1
+        stats['seconds'] += time.perf_counter() - start
+        stats['pixels'] += pixels
+
+    def report(self):
+        """One line per mode: mean frame cost and pixels pushed to the display"""
+        lines = []
+        for mode, stats in self.stats.items():
+            if stats['frames']:
+                lines.append(f"{mode:>5}: {stats['frames']} frames, "
+                             f"{1000 * stats['seconds'] / stats['frames']:.3f} ms/frame, "
+                             f"{stats['pixels'] // stats['frames']} pixels/frame")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import os
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from snake_match import WIDTH, HEIGHT, SnakeMatch, default_bot
+
+    # Render the same bot-vs-bot match with both modes and compare frame costs
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    font = pygame.font.SysFont(None, 35)
+
+    def scene(match):
+        items = [block_item((0, 255, 0), match.food_pos[0], match.food_pos[1])]
+        for snake, color in zip(match.snakes, [(255, 0, 0), (255, 255, 0)]):
+            blocks = list(snake.body)
+            for i, (x, y) in enumerate(blocks):
+                items.append(block_item((255, 255, 255) if i == len(blocks) - 1 else color, x, y))
+        items.append(text_item(font, f"Player 1: {match.snakes[0].score}", (255, 255, 255), 10, 10))
+        items.append(text_item(font, f"Bot: {match.snakes[1].score}", (255, 255, 255), 10, 40))
+        items.append(text_item(font, f"Time Left: {60 - int(match.time)}s", (255, 255, 255), WIDTH - 200, 10))
+        return items
+
+    renderer = DirtyRectRenderer(screen, (0, 0, 0))
+    for enabled in (False, True):
+        renderer.enabled = enabled
+        renderer.invalidate()
+        match = SnakeMatch("PVE", 60, seed=0, bots={0: default_bot, 1: default_bot})
+        while not match.finished:
+            match.step((), 1.0 / 60)
+            renderer.render(scene(match))
+    print(renderer.report())
+    pygame.quit()
@@ -1,17 +1,14 @@
 import pygame
-import random
 import time
-import heapq
+import math
 from collections import deque
 
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init()  # Initialize the mixer module for sound
+from snake_sprites import shared_sprites
+from text_cache import shared_cache
+
 
 # Screen dimensions
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Python Chaser")  # Updated game title in window caption
 
 # Colors
 WHITE = (255, 255, 255)
@@ -22,141 +19,153 @@ BLUE = (0, 0, 255)
 GRAY = (200, 200, 200)
 YELLOW = (255, 255, 0)
 
-# Clock and font
-clock = pygame.time.Clock()
-font = pygame.font.SysFont(None, 35)
-small_font = pygame.font.SysFont(None, 25)
+# Window, clock, fonts and assets: importing this module opens nothing,
+# init() sets these up and the first screen calls init_fonts()/init_audio()
+screen = None
+clock = None
+font = None
+small_font = None
+assets = None
+music_playing = False
 
 # Snake settings
 SNAKE_SIZE = 20
 FPS = 10  # Increased FPS to make the game faster
 
+# Bot planner: "plan" keeps a repaired A* plan per bot,
+# "flow" shares one distance-to-food field between all bots,
+# "async" searches in a worker process and never makes a frame wait for it
+BOT_MODE = "plan"
+
+# The game rules run at a fixed rate, independent of the render frame rate;
+# a slow frame is caught up with at most MAX_CATCH_UP_STEPS steps
+SIM_STEP = 1.0 / 60
+MAX_CATCH_UP_STEPS = 5
+
+# Only redraw and update the parts of the screen that changed (R toggles it in game)
+DIRTY_RECTS = True
+
+# Per-phase frame timings overlay (F3 toggles it in game, F4 dumps the samples to CSV)
+PROFILER = False
+
+# Write every match's seed and key presses to match_<time>.snakelog, for
+# match_replay.py or "--replay <file>" to play it again
+RECORD_MATCHES = False
+
+# Milliseconds of bot planning per frame; bots over the budget decide in a
+# later frame, the ones about to move first (None decides every bot at once)
+BOT_PLAN_BUDGET_MS = 2.0
+
+# Draw snakes with one batched blit of pre-rendered block sprites
+# instead of a pygame.draw.rect call per segment
+SNAKE_SPRITES = True
+
 # Game duration (in seconds)
 GAME_DURATION = 60
 
-# Load and resize power-up images
-flash_image = pygame.image.load("flash.png")
-flash_image = pygame.transform.scale(flash_image, (SNAKE_SIZE * 3, SNAKE_SIZE * 3))
-snow_image = pygame.image.load("snow.jpg")  # Add snow power-up image
-snow_image = pygame.transform.scale(snow_image, (SNAKE_SIZE * 2, SNAKE_SIZE * 2))  # Smaller size (2x2 blocks)
-
-# Load and set up background music
-try:
-    pygame.mixer.music.load("game_music.mp3")
-    pygame.mixer.music.set_volume(0.5)  # Set volume to 50%
-    pygame.mixer.music.play(-1)  # -1 means loop indefinitely
-    music_playing = True
-except:
-    print("Warning: Could not load background music file 'game_music.mp3'")
-    music_playing = False
-
-# Load sound effects
-try:
-    food_sound = pygame.mixer.Sound("pop.mp3")
-    food_sound.set_volume(0.7)  # Set food sound volume to 70%
-    has_food_sound = True
-except:
-    print("Warning: Could not load sound effect file 'pop.mp3'")
-    has_food_sound = False
-
-# Load RSU logo
-try:
-    rsu_logo = pygame.image.load("rsu_logo.png")
-    rsu_logo = pygame.transform.scale(rsu_logo, (SNAKE_SIZE * 7, SNAKE_SIZE * 10))  # Size: 10x5 blocks
-    logo_position = (WIDTH - SNAKE_SIZE * 10 - 10, 10)  # Top right with 10px margin
-    has_logo = True
-except:
-    print("Warning: Could not load logo file 'rsu_logo.png'")
-    has_logo = False
+# Sizes the images are drawn at
+FLASH_SIZE = (SNAKE_SIZE * 3, SNAKE_SIZE * 3)
+SNOW_SIZE = (SNAKE_SIZE * 2, SNAKE_SIZE * 2)  # Smaller size (2x2 blocks)
+LOGO_SIZE = (SNAKE_SIZE * 7, SNAKE_SIZE * 10)  # Size: 10x5 blocks
+logo_position = (WIDTH - SNAKE_SIZE * 10 - 10, 10)  # Top right with 10px margin
+
+def init():
+    """Open the window and start loading the images; does nothing if already done"""
+    global screen, clock, assets
+    if screen is not None:
+        return
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Python Chaser")  # Updated game title in window caption
+    clock = pygame.time.Clock()
+
+    # Images load in a background thread while the first screen is showing;
+    # they are converted to the display format on first use
+    from assets import AssetManager
+    assets = AssetManager()
+    assets.start(images=["rsu_logo.png", "flash.png", "snow.jpg"])
+
+def init_fonts():
+    """Create the fonts the first time a screen needs them"""
+    global font, small_font
+    if font is not None:
+        return
+    pygame.font.init()
+    # Font(None) is the default font SysFont(None) picks, without scanning the system fonts
+    font = pygame.font.Font(None, 35)
+    small_font = pygame.font.Font(None, 25)
+
+def init_audio():
+    """Start the mixer and the music the first time a screen needs them"""
+    global music_playing
+    if pygame.mixer.get_init():
+        return
+    pygame.mixer.init()  # Initialize the mixer module for sound
+
+    # Load and set up background music
+    try:
+        pygame.mixer.music.load("game_music.mp3")
+        pygame.mixer.music.set_volume(0.5)  # Set volume to 50%
+        pygame.mixer.music.play(-1)  # -1 means loop indefinitely
+        music_playing = True
+    except:
+        print("Warning: Could not load background music file 'game_music.mp3'")
+        music_playing = False
+
+    # The sound effect is decoded in the background too
+    assets.start(sounds=["pop.mp3"])
 
 def draw_logo():
     """Draw the RSU logo in the top right corner if available"""
-    if has_logo:
+    rsu_logo = assets.image("rsu_logo.png", LOGO_SIZE)
+    if rsu_logo is not None:
         screen.blit(rsu_logo, logo_position)
 
+def powerup_image(name, size, color):
+    """A power-up's image, or a plain square of color if it could not be loaded"""
+    image = assets.image(name, size)
+    if image is None:
+        image = pygame.Surface(size)
+        image.fill(color)
+    return image
+
 def draw_snake(snake_list, color, direction=None):  # Remove head_image and direction parameters
+    if SNAKE_SPRITES:
+        shared_sprites.draw(screen, snake_list, color)  # White head
+        return
     for i, block in enumerate(snake_list):
         if i == len(snake_list) - 1:  # Head of the snake
             pygame.draw.rect(screen, WHITE, [block[0], block[1], SNAKE_SIZE, SNAKE_SIZE])  # White head
         else:
             pygame.draw.rect(screen, color, [block[0], block[1], SNAKE_SIZE, SNAKE_SIZE])
 
+def snake_items(snake_list, color):
+    """draw_snake as dirty-rect scene items"""
+    from dirty_rect import block_item
+    last = len(snake_list) - 1
+    return [block_item(WHITE if i == last else color, block[0], block[1])
+            for i, block in enumerate(snake_list)]
+
+def interpolated_body(previous, body, alpha):
+    """Snake blocks drawn alpha of the way from where they were before the last move"""
+    from fixed_timestep import lerp_position
+    # Pair blocks from the head back; a block that just grew starts at the old tail
+    current = list(body)
+    offset = len(current) - len(previous)
+    blocks = []
+    for i, block in enumerate(current):
+        before = previous[max(0, i - offset)] if previous else block
+        x, y = lerp_position(before, block, alpha, SNAKE_SIZE)
+        blocks.append((round(x), round(y)))
+    return blocks
+
 def display_message(msg, color, x, y):
-    text = font.render(msg, True, color)
+    text = shared_cache.render(font, msg, color)
     screen.blit(text, [x, y])
 
-# Bot pathfinding using Dijkstra's algorithm
-def find_path_to_food(snake_head, food_pos, obstacles, grid_width, grid_height):
-    # Convert positions to grid coordinates
-    start = (snake_head[0] // SNAKE_SIZE, snake_head[1] // SNAKE_SIZE)
-    goal = (food_pos[0] // SNAKE_SIZE, food_pos[1] // SNAKE_SIZE)
-    
-    # Create set of obstacles (snake bodies)
-    obstacle_set = set((pos[0] // SNAKE_SIZE, pos[1] // SNAKE_SIZE) for pos in obstacles)
-    
-    # Queue for Dijkstra's algorithm
-    queue = [(0, start, [])]  # (cost, position, path)
-    visited = set()
-    
-    # Possible moves: up, right, down, left
-    directions = [
-        (0, -1),  # up
-        (1, 0),   # right
-        (0, 1),   # down
-        (-1, 0)   # left
-    ]
-    
-    while queue:
-        cost, current, path = heapq.heappop(queue)
-        
-        # Convert to grid coordinates
-        current_x, current_y = current
-        
-        # If we've reached the goal
-        if current == goal:
-            if not path:  # If path is empty, move in any valid direction
-                for dx, dy in directions:
-                    nx, ny = current_x + dx, current_y + dy
-                    if 0 <= nx < grid_width and 0 <= ny < grid_height and (nx, ny) not in obstacle_set:
-                        return (dx * SNAKE_SIZE, dy * SNAKE_SIZE)
-            else:
-                # Return the first step in the path
-                first_step = path[0]
-                dx = first_step[0] - start[0]
-                dy = first_step[1] - start[1]
-                return (dx * SNAKE_SIZE, dy * SNAKE_SIZE)
-        
-        # Skip if we've already visited this cell
-        if current in visited:
-            continue
-            
-        visited.add(current)
-        
-        # Check all adjacent cells
-        for dx, dy in directions:
-            nx, ny = current_x + dx, current_y + dy
-            
-            # Check if the new position is valid
-            if 0 <= nx < grid_width and 0 <= ny < grid_height and (nx, ny) not in obstacle_set and (nx, ny) not in visited:
-                # Calculate Manhattan distance to the goal as a heuristic
-                h = abs(nx - goal[0]) + abs(ny - goal[1])
-                new_cost = cost + 1 + h  # Cost so far + 1 step + heuristic
-                
-                # Add new position to the queue
-                new_path = path + [(nx, ny)]
-                heapq.heappush(queue, (new_cost, (nx, ny), new_path))
-    
-    # If no path found, move in a random valid direction
-    random.shuffle(directions)
-    for dx, dy in directions:
-        nx, ny = start[0] + dx, start[1] + dy
-        if 0 <= nx < grid_width and 0 <= ny < grid_height and (nx, ny) not in obstacle_set:
-            return (dx * SNAKE_SIZE, dy * SNAKE_SIZE)
-            
-    # If completely stuck, just try to go up
-    return (0, -SNAKE_SIZE)
-
 def start_page():
+    init_fonts()
+    init_audio()
     selected_timer = 60  # Default timer (1 minute)
     game_mode = None  # "PVP" or "PVE"
     running = True
@@ -310,10 +319,10 @@ def show_preparation_screen(is_bot_game):
     # Power-ups section
     display_message("Power-ups:", WHITE, 100, 340)
     # Draw power-up examples
-    screen.blit(pygame.transform.scale(flash_image, (30, 30)), (120, 380))
+    screen.blit(powerup_image("flash.png", (30, 30), YELLOW), (120, 380))
     display_message("Speed boost (30% faster for 5s)", WHITE, 170, 380)
     
-    screen.blit(pygame.transform.scale(snow_image, (30, 30)), (120, 420))
+    screen.blit(powerup_image("snow.jpg", (30, 30), WHITE), (120, 420))
     display_message("Freeze opponent (for 3s)", WHITE, 170, 420)
     
     # Add music control information
@@ -351,64 +360,85 @@ def show_preparation_screen(is_bot_game):
         # Control frame rate
         clock.tick(30)
 
-def game_loop(game_mode, game_duration):
-    """Main game loop separated as a function to allow restarting"""
+def game_loop(game_mode, game_duration, replay=None, playback_rate=1.0):
+    """Main game loop separated as a function to allow restarting
+
+    With replay (a MatchLog), the recorded match is played back instead,
+    playback_rate times as fast as real time.
+    """
+    # Only a match needs these, so they are imported here rather than with
+    # the game, which keeps the import (and the first screen) fast
+    from dirty_rect import DirtyRectRenderer, block_item, image_item, text_item
+    from fixed_timestep import FixedTimestep
+    from frame_profiler import FrameProfiler
+    from match_replay import MatchLog
+    from plan_scheduler import PlanScheduler
+    from snake_match import SnakeMatch, default_bot
+
+    init_fonts()
+    init_audio()
     is_bot_game = (game_mode == "PVE")
-    
-    # Show preparation screen
-    show_preparation_screen(is_bot_game)
-
-    # Player 1 (Red Snake)
-    snake1_pos = [100, 50]
-    snake1_body = [[100, 50], [80, 50]]  # Start with 2 blocks
-    snake1_direction = 'RIGHT'
-    snake1_change = [SNAKE_SIZE, 0]
-    snake1_score = 0
-    snake1_fps = FPS  # Individual FPS for Player 1
-    snake1_speed_boost = 1.0  # Speed multiplier for snake 1
-    snake1_last_move_time = 0  # Last time snake 1 moved
-    snake1_frozen = False
-    snake1_frozen_start_time = None
-
-    # Player 2 (Blue Snake) / Bot
-    snake2_pos = [700, 550]
-    snake2_body = [[700, 550], [720, 550]]  # Start with 2 blocks
-    snake2_direction = 'LEFT'
-    snake2_change = [-SNAKE_SIZE, 0]
-    snake2_score = 0
-    snake2_fps = FPS  # Individual FPS for Player 2
-    snake2_speed_boost = 1.0  # Speed multiplier for snake 2
-    snake2_last_move_time = 0  # Last time snake 2 moved
-    snake2_frozen = False
-    snake2_frozen_start_time = None
-    bot_decision_time = 0  # Time tracker for bot decisions
-    bot_decision_interval = 0.1  # How often the bot makes decisions (in seconds)
-
-    # Food
-    food_pos = [random.randrange(1, (WIDTH // SNAKE_SIZE)) * SNAKE_SIZE,
-                random.randrange(1, (HEIGHT // SNAKE_SIZE)) * SNAKE_SIZE]
-    food_spawn = True
-
-    # Power-up variables
-    flash_powerup_pos = None
-    flash_powerup_active = False
-    powerup_effect_start_time_1 = None
-    powerup_effect_start_time_2 = None
-    powerup_effect_active_1 = False
-    powerup_effect_active_2 = False
-
-    # Freeze power-up variables
-    snow_powerup_pos = None
-    snow_powerup_active = False
-    snow_last_spawn_time = None
+
+    # All game rules live in the headless match engine; this loop only feeds
+    # it keyboard input and the frame time, and draws its state
+    if replay is not None:
+        match = replay.new_match()
+        bot_names = replay.bots
+    else:
+        # Show preparation screen
+        show_preparation_screen(is_bot_game)
+
+        bots = {}
+        bot_names = ['', '']
+        if is_bot_game:
+            bots[1] = default_bot
+            bot_names[1] = 'plan'
+            if BOT_MODE == "flow":
+                # The shared flow-field bot planner needs NumPy, so it is only imported when used
+                try:
+                    from flow_field import shared_flow_field_bot
+                    bots[1] = shared_flow_field_bot
+                    bot_names[1] = 'flow'
+                except ImportError:
+                    pass
+            elif BOT_MODE == "async":
+                from async_planner import async_bot
+                bots[1] = async_bot
+                bot_names[1] = 'async'
+        match = SnakeMatch(game_mode, game_duration, bots=bots)
+    snake1, snake2 = match.snakes
+    if replay is None and BOT_PLAN_BUDGET_MS is not None:
+        match.scheduler = PlanScheduler(BOT_PLAN_BUDGET_MS)
+    match_log = MatchLog.record(match, SIM_STEP, bot_names)
 
     # Game variables
-    start_time = time.time()
+    if replay is not None:
+        # Simulated time runs playback_rate times as fast as the clock
+        timestep = FixedTimestep(SIM_STEP, MAX_CATCH_UP_STEPS * max(1, math.ceil(playback_rate)),
+                                 clock=lambda: time.perf_counter() * playback_rate)
+    else:
+        timestep = FixedTimestep(SIM_STEP, MAX_CATCH_UP_STEPS)
+    flash_image = powerup_image("flash.png", FLASH_SIZE, YELLOW)
+    snow_image = powerup_image("snow.jpg", SNOW_SIZE, WHITE)
+    food_sound = assets.sound("pop.mp3")
+    if food_sound is not None:
+        food_sound.set_volume(0.7)  # Set food sound volume to 70%
+    previous_bodies = [list(snake1.body), list(snake2.body)]
+    inputs = []  # Key presses waiting for the next simulation step
+    renderer = DirtyRectRenderer(screen, BLACK, DIRTY_RECTS)
+    profiler = FrameProfiler(PROFILER)
+    match.profiler = renderer.profiler = profiler
+    if replay is None:
+        if match.scheduler is not None:
+            profiler.sources.append(match.scheduler)  # Replays defer what the recording deferred, untimed
+        if hasattr(snake2.planner, 'overlay_rows'):
+            profiler.sources.append(snake2.planner)
     running = True
 
     while running:
-        current_time = time.time()
-        screen.fill(BLACK)
+        profiler.begin_frame()
+        if match.scheduler is not None:
+            match.scheduler.begin_frame()
 
         # Event handling
         for event in pygame.event.get():
@@ -425,221 +455,132 @@ def game_loop(game_mode, game_duration):
                     else:
                         pygame.mixer.music.unpause()
                         music_playing = True
+
+                # Dirty-rect / full redraw toggle
+                if event.key == pygame.K_r:
+                    renderer.toggle()
+
+                # Profiler overlay toggle and CSV dump
+                if event.key == pygame.K_F3:
+                    profiler.toggle()
+                elif event.key == pygame.K_F4 and profiler.frames:
+                    print(f"Frame profile written to {profiler.dump_csv()}")
                 
                 # Player 1 controls (WASD)
-                if event.key == pygame.K_w and snake1_direction != 'DOWN':
-                    snake1_direction = 'UP'
-                    snake1_change = [0, -SNAKE_SIZE]
-                elif event.key == pygame.K_s and snake1_direction != 'UP':
-                    snake1_direction = 'DOWN'
-                    snake1_change = [0, SNAKE_SIZE]
-                elif event.key == pygame.K_a and snake1_direction != 'RIGHT':
-                    snake1_direction = 'LEFT'
-                    snake1_change = [-SNAKE_SIZE, 0]
-                elif event.key == pygame.K_d and snake1_direction != 'LEFT':
-                    snake1_direction = 'RIGHT'
-                    snake1_change = [SNAKE_SIZE, 0]
+                if event.key == pygame.K_w:
+                    inputs.append((0, 'UP'))
+                elif event.key == pygame.K_s:
+                    inputs.append((0, 'DOWN'))
+                elif event.key == pygame.K_a:
+                    inputs.append((0, 'LEFT'))
+                elif event.key == pygame.K_d:
+                    inputs.append((0, 'RIGHT'))
 
                 # Player 2 controls (Arrow keys) - Only if not a bot game
                 if not is_bot_game:
-                    if event.key == pygame.K_UP and snake2_direction != 'DOWN':
-                        snake2_direction = 'UP'
-                        snake2_change = [0, -SNAKE_SIZE]
-                    elif event.key == pygame.K_DOWN and snake2_direction != 'UP':
-                        snake2_direction = 'DOWN'
-                        snake2_change = [0, SNAKE_SIZE]
-                    elif event.key == pygame.K_LEFT and snake2_direction != 'RIGHT':
-                        snake2_direction = 'LEFT'
-                        snake2_change = [-SNAKE_SIZE, 0]
-                    elif event.key == pygame.K_RIGHT and snake2_direction != 'LEFT':
-                        snake2_direction = 'RIGHT'
-                        snake2_change = [SNAKE_SIZE, 0]
-
-        # Bot decision making (if in PVE mode)
-        if is_bot_game and not snake2_frozen and current_time - bot_decision_time > bot_decision_interval:
-            # Collect obstacles (both snake bodies minus the tail that will move)
-            obstacles = snake1_body[:-1] + snake2_body[:-1]
-            
-            # Find path to food
-            bot_change = find_path_to_food(snake2_pos, food_pos, obstacles, WIDTH // SNAKE_SIZE, HEIGHT // SNAKE_SIZE)
-            
-            # Update direction based on the next move
-            if bot_change == (0, -SNAKE_SIZE) and snake2_direction != 'DOWN':
-                snake2_direction = 'UP'
-                snake2_change = [0, -SNAKE_SIZE]
-            elif bot_change == (0, SNAKE_SIZE) and snake2_direction != 'UP':
-                snake2_direction = 'DOWN'
-                snake2_change = [0, SNAKE_SIZE]
-            elif bot_change == (-SNAKE_SIZE, 0) and snake2_direction != 'RIGHT':
-                snake2_direction = 'LEFT'
-                snake2_change = [-SNAKE_SIZE, 0]
-            elif bot_change == (SNAKE_SIZE, 0) and snake2_direction != 'LEFT':
-                snake2_direction = 'RIGHT'
-                snake2_change = [SNAKE_SIZE, 0]
-                
-            bot_decision_time = current_time
-
-        # Check if either snake is frozen and update frozen status
-        if snake1_frozen and current_time - snake1_frozen_start_time > 3:
-            snake1_frozen = False
-            
-        if snake2_frozen and current_time - snake2_frozen_start_time > 3:
-            snake2_frozen = False
-
-        # Move snakes based on their individual timing, if not frozen
-        if not snake1_frozen and current_time - snake1_last_move_time > (1.0 / (FPS * snake1_speed_boost)):
-            # Update snake 1 position
-            snake1_pos[0] += snake1_change[0]
-            snake1_pos[1] += snake1_change[1]
-            
-            # Wrap around screen edges
-            snake1_pos[0] %= WIDTH
-            snake1_pos[1] %= HEIGHT
-            
-            # Update snake1 body
-            snake1_body.append(list(snake1_pos))
-            
-            # Check if Player 1 eats the food
-            if abs(snake1_pos[0] - food_pos[0]) < SNAKE_SIZE and abs(snake1_pos[1] - food_pos[1]) < SNAKE_SIZE:
-                snake1_score += 1
-                food_spawn = False
+                    if event.key == pygame.K_UP:
+                        inputs.append((1, 'UP'))
+                    elif event.key == pygame.K_DOWN:
+                        inputs.append((1, 'DOWN'))
+                    elif event.key == pygame.K_LEFT:
+                        inputs.append((1, 'LEFT'))
+                    elif event.key == pygame.K_RIGHT:
+                        inputs.append((1, 'RIGHT'))
+        profiler.mark('events')
+
+        # Advance the game rules in fixed steps to catch up with the clock
+        for _ in range(timestep.advance()):
+            # Keep where each snake was before its move (a snake that is due
+            # but frozen does not move, and is drawn where it is)
+            for index, snake in enumerate(match.snakes):
+                if snake.move_timer.due():
+                    previous_bodies[index] = list(snake.body)
+            profiler.mark('movement')
+            if replay is not None:
+                inputs = replay.inputs_at(match_log.ticks)  # The keyboard only controls the display
+            for event_name, _ in match_log.step(match, inputs):
                 # Play sound effect when food is eaten
-                if has_food_sound:
+                if event_name == 'food' and food_sound is not None:
                     food_sound.play()
-            else:
-                snake1_body.pop(0)
-                
-            snake1_last_move_time = current_time
-        
-        if not snake2_frozen and current_time - snake2_last_move_time > (1.0 / (FPS * snake2_speed_boost)):
-            # Update snake 2 position
-            snake2_pos[0] += snake2_change[0]
-            snake2_pos[1] += snake2_change[1]
-            
-            # Wrap around screen edges
-            snake2_pos[0] %= WIDTH
-            snake2_pos[1] %= HEIGHT
-            
-            # Update snake2 body
-            snake2_body.append(list(snake2_pos))
-            
-            # Check if Player 2 eats the food
-            if abs(snake2_pos[0] - food_pos[0]) < SNAKE_SIZE and abs(snake2_pos[1] - food_pos[1]) < SNAKE_SIZE:
-                snake2_score += 1
-                food_spawn = False
-                # Play sound effect when food is eaten
-                if has_food_sound:
-                    food_sound.play()
-            else:
-                snake2_body.pop(0)
-                
-            snake2_last_move_time = current_time
-
-        # Respawn food
-        if not food_spawn:
-            food_pos = [random.randrange(1, (WIDTH // SNAKE_SIZE)) * SNAKE_SIZE,
-                        random.randrange(1, (HEIGHT // SNAKE_SIZE)) * SNAKE_SIZE]
-            food_spawn = True
-
-        # Power-up logic
-        elapsed_time = current_time - start_time
-
-        # Spawn speed power-up after 10 seconds and every 5 seconds after it disappears
-        if elapsed_time > 10 and not flash_powerup_active and not (powerup_effect_active_1 or powerup_effect_active_2):
-            flash_powerup_pos = [random.randrange(1, (WIDTH // (SNAKE_SIZE * 3))) * SNAKE_SIZE * 3,
-                           random.randrange(1, (HEIGHT // (SNAKE_SIZE * 3))) * SNAKE_SIZE * 3]
-            flash_powerup_active = True
-
-        # Spawn freeze power-up after 15 seconds and every 10 seconds after it disappears
-        if elapsed_time > 15 and not snow_powerup_active and (snow_last_spawn_time is None or current_time - snow_last_spawn_time > 10):
-            snow_powerup_pos = [random.randrange(1, (WIDTH // (SNAKE_SIZE * 3))) * SNAKE_SIZE * 3,
-                         random.randrange(1, (HEIGHT // (SNAKE_SIZE * 3))) * SNAKE_SIZE * 3]
-            snow_powerup_active = True
-            
-        # Check if a snake touches the speed power-up
-        if flash_powerup_active:
-            if (flash_powerup_pos[0] <= snake1_pos[0] < flash_powerup_pos[0] + SNAKE_SIZE * 3 and
-                flash_powerup_pos[1] <= snake1_pos[1] < flash_powerup_pos[1] + SNAKE_SIZE * 3):
-                flash_powerup_active = False
-                powerup_effect_active_1 = True
-                powerup_effect_start_time_1 = current_time
-                snake1_speed_boost = 1.3  # Increase Player 1's speed by 30%
-            elif (flash_powerup_pos[0] <= snake2_pos[0] < flash_powerup_pos[0] + SNAKE_SIZE * 3 and
-                  flash_powerup_pos[1] <= snake2_pos[1] < flash_powerup_pos[1] + SNAKE_SIZE * 3):
-                flash_powerup_active = False
-                powerup_effect_active_2 = True
-                powerup_effect_start_time_2 = current_time
-                snake2_speed_boost = 1.3  # Increase Player 2's speed by 30%
-
-        # Check if a snake touches the freeze power-up
-        if snow_powerup_active:
-            if (snow_powerup_pos[0] <= snake1_pos[0] < snow_powerup_pos[0] + SNAKE_SIZE * 3 and
-                snow_powerup_pos[1] <= snake1_pos[1] < snow_powerup_pos[1] + SNAKE_SIZE * 3):
-                snow_powerup_active = False
-                snow_last_spawn_time = current_time
-                snake2_frozen = True  # Freeze opponent (Player 2)
-                snake2_frozen_start_time = current_time
-            elif (snow_powerup_pos[0] <= snake2_pos[0] < snow_powerup_pos[0] + SNAKE_SIZE * 3 and
-                  snow_powerup_pos[1] <= snake2_pos[1] < snow_powerup_pos[1] + SNAKE_SIZE * 3):
-                snow_powerup_active = False
-                snow_last_spawn_time = current_time
-                snake1_frozen = True  # Freeze opponent (Player 1)
-                snake1_frozen_start_time = current_time
-
-        # End power-up effects
-        # End power-up effect after 5 seconds for Player 1
-        if powerup_effect_active_1 and current_time - powerup_effect_start_time_1 > 5:
-            powerup_effect_active_1 = False
-            snake1_speed_boost = 1.0  # Reset Player 1's speed to normal
-
-        # End power-up effect after 5 seconds for Player 2
-        if powerup_effect_active_2 and current_time - powerup_effect_start_time_2 > 5:
-            powerup_effect_active_2 = False
-            snake2_speed_boost = 1.0  # Reset Player 2's speed to normal
-
-        # Draw power-ups
-        if flash_powerup_active:
-            screen.blit(flash_image, (flash_powerup_pos[0], flash_powerup_pos[1]))
-            
-        if snow_powerup_active:
-            screen.blit(snow_image, (snow_powerup_pos[0], snow_powerup_pos[1]))
-
-        # Draw food
-        pygame.draw.rect(screen, GREEN, [food_pos[0], food_pos[1], SNAKE_SIZE, SNAKE_SIZE])
+            inputs = []
+            if match.finished:
+                break
 
-        # Draw snakes with original rectangle-based heads
-        draw_snake(snake1_body, RED)
-        draw_snake(snake2_body, BLUE if not is_bot_game else YELLOW)  # Make bot yellow to distinguish
+        # Describe the frame; the renderer works out what changed and draws that
+        scene = []
 
-        # Display scores and status effects
+        # Power-ups
+        if match.flash_powerup_active:
+            scene.append(image_item('flash', flash_image, *match.flash_powerup_pos))
+            
+        if match.snow_powerup_active:
+            scene.append(image_item('snow', snow_image, *match.snow_powerup_pos))
+
+        # Food
+        for food in match.foods:
+            scene.append(block_item(GREEN, food.pos[0], food.pos[1]))
+
+        # Snakes with original rectangle-based heads
+        # (between their last two moves, by how far each is towards its next
+        # one; move_timer already counts the last simulation step, so they
+        # are drawn the rest of that step behind, like alpha does for states)
+        since_step = (timestep.alpha - 1.0) * SIM_STEP
+        scene += snake_items(interpolated_body(previous_bodies[0], snake1.body, snake1.move_timer.phase(since_step)), RED)
+        scene += snake_items(interpolated_body(previous_bodies[1], snake2.body, snake2.move_timer.phase(since_step)), BLUE if not is_bot_game else YELLOW)  # Make bot yellow to distinguish
+
+        # Scores and status effects
         player1_name = "Player 1"
         player2_name = "Player 2" if not is_bot_game else "Bot"
         
-        display_message(f"{player1_name}: {snake1_score}", WHITE, 10, 10)
-        if snake1_frozen:
-            display_message("FROZEN!", WHITE, 10, 70)
-        display_message(f"{player2_name}: {snake2_score}", WHITE, 10, 40)
-        if snake2_frozen:
-            display_message("FROZEN!", WHITE, 10, 100)
+        scene.append(text_item(font, f"{player1_name}: {snake1.score}", WHITE, 10, 10))
+        if snake1.frozen:
+            scene.append(text_item(font, "FROZEN!", WHITE, 10, 70))
+        scene.append(text_item(font, f"{player2_name}: {snake2.score}", WHITE, 10, 40))
+        if snake2.frozen:
+            scene.append(text_item(font, "FROZEN!", WHITE, 10, 100))
 
-        # Display timer
-        remaining_time = max(0, GAME_DURATION - int(elapsed_time))
-        display_message(f"Time Left: {remaining_time}s", WHITE, WIDTH - 200, 10)
+        # Timer
+        remaining_time = max(0, GAME_DURATION - int(match.time))
+        scene.append(text_item(font, f"Time Left: {remaining_time}s", WHITE, WIDTH - 200, 10))
+
+        # Profiler overlay, under the timer
+        if profiler.enabled:
+            scene.append(profiler.overlay_item(WIDTH - 220, 45))
+
+        renderer.render(scene)
+        profiler.mark('display.update')
 
         # Check game duration
-        if current_time - start_time >= game_duration:
+        if match.finished:
             running = False
 
-        pygame.display.update()
-        
-        # Fixed frame rate for rendering only
+        # Cap the render frame rate; the simulation rate does not depend on it
         clock.tick(60)
 
-    # Return final scores
-    return snake1_score, snake2_score, is_bot_game
+    match_log.finish(match)
+    if replay is not None and match_log.scores != replay.scores:
+        print(f"Replay ended with scores {match_log.scores}, the recording with {replay.scores}")
+    elif replay is None and RECORD_MATCHES:
+        path = time.strftime("match_%Y%m%d_%H%M%S.snakelog")
+        match_log.save(path)
+        print(f"Match recorded to {path}")
 
-def main():
-    """Main function with game loop that can restart"""
+    # Return final scores
+    return snake1.score, snake2.score, is_bot_game
+
+def main(replay_path=None, playback_rate=1.0):
+    """Main function with game loop that can restart
+
+    With replay_path, plays that recorded match back and shows its end screen.
+    """
+    init()
+    if replay_path is not None:
+        from match_replay import MatchLog
+        replay = MatchLog.load(replay_path)
+        snake1_score, snake2_score, is_bot_game = game_loop(replay.game_mode, replay.duration, replay, playback_rate)
+        display_end_screen(snake1_score, snake2_score, is_bot_game)
+        pygame.quit()
+        return
     running = True
     
     while running:
@@ -660,4 +601,10 @@ def main():
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--replay", help="play back a recorded .snakelog match")
+    parser.add_argument("--rate", type=float, default=1.0, help="playback speed of --replay")
+    args = parser.parse_args()
+    main(args.replay, args.rate)
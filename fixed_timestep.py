@@ -0,0 +1,102 @@
+import time
+
+# Slack for float error when comparing accumulated time (six steps of 1/60
+# add up to 0.9999999999999999 of a 0.1s move, not 1.0)
+EPSILON = 1e-9
+
+
+class FixedTimestep:
+    """Runs a simulation at a fixed rate on the monotonic clock
+
+    Each frame, advance() adds the real time since the last frame to an
+    accumulator and returns how many whole steps of `step` seconds to
+    simulate. Whatever is left over is alpha, the fraction of a step the
+    renderer is ahead of the last simulated state, for interpolation.
+
+    A slow frame is caught up with several steps in the next frame, but at
+    most max_steps, so a long stall (window drag, breakpoint) cannot make
+    the game fast-forward; the time beyond that is dropped and counted in
+    dropped_time.
+    """
+
+    def __init__(self, step=1.0 / 60, max_steps=5, clock=time.perf_counter):
+        self.step = step
+        self.max_steps = max_steps
+        self.clock = clock
+        self.accumulator = 0.0
+        self.last_time = None
+        self.steps = 0  # steps simulated so far
+        self.dropped_time = 0.0  # seconds skipped because the simulation fell too far behind
+
+    def reset(self):
+        """Start timing from now, with an empty accumulator"""
+        self.last_time = self.clock()
+        self.accumulator = 0.0
+
+    def advance(self):
+        """Number of fixed steps to simulate this frame"""
+        now = self.clock()
+        if self.last_time is None:
+            self.last_time = now
+        self.accumulator += now - self.last_time
+        self.last_time = now
+
+        steps = int((self.accumulator + EPSILON) / self.step)
+        if steps > self.max_steps:
+            dropped = (steps - self.max_steps) * self.step
+            self.dropped_time += dropped
+            self.accumulator -= dropped
+            steps = self.max_steps
+        self.accumulator = max(0.0, self.accumulator - steps * self.step)
+        self.steps += steps
+        return steps
+
+    @property
+    def alpha(self):
+        """How far between the previous and the current step to draw (0 to 1)"""
+        return min(1.0, self.accumulator / self.step)
+
+
+class TickRate:
+    """An entity that acts `rate` times per second of simulated time
+
+    Used for snake movement, where the rate changes with the speed boost.
+    The fractional progress carries over between steps, so a snake at 10
+    moves per second stepped at 60 Hz moves exactly every 6 steps instead of
+    drifting to 7 as a "more than 0.1s since the last move" check does.
+    It fires at most once per step; ready=True makes it fire on the first.
+    """
+
+    def __init__(self, rate, ready=True):
+        self.rate = rate
+        self.progress = 1.0 if ready else 0.0
+
+    def advance(self, dt):
+        """True if the entity acts in this step, then adds the step's dt"""
+        acts = self.progress + EPSILON >= 1.0
+        if acts:
+            self.progress -= 1.0
+        # Carry at most one more action over, never a backlog of them
+        self.progress = min(self.progress + dt * self.rate, 2.0)
+        return acts
+
+    def due(self):
+        """True if the next advance() acts, without advancing"""
+        return self.progress + EPSILON >= 1.0
+
+    def phase(self, dt=0.0):
+        """How far (0 to 1) it is from its last action to the next, dt seconds after the last advance()"""
+        return min(max(self.progress + dt * self.rate, 0.0), 1.0)
+
+
+def lerp_position(previous, current, alpha, max_distance):
+    """Position alpha of the way from previous to current
+
+    Jumps longer than max_distance (wrapping around the screen edge) are not
+    interpolated, they snap to current.
+    """
+    dx = current[0] - previous[0]
+    dy = current[1] - previous[1]
+    if abs(dx) > max_distance or abs(dy) > max_distance:
+        return current
+    return (previous[0] + dx * alpha, previous[1] + dy * alpha)
@@ -0,0 +1,372 @@
+import heapq
+import random
+from array import array
+from collections import deque
+
+import numpy as np
+
+from snake_pathfinding import SNAKE_SIZE, DIRECTIONS, OccupancyGrid
+
+# Distance of cells the food cannot be reached from
+UNREACHABLE = np.iinfo(np.int32).max
+
+
+class FlowField:
+    """Distance-to-food field shared by any number of bots
+
+    One breadth-first distance transform is run from the food cell over the
+    whole grid (vectorized with NumPy, one wavefront per step). Every bot then
+    reads its next move in O(1) by stepping to the neighbor with the smallest
+    distance. The field is only recomputed lazily, so all bots deciding in
+    the same frame share it.
+
+    Occupancy changes are patched in place instead, touching only the cells
+    whose distance they change: a freed cell gets its distance and the
+    cells that get closer through it are updated breadth-first; a blocked
+    cell cuts the cells that had no other shortest path, which are then
+    reached around it. Only the food moving, or a change that would touch a
+    large part of the grid, marks the field dirty for a rebuild.
+
+    Like BotPlanner it watches an OccupancyGrid and has the same next_move
+    interface, so game_loop can use either one.
+    """
+
+    def __init__(self, grid_width, grid_height, wrap=False, occupancy=None, rng=random):
+        self.rng = rng  # source of the random fallback moves
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.wrap = wrap
+
+        if occupancy is None:
+            occupancy = OccupancyGrid(grid_width, grid_height)
+        self.occupancy = occupancy
+        occupancy.watchers.append(self)
+
+        # Arrays are indexed [y, x]; counts is a zero-copy view of the occupancy grid.
+        # The per-cell watcher callbacks use the flat Python buffers under
+        # both arrays, which index much faster than NumPy scalars
+        self._flat_counts = occupancy.counts
+        self._flat_distance = array('i', [UNREACHABLE]) * (grid_width * grid_height)
+        self.counts = np.frombuffer(occupancy.counts, dtype=np.uint8).reshape(grid_height, grid_width)
+        self.distance = np.frombuffer(self._flat_distance, dtype=np.int32).reshape(grid_height, grid_width)
+        self.goal = None
+        self.dirty = True
+
+        self.neighbors = []  # flat indices of the cells next to each cell
+        for y in range(grid_height):
+            for x in range(grid_width):
+                cells = []
+                for dx, dy in DIRECTIONS:
+                    nx, ny = x + dx, y + dy
+                    if wrap:
+                        nx %= grid_width
+                        ny %= grid_height
+                    elif not (0 <= nx < grid_width and 0 <= ny < grid_height):
+                        continue
+                    cells.append(ny * grid_width + nx)
+                self.neighbors.append(cells)
+
+        # Scratch masks reused by every rebuild
+        self._visited = np.empty((grid_height, grid_width), dtype=bool)
+        self._frontier = np.empty_like(self._visited)
+        self._grown = np.empty_like(self._visited)
+        self._shifted = np.empty(grid_width * grid_height, dtype=bool)
+
+        # Cells one occupancy change may update before a rebuild is the cheaper way
+        self._patch_limit = max(16, grid_width * grid_height // 8)
+
+        self.stats = {
+            'decisions': 0,
+            'rebuilds': 0,
+            'patches': 0  # occupancy changes applied without a rebuild
+        }
+
+    # OccupancyGrid watcher callbacks
+    def cell_blocked(self, cell):
+        if self.dirty or self._flat_counts[cell] != 1:
+            return  # Already blocked, nothing changes
+        distance = self._flat_distance
+        step = distance[cell]
+        if step == UNREACHABLE:
+            return  # Not on any path to the food
+        if step == 0:
+            self.dirty = True  # The food cell itself
+            return
+        neighbors = self.neighbors
+        self.stats['patches'] += 1
+        distance[cell] = UNREACHABLE
+
+        # Blocked cells are always UNREACHABLE, so comparing distances is
+        # enough to skip them. A cell one step further out is cut if none of
+        # its neighbors one step closer is left; usually none is, and no
+        # other distance changes
+        further = step + 1
+        for neighbor in neighbors[cell]:
+            if distance[neighbor] == further and step not in [distance[other] for other in neighbors[neighbor]]:
+                break
+        else:
+            return
+
+        # Otherwise find every cut cell, one distance at a time so that all
+        # closer cells are settled before the ones behind them are looked at
+        distance[cell] = step
+        budget = self._patch_limit
+        cut = {cell}
+        level = [cell]
+        while level:
+            closer = further - 1
+            behind = []
+            for current in level:
+                for neighbor in neighbors[current]:
+                    if distance[neighbor] != further or neighbor in cut:
+                        continue
+                    for other in neighbors[neighbor]:
+                        if distance[other] == closer and other not in cut:
+                            break
+                    else:
+                        cut.add(neighbor)
+                        behind.append(neighbor)
+            budget -= len(behind)
+            if budget <= 0:
+                self.dirty = True
+                return
+            level = behind
+            further += 1
+
+        # The cut cells are reached around it instead (if at all): start
+        # from their closest neighbor outside the cut and relax inwards
+        for current in cut:
+            distance[current] = UNREACHABLE
+        cut.discard(cell)
+        heap = []
+        for current in cut:
+            step = min([distance[neighbor] for neighbor in neighbors[current]])
+            if step != UNREACHABLE:
+                distance[current] = step + 1
+                heap.append((step + 1, current))
+        heapq.heapify(heap)
+        while heap:
+            step, current = heapq.heappop(heap)
+            if step != distance[current]:
+                continue
+            for neighbor in neighbors[current]:
+                if distance[neighbor] > step + 1 and neighbor in cut:
+                    distance[neighbor] = step + 1
+                    heapq.heappush(heap, (step + 1, neighbor))
+
+    def cell_freed(self, cell):
+        if self.dirty or self._flat_counts[cell]:
+            return  # Still blocked by another segment
+        if self.goal is not None and cell == self.goal[1] * self.grid_width + self.goal[0]:
+            self.dirty = True  # The food cell was covered, so nothing was reachable
+            return
+        distance = self._flat_distance
+        counts = self._flat_counts
+        neighbors = self.neighbors
+        step = min([distance[neighbor] for neighbor in neighbors[cell] if not counts[neighbor]], default=UNREACHABLE)
+        if step == UNREACHABLE:
+            return  # Enclosed, or only joins cells the food cannot be reached from anyway
+        distance[cell] = step + 1
+        self.stats['patches'] += 1
+
+        # Cells that are now closer through it get their new distance,
+        # breadth-first out from it, until no neighbor gets any closer.
+        # Usually that is a few cells behind the tail; a big area (a cut-off
+        # region joined back) is left to a rebuild instead
+        queue = deque([cell])
+        budget = self._patch_limit
+        while queue:
+            current = queue.popleft()
+            closer = distance[current] + 1
+            for neighbor in neighbors[current]:
+                if distance[neighbor] > closer and not counts[neighbor]:
+                    budget -= 1
+                    if not budget:
+                        self.dirty = True
+                        return
+                    distance[neighbor] = closer
+                    queue.append(neighbor)
+
+    def cells_reset(self):
+        self.dirty = True
+
+    def set_food(self, food_pos):
+        goal = (food_pos[0] // SNAKE_SIZE, food_pos[1] // SNAKE_SIZE)
+        if goal != self.goal:
+            self.goal = goal
+            self.dirty = True
+
+    def rebuild(self):
+        """Breadth-first distance transform from the food cell
+
+        The wavefront is grown like in Arena._rebuild_distance, with shifts
+        of the flat arrays into preallocated masks (the row ends are fixed
+        with strided writes rather than column masks), and each wavefront's
+        distance is written in place, so nothing is allocated per step.
+        """
+        self.stats['rebuilds'] += 1
+        distance = self.distance
+        distance[:] = UNREACHABLE
+        self.dirty = False
+
+        gx, gy = self.goal
+        counts = self.counts
+        if counts[gy, gx]:
+            return
+
+        frontier, grown, visited, shifted = self._frontier, self._grown, self._visited, self._shifted
+        width = self.grid_width
+        wrap = self.wrap
+        np.not_equal(counts, 0, out=visited)  # Blocked cells count as visited
+        frontier[:] = False
+        frontier[gy, gx] = True
+        visited[gy, gx] = True
+        distance[gy, gx] = 0
+
+        flat_frontier, flat_grown = frontier.ravel(), grown.ravel()
+        steps = 0
+        while True:
+            # Grow the wavefront by one cell in every direction. A flat
+            # shift by one carries the end of each row into the start of
+            # the next; those cells are overwritten with the other end of
+            # the same row on a wrapping board and cleared otherwise. The
+            # rows that fall off one edge are added at the other
+            flat_grown[1:] = flat_frontier[:-1]
+            flat_grown[::width] = flat_frontier[width - 1::width] if wrap else False
+            shifted[:-1] = flat_frontier[1:]
+            shifted[width - 1::width] = flat_frontier[::width] if wrap else False
+            flat_grown |= shifted
+            flat_grown[width:] |= flat_frontier[:-width]
+            flat_grown[:-width] |= flat_frontier[width:]
+            if wrap:
+                flat_grown[:width] |= flat_frontier[-width:]
+                flat_grown[-width:] |= flat_frontier[:width]
+
+            np.greater(grown, visited, out=grown)  # grown and not visited
+            if not np.count_nonzero(grown):
+                break
+            steps += 1
+            visited |= grown
+            np.copyto(distance, steps, where=grown)
+            frontier, grown = grown, frontier
+            flat_frontier, flat_grown = flat_grown, flat_frontier
+
+    def next_move(self, snake_head, food_pos):
+        """Next move for a bot, with the same return contract as find_path_to_food"""
+        self.stats['decisions'] += 1
+        self.set_food(food_pos)
+        if self.dirty:
+            self.rebuild()
+
+        x, y = snake_head[0] // SNAKE_SIZE, snake_head[1] // SNAKE_SIZE
+        width = self.grid_width
+        distance = self._flat_distance
+        counts = self._flat_counts
+        best = None
+        best_distance = distance[y * width + x] or UNREACHABLE
+        options = []
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if self.wrap:
+                nx %= self.grid_width
+                ny %= self.grid_height
+            elif not (0 <= nx < self.grid_width and 0 <= ny < self.grid_height):
+                continue
+            cell = ny * width + nx
+            if counts[cell]:
+                continue
+            options.append((dx, dy))
+            # Follow the gradient downhill towards the food
+            if distance[cell] < best_distance:
+                best = (dx, dy)
+                best_distance = distance[cell]
+
+        if best is not None:
+            return (best[0] * SNAKE_SIZE, best[1] * SNAKE_SIZE)
+
+        # On the food or cut off from it: move in a random valid direction
+        if options:
+            dx, dy = self.rng.choice(options)
+            return (dx * SNAKE_SIZE, dy * SNAKE_SIZE)
+
+        # If completely stuck, just try to go up
+        return (0, -SNAKE_SIZE)
+
+
+def shared_flow_field_bot(grid_width, grid_height, occupancy, rng):
+    """SnakeMatch bot factory: every bot of a match reads the same FlowField"""
+    for watcher in occupancy.watchers:
+        if isinstance(watcher, FlowField):
+            return watcher
+    return FlowField(grid_width, grid_height, wrap=True, occupancy=occupancy, rng=rng)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from snake_match import SnakeMatch
+    from snake_pathfinding import SearchBot
+
+    parser = argparse.ArgumentParser(description="Cost per bot decision of the flow field and a fresh A* search")
+    parser.add_argument("--seeds", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=60)
+    args = parser.parse_args()
+
+    # Seconds spent in next_move, and in the field's occupancy callbacks
+    # (which run while the snakes move, outside next_move)
+    spent = {'decide': 0.0, 'upkeep': 0.0}
+
+    class TimedField(FlowField):
+        def cell_blocked(self, cell):
+            start = time.perf_counter()
+            super().cell_blocked(cell)
+            spent['upkeep'] += time.perf_counter() - start
+
+        def cell_freed(self, cell):
+            start = time.perf_counter()
+            super().cell_freed(cell)
+            spent['upkeep'] += time.perf_counter() - start
+
+        def next_move(self, snake_head, food_pos):
+            start = time.perf_counter()
+            move = super().next_move(snake_head, food_pos)
+            spent['decide'] += time.perf_counter() - start
+            return move
+
+    class TimedSearch(SearchBot):
+        def next_move(self, snake_head, food_pos):
+            start = time.perf_counter()
+            move = super().next_move(snake_head, food_pos)
+            spent['decide'] += time.perf_counter() - start
+            return move
+
+    def timed_field(grid_width, grid_height, occupancy, rng):
+        for watcher in occupancy.watchers:
+            if isinstance(watcher, TimedField):
+                return watcher
+        return TimedField(grid_width, grid_height, wrap=True, occupancy=occupancy, rng=rng)
+
+    def timed_search(grid_width, grid_height, occupancy, rng):
+        return TimedSearch(grid_width, grid_height, wrap=True, occupancy=occupancy, rng=rng)
+
+    # Both snakes driven by the same kind of bot, the flow bots sharing one
+    # field like shared_flow_field_bot
+    print(f"{'bot':<12}{'decide ms':>11}{'upkeep ms':>11}{'total ms':>10}{'rebuilds':>10}{'patches':>9}")
+    totals = {}
+    for label, bot in (("search_bot", timed_search), ("flow_field", timed_field)):
+        spent['decide'] = spent['upkeep'] = 0.0
+        decisions = rebuilds = patches = 0
+        for seed in range(args.seeds):
+            match = SnakeMatch("PVE", args.duration, seed, bots={0: bot, 1: bot})
+            while not match.finished:
+                match.step((), 1.0 / 60)
+            for planner in {snake.planner for snake in match.snakes}:
+                decisions += planner.stats['decisions']
+                rebuilds += planner.stats.get('rebuilds', 0)
+                patches += planner.stats.get('patches', 0)
+        decide, upkeep = 1000 * spent['decide'] / decisions, 1000 * spent['upkeep'] / decisions
+        totals[label] = decide + upkeep
+        print(f"{label:<12}{decide:>11.3f}{upkeep:>11.3f}{decide + upkeep:>10.3f}{rebuilds:>10}{patches:>9}")
+    print(f"per decision (ms, upkeep included): flow field {totals['flow_field']:.3f}, "
+          f"search {totals['search_bot']:.3f}")
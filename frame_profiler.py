@@ -0,0 +1,177 @@
+import csv
+import time
+from collections import deque
+
+import pygame
+
+from dirty_rect import image_item
+from snake_pathfinding import search_stats
+
+# The parts of a game_loop frame, in the order they run
+PHASES = ['events', 'bot', 'movement', 'power-ups', 'draw', 'display.update']
+
+# Frame time histogram: 2 ms buckets up to 40 ms, the last one catches the rest
+HISTOGRAM_BUCKET = 0.002
+HISTOGRAM_BUCKETS = 20
+
+OVERLAY_REFRESH = 0.25  # Seconds between redraws of the overlay text
+OVERLAY_BACKGROUND = (0, 0, 0, 190)
+OVERLAY_TEXT = (220, 220, 220)
+OVERLAY_BARS = (90, 200, 90)
+OVERLAY_SLOW_BARS = (220, 80, 80)  # Buckets slower than a 60 Hz frame
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[rank]
+
+
+class FrameProfiler:
+    """Rolling per-phase timings of the game loop, with an on-screen overlay
+
+    game_loop calls begin_frame() at the top of each frame and
+    mark(phase) after each part of it; mark charges the time since the
+    previous mark to that phase, so a phase that runs several times a frame
+    (the match steps) adds up. SnakeMatch.step marks 'bot', 'movement' and
+    'power-ups' itself when its profiler attribute is set, and
+    DirtyRectRenderer marks 'draw' right before it updates the display.
+
+    A frame's time is the interval between two begin_frame() calls, so it
+    includes the clock.tick wait the phases do not. The last history frames
+    are kept for the percentiles, the histogram and dump_csv(); path
+    searches are counted from snake_pathfinding.search_stats. Objects in
+    sources (a PlanScheduler, an AsyncPlanner) add their overlay_rows().
+
+    While disabled, begin_frame() and mark() return after one attribute
+    check and nothing is recorded.
+    """
+
+    def __init__(self, enabled=False, history=600, phases=PHASES, clock=time.perf_counter):
+        self.enabled = enabled
+        self.phases = list(phases)
+        self.clock = clock
+        self.frames = deque(maxlen=history)  # (start, frame seconds, {phase: seconds}, path searches)
+        self.current = None  # {phase: seconds} of the frame being measured, None while disabled
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+        self.searches_at_start = 0
+        self.font = None
+        self.overlay = None
+        self.overlay_time = float('-inf')
+        self.overlay_version = 0
+        self.sources = []  # Objects whose overlay_rows() are shown too
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.current = None
+
+    def begin_frame(self):
+        """Close the previous frame's sample and start timing a new one"""
+        if not self.enabled:
+            return
+        now = self.clock()
+        searches = search_stats['searches']
+        if self.current is not None:
+            self.frames.append((self.frame_start, now - self.frame_start, self.current,
+                                searches - self.searches_at_start))
+        self.current = dict.fromkeys(self.phases, 0.0)
+        self.frame_start = self.last_mark = now
+        self.searches_at_start = searches
+
+    def mark(self, phase):
+        """Charge the time since the previous mark to phase"""
+        if self.current is None:
+            return
+        now = self.clock()
+        self.current[phase] = self.current.get(phase, 0.0) + now - self.last_mark
+        self.last_mark = now
+
+    def phase_means(self, frames=60):
+        """Mean milliseconds per frame of each phase over the last frames"""
+        recent = list(self.frames)[-frames:]
+        if not recent:
+            return {phase: 0.0 for phase in self.phases}
+        return {phase: 1000 * sum(sample[2].get(phase, 0.0) for sample in recent) / len(recent)
+                for phase in self.phases}
+
+    def frame_percentiles(self):
+        """(p50, p95, p99) frame time in milliseconds"""
+        times = sorted(sample[1] for sample in self.frames)
+        return tuple(1000 * percentile(times, fraction) for fraction in (0.50, 0.95, 0.99))
+
+    def histogram(self):
+        """Frame counts per HISTOGRAM_BUCKET wide bucket"""
+        counts = [0] * HISTOGRAM_BUCKETS
+        for sample in self.frames:
+            counts[min(HISTOGRAM_BUCKETS - 1, int(sample[1] / HISTOGRAM_BUCKET))] += 1
+        return counts
+
+    def searches_per_second(self):
+        """Path searches in the last second of frames"""
+        if not self.frames:
+            return 0
+        newest = self.frames[-1][0]
+        return sum(sample[3] for sample in self.frames if sample[0] > newest - 1.0)
+
+    def dump_csv(self, path=None):
+        """Write every kept frame to a CSV file; returns its path"""
+        if path is None:
+            path = time.strftime("frame_profile_%Y%m%d_%H%M%S.csv")
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "start_s", "frame_ms"] + [f"{phase}_ms" for phase in self.phases]
+                            + ["path_searches"])
+            first = self.frames[0][0] if self.frames else 0.0
+            for i, (start, seconds, phases, searches) in enumerate(self.frames):
+                writer.writerow([i, f"{start - first:.6f}", f"{1000 * seconds:.3f}"]
+                                + [f"{1000 * phases.get(phase, 0.0):.3f}" for phase in self.phases]
+                                + [searches])
+        return path
+
+    def overlay_item(self, x, y):
+        """Scene item for the overlay, redrawn every OVERLAY_REFRESH seconds"""
+        now = self.clock()
+        if self.overlay is None or now - self.overlay_time > OVERLAY_REFRESH:
+            self.overlay = self.draw_overlay()
+            self.overlay_time = now
+            self.overlay_version += 1  # A new key, so the dirty-rect renderer redraws it
+        return image_item(f"profiler {self.overlay_version}", self.overlay, x, y)
+
+    def draw_overlay(self):
+        """The overlay surface: phase means, percentiles, searches and a histogram"""
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+        p50, p95, p99 = self.frame_percentiles()
+        # (label, value) rows; the default font is not monospaced, so values are right aligned
+        rows = [(phase, f"{ms:.2f} ms") for phase, ms in self.phase_means().items()]
+        rows += [("frame p50", f"{p50:.1f} ms"), ("frame p95", f"{p95:.1f} ms"), ("frame p99", f"{p99:.1f} ms"),
+                 ("path searches", f"{self.searches_per_second()}/s")]
+        for source in self.sources:
+            rows += source.overlay_rows()
+        rows = [(self.font.render(label, True, OVERLAY_TEXT), self.font.render(value, True, OVERLAY_TEXT))
+                for label, value in rows]
+
+        line_height = self.font.get_linesize()
+        bar_width, histogram_height = 10, 40
+        text_width = max(label.get_width() for label, _ in rows) + 20 + max(value.get_width() for _, value in rows)
+        width = max(HISTOGRAM_BUCKETS * bar_width, text_width) + 10
+        height = len(rows) * line_height + histogram_height + 15
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        surface.fill(OVERLAY_BACKGROUND)
+        for i, (label, value) in enumerate(rows):
+            surface.blit(label, (5, 5 + i * line_height))
+            surface.blit(value, (width - 5 - value.get_width(), 5 + i * line_height))
+
+        # Frame time histogram, bars scaled to the fullest bucket
+        counts = self.histogram()
+        tallest = max(counts) or 1
+        bottom = height - 5
+        for i, count in enumerate(counts):
+            bar_height = round(histogram_height * count / tallest)
+            slow = (i + 1) * HISTOGRAM_BUCKET > 1.0 / 60
+            pygame.draw.rect(surface, OVERLAY_SLOW_BARS if slow else OVERLAY_BARS,
+                             (5 + i * bar_width, bottom - bar_height, bar_width - 1, bar_height))
+        return surface
@@ -0,0 +1,597 @@
+import random
+import sys
+from collections import deque
+
+import pygame
+
+from fixed_timestep import FixedTimestep, TickRate
+from frame_profiler import FrameProfiler
+from snake_match import FPS, BOT_DECISION_INTERVAL
+from snake_pathfinding import SNAKE_SIZE, DIRECTIONS
+from text_cache import shared_cache
+
+# Direction codes are indices into DIRECTIONS (0 up, 1 right, 2 down, 3 left)
+DIRECTION_CODES = {'UP': 0, 'RIGHT': 1, 'DOWN': 2, 'LEFT': 3}
+
+# World settings
+WORLD_WIDTH, WORLD_HEIGHT = 2000, 2000  # Cells, wrapping at the edges like the window does
+CHUNK_CELLS = 16  # Chunks are 16x16 cells; world sizes must be a multiple of this
+VIEW_WIDTH, VIEW_HEIGHT = 800, 600  # The window, SNAKE_SIZE pixels a cell as in the two-player game
+ACTIVE_MARGIN = 1  # Chunks around the viewport that are simulated (and generated)
+KEEP_MARGIN = 2  # Chunks around the viewport that stay loaded; beyond it they are dropped
+PERCEPTION_CHUNKS = 1  # Bots see food in the chunks this far around their head's
+FOOD_PER_CHUNK = 2
+FOOD_SPAWN_TRIES = 16  # Cells drawn for a food before giving up on placing it
+BOT_CHANCE = 0.2  # Chance a freshly generated chunk has a bot in it
+
+# The game rules run at a fixed rate, as in game_loop
+SIM_STEP = 1.0 / 60
+MAX_CATCH_UP_STEPS = 5
+CAMERA_FOLLOW = 8.0  # How quickly the camera catches up with the player (per second)
+
+# Colors
+BACKGROUND = (0, 0, 0)
+CHUNK_LINES = (25, 25, 25)
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+RED = (255, 0, 0)
+
+
+class Chunk:
+    """One CHUNK_CELLS square of the world
+
+    counts are the snake segments on each cell (so overlapping snakes are
+    kept track of, as in OccupancyGrid), segments their total, food the
+    local cell indices holding food and heads the snakes whose head is in
+    the chunk. generated is set once its food and bots were created.
+    """
+
+    def __init__(self):
+        self.counts = bytearray(CHUNK_CELLS * CHUNK_CELLS)
+        self.segments = 0
+        self.food = set()
+        self.heads = set()
+        self.generated = False
+
+    def empty(self):
+        return not self.segments and not self.food and not self.heads
+
+    def is_free(self, cell):
+        """True if a food can go on the local cell: no food and no snake there"""
+        return cell not in self.food and not self.counts[cell]
+
+
+class ChunkedGrid:
+    """Sparse, wrapping world grid stored as a dict of Chunks
+
+    Only chunks something was written to exist: a cell in a missing chunk
+    is empty. A chunk is deleted again as soon as it holds nothing, and
+    LargeWorld drops whole chunks that fall out of range, so memory follows
+    the loaded chunks, not width * height.
+    """
+
+    def __init__(self, width, height):
+        if width % CHUNK_CELLS or height % CHUNK_CELLS:
+            raise ValueError(f"world size must be a multiple of {CHUNK_CELLS} cells")
+        self.width = width
+        self.height = height
+        self.chunks_x = width // CHUNK_CELLS
+        self.chunks_y = height // CHUNK_CELLS
+        self.chunks = {}  # (chunk x, chunk y) -> Chunk
+
+    def locate(self, x, y):
+        """(chunk key, local cell index) of a world cell"""
+        return (x // CHUNK_CELLS, y // CHUNK_CELLS), (y % CHUNK_CELLS) * CHUNK_CELLS + x % CHUNK_CELLS
+
+    def chunk(self, key):
+        """The chunk at key, created if it does not exist yet"""
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = Chunk()
+        return chunk
+
+    def release(self, key, chunk):
+        if chunk.empty() and not chunk.generated:
+            del self.chunks[key]
+
+    def add(self, x, y):
+        key, cell = self.locate(x, y)
+        chunk = self.chunk(key)
+        chunk.counts[cell] += 1
+        chunk.segments += 1
+
+    def remove(self, x, y):
+        key, cell = self.locate(x, y)
+        chunk = self.chunks.get(key)
+        if chunk is not None and chunk.counts[cell]:
+            chunk.counts[cell] -= 1
+            chunk.segments -= 1
+            self.release(key, chunk)
+
+    def is_occupied(self, x, y):
+        key, cell = self.locate(x, y)
+        chunk = self.chunks.get(key)
+        return chunk is not None and chunk.counts[cell] != 0
+
+    def add_food(self, x, y):
+        key, cell = self.locate(x, y)
+        self.chunk(key).food.add(cell)
+
+    def take_food(self, x, y):
+        """Remove the food on a cell; True if there was one"""
+        key, cell = self.locate(x, y)
+        chunk = self.chunks.get(key)
+        if chunk is None or cell not in chunk.food:
+            return False
+        chunk.food.discard(cell)
+        return True
+
+    def keys_around(self, cx, cy, radius_x, radius_y):
+        """Chunk keys within the given chunk distances of (cx, cy), wrapping"""
+        keys = set()
+        for dy in range(-radius_y, radius_y + 1):
+            for dx in range(-radius_x, radius_x + 1):
+                keys.add(((cx + dx) % self.chunks_x, (cy + dy) % self.chunks_y))
+        return keys
+
+    def memory_bytes(self):
+        """Approximate bytes held by the loaded chunks"""
+        return sum(sys.getsizeof(chunk) + sys.getsizeof(chunk.counts) + sys.getsizeof(chunk.food)
+                   + sys.getsizeof(chunk.heads) for chunk in self.chunks.values())
+
+
+class WorldSnake:
+    """A snake in the large world, positions in cells"""
+
+    def __init__(self, snake_id, body, direction, is_bot):
+        self.id = snake_id
+        self.direction = direction
+        self.body = deque(body)  # Tail first, head last
+        self.score = 0
+        self.move_timer = TickRate(FPS)
+        self.is_bot = is_bot
+        self.decision_time = float('-inf')
+
+    @property
+    def head(self):
+        return self.body[-1]
+
+
+class LargeWorld:
+    """A large wrapping world streamed in chunks around the player
+
+    The rules are the two-player game's (move FPS times a second, wrap at
+    the edges, grow on food, pass through other snakes) on a world of
+    width x height cells, far larger than the window. Only the chunks in
+    and around the viewport, which follows the player's head, exist:
+
+    - chunks within ACTIVE_MARGIN of the viewport are generated on first
+      use (FOOD_PER_CHUNK foods and maybe a bot, from a random.Random
+      seeded with the world seed and the chunk, so the same chunk always
+      comes back the same) and every snake whose head is in one is
+      simulated; the rest sleep
+    - chunks beyond KEEP_MARGIN are dropped with the bots whose head is
+      in them, and generated again when the player comes back
+    - bots only look at the food in the chunks PERCEPTION_CHUNKS around
+      their head, and finding what a head is on is one chunk lookup
+
+    So the work per step and the memory depend on the viewport and the
+    snakes near it, not on the size of the world.
+    """
+
+    def __init__(self, width=WORLD_WIDTH, height=WORLD_HEIGHT, seed=None, duration=None,
+                 view_cells=(VIEW_WIDTH // SNAKE_SIZE, VIEW_HEIGHT // SNAKE_SIZE), autopilot=False):
+        self.grid = ChunkedGrid(width, height)
+        self.width = width
+        self.height = height
+        if seed is None:
+            seed = random.randrange(2 ** 63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.duration = duration  # None plays until the window is closed
+        self.time = 0.0
+        self.finished = False
+        self.profiler = None  # Set to a FrameProfiler to time the phases of step()
+
+        # Chunks the viewport spans from the player's chunk, in each direction
+        self.view_radius = (view_cells[0] // (2 * CHUNK_CELLS) + 1, view_cells[1] // (2 * CHUNK_CELLS) + 1)
+        self.snakes = {}  # id -> WorldSnake, only the loaded ones
+        self.next_id = 0
+        self.player = self._add_snake((width // 2, height // 2), DIRECTION_CODES['RIGHT'], autopilot)
+        self.player_chunk = None
+        self.active = set()  # Chunk keys being simulated
+        self._stream()
+
+    def _add_snake(self, head, direction, is_bot):
+        tail = self.neighbor(head, (direction + 2) % 4)
+        snake = WorldSnake(self.next_id, [tail, head], direction, is_bot)
+        self.next_id += 1
+        self.snakes[snake.id] = snake
+        for x, y in snake.body:
+            self.grid.add(x, y)
+        key, _ = self.grid.locate(*head)
+        self.grid.chunk(key).heads.add(snake.id)
+        return snake
+
+    def _remove_snake(self, snake):
+        key, _ = self.grid.locate(*snake.head)
+        chunk = self.grid.chunks.get(key)
+        if chunk is not None:
+            chunk.heads.discard(snake.id)
+        for x, y in snake.body:
+            self.grid.remove(x, y)
+        del self.snakes[snake.id]
+
+    def _generate(self, key, chunk):
+        """Create a chunk's food and maybe a bot, the same way every time"""
+        chunk.generated = True
+        rng = random.Random(f"{self.seed}:{key[0]}:{key[1]}")
+        left, top = key[0] * CHUNK_CELLS, key[1] * CHUNK_CELLS
+        for _ in range(FOOD_PER_CHUNK):
+            # Redraw cells that have food or a snake on them (food is a set,
+            # a second food on a cell would merge into the first)
+            for _ in range(FOOD_SPAWN_TRIES):
+                cell = rng.randrange(CHUNK_CELLS * CHUNK_CELLS)
+                if chunk.is_free(cell):
+                    chunk.food.add(cell)
+                    break
+        if rng.random() < BOT_CHANCE:
+            # One cell in from the edges, so the tail is in the same chunk
+            head = (left + rng.randrange(1, CHUNK_CELLS - 1), top + rng.randrange(1, CHUNK_CELLS - 1))
+            if not self.grid.is_occupied(*head):
+                self._add_snake(head, rng.randrange(4), True)
+
+    def _stream(self):
+        """Generate the chunks that came into range and drop the ones that left it"""
+        grid = self.grid
+        key, _ = grid.locate(*self.player.head)
+        if key == self.player_chunk:
+            return
+        self.player_chunk = key
+        radius_x, radius_y = self.view_radius
+        self.active = grid.keys_around(key[0], key[1], radius_x + ACTIVE_MARGIN, radius_y + ACTIVE_MARGIN)
+        for active in self.active:
+            chunk = grid.chunk(active)
+            if not chunk.generated:
+                self._generate(active, chunk)
+
+        keep = grid.keys_around(key[0], key[1], radius_x + KEEP_MARGIN, radius_y + KEEP_MARGIN)
+        for far in [far for far in grid.chunks if far not in keep]:
+            chunk = grid.chunks.get(far)
+            if chunk is None:
+                continue
+            for snake_id in list(chunk.heads):
+                if snake_id != self.player.id:
+                    self._remove_snake(self.snakes[snake_id])
+            chunk = grid.chunks.get(far)
+            if chunk is not None:
+                # Body segments of snakes still in range keep the chunk, without its food
+                chunk.food.clear()
+                chunk.generated = False
+                grid.release(far, chunk)
+
+    def awake(self):
+        """The snakes simulated this step: heads in the active chunks"""
+        chunks = self.grid.chunks
+        awake = []
+        for key in self.active:
+            chunk = chunks.get(key)
+            if chunk is not None and chunk.heads:
+                awake.extend(self.snakes[snake_id] for snake_id in chunk.heads)
+        return awake
+
+    def turn(self, snake, direction):
+        """Change a snake's direction code, unless it would reverse onto itself"""
+        if direction != (snake.direction + 2) % 4:
+            snake.direction = direction
+
+    def neighbor(self, cell, direction):
+        dx, dy = DIRECTIONS[direction]
+        return ((cell[0] + dx) % self.width, (cell[1] + dy) % self.height)
+
+    def distance(self, a, b):
+        """Wrapping Manhattan distance in cells"""
+        dx = abs(a[0] - b[0])
+        dy = abs(a[1] - b[1])
+        return min(dx, self.width - dx) + min(dy, self.height - dy)
+
+    def visible_food(self, snake):
+        """World cells of the food a bot can see"""
+        key, _ = self.grid.locate(*snake.head)
+        food = []
+        chunks = self.grid.chunks
+        for cx, cy in self.grid.keys_around(key[0], key[1], PERCEPTION_CHUNKS, PERCEPTION_CHUNKS):
+            chunk = chunks.get((cx, cy))
+            if chunk is not None:
+                left, top = cx * CHUNK_CELLS, cy * CHUNK_CELLS
+                food.extend((left + cell % CHUNK_CELLS, top + cell // CHUNK_CELLS) for cell in chunk.food)
+        return food
+
+    def decide(self, snake):
+        """Head for the nearest food in sight over free cells, or wander"""
+        head = snake.head
+        food = self.visible_food(snake)
+        target = min(food, key=lambda cell: self.distance(head, cell)) if food else None
+        options = [direction for direction in range(4)
+                   if direction != (snake.direction + 2) % 4
+                   and not self.grid.is_occupied(*self.neighbor(head, direction))]
+        if not options:
+            return
+        if target is not None:
+            snake.direction = min(options, key=lambda direction: self.distance(self.neighbor(head, direction), target))
+        elif snake.direction not in options or self.rng.random() < 0.1:
+            snake.direction = self.rng.choice(options)
+
+    def step(self, dt, inputs=()):
+        """Advance the world by dt seconds
+
+        inputs is a sequence of direction codes for the player. Returns the
+        snakes that ate food this step.
+        """
+        self.time += dt
+        now = self.time
+        profiler = self.profiler
+
+        for direction in inputs:
+            self.turn(self.player, direction)
+
+        awake = self.awake()
+        for snake in awake:
+            if snake.is_bot and now - snake.decision_time > BOT_DECISION_INTERVAL:
+                self.decide(snake)
+                snake.decision_time = now
+        if profiler is not None:
+            profiler.mark('bot')
+
+        grid = self.grid
+        eaten = []
+        for snake in awake:
+            if not snake.move_timer.advance(dt):
+                continue
+            old_key, _ = grid.locate(*snake.head)
+            head = self.neighbor(snake.head, snake.direction)
+            snake.body.append(head)
+            grid.add(*head)
+            key, _ = grid.locate(*head)
+            if key != old_key:
+                grid.chunk(key).heads.add(snake.id)
+                old_chunk = grid.chunks.get(old_key)
+                if old_chunk is not None:
+                    old_chunk.heads.discard(snake.id)
+                    grid.release(old_key, old_chunk)
+
+            if grid.take_food(*head):
+                snake.score += 1
+                eaten.append(snake)
+            else:
+                grid.remove(*snake.body.popleft())
+
+        # Eaten food comes back on a random free cell of the simulated area
+        # (a crowded area can lose it after FOOD_SPAWN_TRIES draws)
+        active = list(self.active)
+        for _ in eaten:
+            for _ in range(FOOD_SPAWN_TRIES):
+                chunk = grid.chunk(self.rng.choice(active))
+                cell = self.rng.randrange(CHUNK_CELLS * CHUNK_CELLS)
+                if chunk.is_free(cell):
+                    chunk.food.add(cell)
+                    break
+        self._stream()
+        if profiler is not None:
+            profiler.mark('movement')
+
+        if self.duration is not None and now >= self.duration:
+            self.finished = True
+        return eaten
+
+
+class LargeWorldRenderer:
+    """Draws the part of the world under a camera that follows the player
+
+    The camera eases towards the player's head (in world pixels, taking
+    the shorter way across the wrap). Only the chunks overlapping the
+    viewport are looked at for food and only the snakes whose head is in
+    an active chunk are drawn, each segment clipped to the window, so the
+    cost does not grow with the world.
+    """
+
+    def __init__(self, screen, world):
+        self.screen = screen
+        self.world = world
+        self.world_pixels = (world.width * SNAKE_SIZE, world.height * SNAKE_SIZE)
+        head = world.player.head
+        self.camera = [head[0] * SNAKE_SIZE + SNAKE_SIZE / 2, head[1] * SNAKE_SIZE + SNAKE_SIZE / 2]
+        self.show_chunks = False
+
+    def follow(self, dt):
+        """Move the camera part of the way to the player's head"""
+        head = self.world.player.head
+        fraction = min(1.0, dt * CAMERA_FOLLOW)
+        for axis in (0, 1):
+            size = self.world_pixels[axis]
+            target = head[axis] * SNAKE_SIZE + SNAKE_SIZE / 2
+            delta = (target - self.camera[axis] + size / 2) % size - size / 2
+            self.camera[axis] = (self.camera[axis] + delta * fraction) % size
+
+    def to_screen(self, x, y):
+        """Window position of a world cell, wrapped to the copy nearest the camera"""
+        width, height = self.world_pixels
+        view_width, view_height = self.screen.get_size()
+        sx = (x * SNAKE_SIZE - self.camera[0] + width / 2) % width - width / 2 + view_width / 2
+        sy = (y * SNAKE_SIZE - self.camera[1] + height / 2) % height - height / 2 + view_height / 2
+        return int(sx), int(sy)
+
+    def visible_keys(self):
+        """Keys of the chunks overlapping the window"""
+        world = self.world
+        view_width, view_height = self.screen.get_size()
+        chunk_pixels = CHUNK_CELLS * SNAKE_SIZE
+        left = int((self.camera[0] - view_width / 2) // chunk_pixels)
+        top = int((self.camera[1] - view_height / 2) // chunk_pixels)
+        right = int((self.camera[0] + view_width / 2) // chunk_pixels)
+        bottom = int((self.camera[1] + view_height / 2) // chunk_pixels)
+        return {(cx % world.grid.chunks_x, cy % world.grid.chunks_y)
+                for cy in range(top, bottom + 1) for cx in range(left, right + 1)}
+
+    def draw(self):
+        screen = self.screen
+        world = self.world
+        view_width, view_height = screen.get_size()
+        screen.fill(BACKGROUND)
+        visible = self.visible_keys()
+
+        if self.show_chunks:
+            chunk_pixels = CHUNK_CELLS * SNAKE_SIZE
+            for cx, cy in visible:
+                x, y = self.to_screen(cx * CHUNK_CELLS, cy * CHUNK_CELLS)
+                pygame.draw.rect(screen, CHUNK_LINES, (x, y, chunk_pixels, chunk_pixels), 1)
+
+        chunks = world.grid.chunks
+        for cx, cy in visible:
+            chunk = chunks.get((cx, cy))
+            if chunk is None:
+                continue
+            left, top = cx * CHUNK_CELLS, cy * CHUNK_CELLS
+            for cell in chunk.food:
+                x, y = self.to_screen(left + cell % CHUNK_CELLS, top + cell // CHUNK_CELLS)
+                screen.fill(GREEN, (x, y, SNAKE_SIZE, SNAKE_SIZE))
+
+        for snake in world.awake():
+            color = RED if snake is world.player else bot_color(snake.id)
+            for x, y in snake.body:
+                sx, sy = self.to_screen(x, y)
+                if -SNAKE_SIZE < sx < view_width and -SNAKE_SIZE < sy < view_height:
+                    screen.fill(color, (sx, sy, SNAKE_SIZE, SNAKE_SIZE))
+            sx, sy = self.to_screen(*snake.head)
+            if -SNAKE_SIZE < sx < view_width and -SNAKE_SIZE < sy < view_height:
+                screen.fill(WHITE, (sx, sy, SNAKE_SIZE, SNAKE_SIZE))
+
+
+def bot_color(snake_id):
+    """Hues spread around the wheel, so neighboring bots look different"""
+    color = pygame.Color(0)
+    color.hsva = ((snake_id * 137.5) % 360, 70, 90, 100)
+    return tuple(color)[:3]
+
+
+def run_large_world(width=WORLD_WIDTH, height=WORLD_HEIGHT, duration=None, seed=None, profile=False):
+    """Play the large world in a window: WASD or arrow keys, C shows chunks, Esc quits"""
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((VIEW_WIDTH, VIEW_HEIGHT))
+    pygame.display.set_caption("Python Chaser World")
+    clock = pygame.time.Clock()
+    font = pygame.font.Font(None, 24)
+
+    world = LargeWorld(width, height, seed, duration)
+    renderer = LargeWorldRenderer(screen, world)
+    timestep = FixedTimestep(SIM_STEP, MAX_CATCH_UP_STEPS)
+    profiler = FrameProfiler(profile)
+    world.profiler = profiler
+    controls = {pygame.K_w: 'UP', pygame.K_s: 'DOWN', pygame.K_a: 'LEFT', pygame.K_d: 'RIGHT',
+                pygame.K_UP: 'UP', pygame.K_DOWN: 'DOWN', pygame.K_LEFT: 'LEFT', pygame.K_RIGHT: 'RIGHT'}
+    inputs = []
+    running = True
+
+    while running:
+        profiler.begin_frame()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_c:
+                    renderer.show_chunks = not renderer.show_chunks
+                elif event.key == pygame.K_F3:
+                    profiler.toggle()
+                elif event.key == pygame.K_F4 and profiler.frames:
+                    print(f"Frame profile written to {profiler.dump_csv()}")
+                elif event.key in controls:
+                    inputs.append(DIRECTION_CODES[controls[event.key]])
+        profiler.mark('events')
+
+        steps = timestep.advance()
+        for _ in range(steps):
+            world.step(SIM_STEP, inputs)
+            inputs = []
+            if world.finished:
+                running = False
+                break
+
+        renderer.follow(steps * SIM_STEP)
+        renderer.draw()
+        head = world.player.head
+        hud = (f"Score: {world.player.score}   ({head[0]}, {head[1]}) of {world.width}x{world.height}   "
+               f"{len(world.grid.chunks)} chunks, {len(world.snakes) - 1} bots   {clock.get_fps():.0f} fps")
+        screen.blit(shared_cache.render(font, hud, WHITE), (10, 10))
+        if profiler.enabled:
+            _, rect, overlay = profiler.overlay_item(VIEW_WIDTH - 220, 35)
+            screen.blit(overlay, rect)
+        profiler.mark('draw')
+
+        pygame.display.flip()
+        profiler.mark('display.update')
+        clock.tick(60)
+
+    pygame.quit()
+    return world
+
+
+def benchmark(size, frames=1800, seed=0):
+    """Frame cost and loaded chunks of a size x size world, the player driving a staircase across it"""
+    import os
+    import time
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.display.init()
+    screen = pygame.display.set_mode((VIEW_WIDTH, VIEW_HEIGHT))
+    world = LargeWorld(size, size, seed)
+    renderer = LargeWorldRenderer(screen, world)
+    simulate, render = [], []
+    most_chunks = 0
+    for frame in range(frames):
+        # Two seconds right, two seconds down, so new chunks keep streaming in
+        turn = [DIRECTION_CODES['DOWN' if frame // 120 % 2 else 'RIGHT']] if frame % 120 == 0 else ()
+        start = time.perf_counter()
+        world.step(SIM_STEP, turn)
+        drawn = time.perf_counter()
+        renderer.follow(SIM_STEP)
+        renderer.draw()
+        pygame.display.flip()
+        simulate.append(drawn - start)
+        render.append(time.perf_counter() - drawn)
+        most_chunks = max(most_chunks, len(world.grid.chunks))
+    memory = world.grid.memory_bytes()
+    pygame.quit()
+    total = sorted(s + r for s, r in zip(simulate, render))
+    return {
+        'simulate_ms': 1000 * sum(simulate) / frames,
+        'render_ms': 1000 * sum(render) / frames,
+        'p99_ms': 1000 * total[int(0.99 * frames)],
+        'chunks': most_chunks,
+        'memory_kb': memory / 1024
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Large scrolling world")
+    parser.add_argument("--size", type=int, default=WORLD_WIDTH, help=f"world width and height in cells "
+                                                                     f"(a multiple of {CHUNK_CELLS})")
+    parser.add_argument("--seconds", type=float, help="end the game after this long")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--profile", action="store_true", help="start with the frame profiler overlay (F3)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="time 30 s of simulation and rendering per world size, headless")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print(f"{'cells':>12}{'sim ms':>9}{'draw ms':>9}{'p99 ms':>9}{'chunks':>8}{'memory KB':>11}")
+        for size in (160, 800, 2000, 8000, 32000):
+            result = benchmark(size)
+            print(f"{f'{size}x{size}':>12}{result['simulate_ms']:>9.3f}{result['render_ms']:>9.3f}"
+                  f"{result['p99_ms']:>9.3f}{result['chunks']:>8}{result['memory_kb']:>11.0f}")
+    else:
+        run_large_world(args.size, args.size, args.seconds, args.seed, args.profile)
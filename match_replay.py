@@ -0,0 +1,252 @@
+import struct
+
+from plan_scheduler import plan_order
+from snake_match import SnakeMatch, default_bot, search_bot
+
+# File layout (little endian):
+#   header: magic, version, game mode, seed (signed 64 bit), duration, step,
+#           ticks, bot and score of each snake, number of inputs
+#   schedule: whether a PlanScheduler decided the bots, number of deferrals
+#             (version 2 on)
+#   inputs: per key press, the ticks since the previous one as a varint and
+#           one byte with the snake index (high bits) and the direction
+#   deferrals: per bot decision the scheduler put off, the ticks since the
+#              previous one as a varint and one byte with the snake index
+MAGIC = b"SNKL"
+VERSION = 2
+HEADER = struct.Struct("<4sBBqddIBBHHI")
+SCHEDULE = struct.Struct("<BI")
+MODES = ["PVE", "PVP"]
+DIRECTIONS = ['UP', 'DOWN', 'LEFT', 'RIGHT']
+BOT_NAMES = ['', 'plan', 'search', 'flow']  # '' = keyboard (or nobody)
+
+
+def bot_factory(name):
+    """SnakeMatch bot factory for a recorded bot name, None for a player"""
+    if name == 'plan':
+        return default_bot
+    if name == 'search':
+        return search_bot
+    if name == 'flow':
+        from flow_field import shared_flow_field_bot  # Needs NumPy
+        return shared_flow_field_bot
+    return None
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class MatchLog:
+    """Everything needed to play a match again: its settings and key presses
+
+    SnakeMatch is deterministic for a given seed, bots and sequence of
+    fixed steps, so a match is recorded as its seed, game mode, duration,
+    step length and which bot drove each snake, plus every direction key
+    as (tick, snake index, direction). game_loop sends its inputs through
+    step(), which records them under the current tick; finish() stores the
+    final scores so a replay can check it ended the same way.
+
+    With a PlanScheduler the bots decided in a step depend on how long
+    their searches took, so the log also keeps each deferred decision as
+    (tick, snake index) and new_match() replays them with a
+    RecordedSchedule instead of timing anything. Bots that are not
+    deterministic at all (AsyncPlanner) are recorded as players: every turn
+    they make is logged as a key press of that snake.
+
+    A log is a few bytes per key press (see to_bytes). replay() re-simulates
+    it headless as fast as possible; game_loop can also draw it at any
+    playback rate, taking each tick's inputs from inputs_at().
+    """
+
+    def __init__(self, game_mode, duration, seed, dt=1.0 / 60, bots=('', '')):
+        # Checked now rather than in save(), which runs once the match is over
+        if not isinstance(seed, int) or not -2 ** 63 <= seed < 2 ** 63:
+            raise ValueError(f"seed {seed!r} is not a 64-bit integer and cannot be recorded")
+        self.game_mode = game_mode
+        self.duration = duration
+        self.seed = seed
+        self.dt = dt
+        self.bots = list(bots)  # BOT_NAMES entry per snake
+        self.inputs = []  # (tick, snake index, direction) in press order
+        self.ticks = 0  # steps simulated so far
+        self.scheduled = False  # whether bot decisions went through a PlanScheduler
+        self.deferrals = []  # (tick, snake index) of every deferred bot decision
+        self.turns_recorded = []  # snakes whose bot turns are recorded as inputs
+        self.scores = None  # final scores, set by finish()
+        self._by_tick = None
+
+    @classmethod
+    def record(cls, match, dt, bots=('', '')):
+        """An empty log for a match that is about to be played"""
+        log = cls(match.game_mode, match.duration, match.seed, dt, bots)
+        log.scheduled = match.scheduler is not None
+        for index, snake in enumerate(match.snakes):
+            if snake.planner is not None and not getattr(snake.planner, 'deterministic', True):
+                log.turns_recorded.append(index)
+                log.bots[index] = ''
+        return log
+
+    def step(self, match, inputs=()):
+        """Record this tick's inputs and step the match with them; returns its events"""
+        for index, direction in inputs:
+            self.inputs.append((self.ticks, index, direction))
+        tick = self.ticks
+        self.ticks += 1
+        directions = [match.snakes[index].direction for index in self.turns_recorded]
+        events = match.step(inputs, self.dt)
+        for index, direction in zip(self.turns_recorded, directions):
+            if match.snakes[index].direction != direction:
+                self.inputs.append((tick, index, match.snakes[index].direction))
+        for index in match.deferred:
+            self.deferrals.append((tick, index))
+        return events
+
+    def finish(self, match):
+        self.scores = match.scores()
+
+    def new_match(self):
+        """A fresh SnakeMatch set up like the recorded one"""
+        bots = {index: bot_factory(name) for index, name in enumerate(self.bots) if name}
+        match = SnakeMatch(self.game_mode, self.duration, self.seed, bots=bots)
+        if self.scheduled:
+            match.scheduler = RecordedSchedule(self.deferrals)
+        return match
+
+    def inputs_at(self, tick):
+        """The (snake index, direction) inputs recorded for a tick"""
+        if self._by_tick is None:
+            self._by_tick = {}
+            for at, index, direction in self.inputs:
+                self._by_tick.setdefault(at, []).append((index, direction))
+        return self._by_tick.get(tick, ())
+
+    def to_bytes(self):
+        scores = self.scores or [0, 0]
+        out = bytearray(HEADER.pack(MAGIC, VERSION, MODES.index(self.game_mode), self.seed,
+                                    self.duration, self.dt, self.ticks,
+                                    BOT_NAMES.index(self.bots[0]), BOT_NAMES.index(self.bots[1]),
+                                    scores[0], scores[1], len(self.inputs)))
+        out += SCHEDULE.pack(self.scheduled, len(self.deferrals))
+        last = 0
+        for tick, index, direction in self.inputs:
+            write_varint(out, tick - last)
+            out.append(index << 2 | DIRECTIONS.index(direction))
+            last = tick
+        last = 0
+        for tick, index in self.deferrals:
+            write_varint(out, tick - last)
+            out.append(index)
+            last = tick
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        (magic, version, mode, seed, duration, dt, ticks, bot1, bot2,
+         score1, score2, count) = HEADER.unpack_from(data)
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError("not a snake match log (or an unsupported version)")
+        log = cls(MODES[mode], duration, seed, dt, (BOT_NAMES[bot1], BOT_NAMES[bot2]))
+        log.ticks = ticks
+        log.scores = [score1, score2]
+        offset = HEADER.size
+        deferrals = 0
+        if version >= 2:
+            scheduled, deferrals = SCHEDULE.unpack_from(data, offset)
+            log.scheduled = bool(scheduled)
+            offset += SCHEDULE.size
+        tick = 0
+        for _ in range(count):
+            delta, offset = read_varint(data, offset)
+            tick += delta
+            packed = data[offset]
+            offset += 1
+            log.inputs.append((tick, packed >> 2, DIRECTIONS[packed & 3]))
+        tick = 0
+        for _ in range(deferrals):
+            delta, offset = read_varint(data, offset)
+            tick += delta
+            log.deferrals.append((tick, data[offset]))
+            offset += 1
+        return log
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class RecordedSchedule:
+    """Stands in for the PlanScheduler of a recorded match
+
+    Decides the due bots in the same plan_order() and defers exactly the
+    ones the recording deferred in that tick, so the bots draw the same
+    random numbers and make the same moves.
+    """
+
+    def __init__(self, deferrals):
+        self.deferrals = {}  # tick -> deferred snake indices
+        for tick, index in deferrals:
+            self.deferrals.setdefault(tick, set()).add(index)
+        self.keys = {}  # plan_order's cache, kept like PlanScheduler's
+
+    def begin_frame(self):
+        pass
+
+    def run(self, match, due, now):
+        deferred = self.deferrals.get(match.ticks, ())
+        for index in plan_order(match, due, self.keys):
+            if index not in deferred:
+                match.decide(index, now)
+        return [index for index in due if index in deferred]
+
+
+def replay(log):
+    """Re-simulate a log headless at full speed; returns the finished match"""
+    match = log.new_match()
+    tick = 0
+    while not match.finished:
+        match.step(log.inputs_at(tick), log.dt)
+        tick += 1
+    return match
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Replay recorded matches headless and check they end the same")
+    parser.add_argument("logs", nargs="+", help=".snakelog files written by the games")
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.logs:
+        log = MatchLog.load(path)
+        start = time.perf_counter()
+        match = replay(log)
+        elapsed = time.perf_counter() - start
+        same = match.scores() == log.scores
+        failed |= not same
+        print(f"{path}: {log.game_mode} seed {log.seed}, {len(log.inputs)} inputs, "
+              f"{len(log.deferrals)} deferred decisions, {log.ticks} ticks "
+              f"in {elapsed:.2f}s ({log.ticks / elapsed:.0f} ticks/s), scores {match.scores()} "
+              f"{'match the recording' if same else f'DIFFER from the recorded {log.scores}'}")
+    raise SystemExit(1 if failed else 0)
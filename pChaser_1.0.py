@@ -1,19 +1,16 @@
 
 import pygame
-import random
 import time
-import heapq
 from collections import deque
-import math
 
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init()  # Initialize the mixer module for sound
+from screen_layers import ScreenLayers, blit_premultiplied
+from snake_sprites import shared_sprites
+from text_cache import shared_cache
+
+import math
 
 # Screen dimensions
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Python Chaser")  # Updated game title in window caption
 
 # Colors
 WHITE = (255, 255, 255)
@@ -24,142 +21,190 @@ BLUE = (0, 0, 255)
 GRAY = (200, 200, 200)
 YELLOW = (255, 255, 0)
 
-# Clock and font
-clock = pygame.time.Clock()
-font = pygame.font.SysFont(None, 35)
-small_font = pygame.font.SysFont(None, 25)
+# Window, clock, fonts and assets: importing this module opens nothing,
+# init() sets these up and the first screen calls init_fonts()/init_audio()
+screen = None
+clock = None
+font = None
+small_font = None
+assets = None
+music_playing = False
+
+# Static parts of the menu screens, drawn once (made by init())
+layers = None
+
+# Menu button styles: fill colors (normal, hovered), corner radii and label offsets
+MODE_BUTTON = {'size': (400, 80), 'fill': ((40, 40, 50), (60, 60, 70)), 'fill_radius': 15,
+               'border_radius': 15, 'text_y': 15, 'desc_y': 45}
+TIMER_BUTTON = {'size': (300, 70), 'fill': ((30, 30, 60), (40, 40, 80)), 'fill_radius': 0,
+                'border_radius': 10, 'text_y': 10, 'desc_y': 40}
 
 # Snake settings
 SNAKE_SIZE = 20
 FPS = 10  # Increased FPS to make the game faster
 
+# Bot planner: "plan" keeps a repaired A* plan per bot,
+# "flow" shares one distance-to-food field between all bots,
+# "async" searches in a worker process and never makes a frame wait for it
+BOT_MODE = "plan"
+
+# The game rules run at a fixed rate, independent of the render frame rate;
+# a slow frame is caught up with at most MAX_CATCH_UP_STEPS steps
+SIM_STEP = 1.0 / 60
+MAX_CATCH_UP_STEPS = 5
+
+# Only redraw and update the parts of the screen that changed (R toggles it in game)
+DIRTY_RECTS = True
+
+# Per-phase frame timings overlay (F3 toggles it in game, F4 dumps the samples to CSV)
+PROFILER = False
+
+# Write every match's seed and key presses to match_<time>.snakelog, for
+# match_replay.py or "--replay <file>" to play it again
+RECORD_MATCHES = False
+
+# Milliseconds of bot planning per frame; bots over the budget decide in a
+# later frame, the ones about to move first (None decides every bot at once)
+BOT_PLAN_BUDGET_MS = 2.0
+
+# Draw snakes with one batched blit of pre-rendered block sprites
+# instead of a pygame.draw.rect call per segment
+SNAKE_SPRITES = True
+
 # Game duration (in seconds)
 GAME_DURATION = 60
 
-# Load and resize power-up images
-flash_image = pygame.image.load("flash.png")
-flash_image = pygame.transform.scale(flash_image, (SNAKE_SIZE * 3, SNAKE_SIZE * 3))
-snow_image = pygame.image.load("snow.jpg")  # Add snow power-up image
-snow_image = pygame.transform.scale(snow_image, (SNAKE_SIZE * 2, SNAKE_SIZE * 2))  # Smaller size (2x2 blocks)
-
-# Load and set up background music
-try:
-    pygame.mixer.music.load("game_music.mp3")
-    pygame.mixer.music.set_volume(0.5)  # Set volume to 50%
-    pygame.mixer.music.play(-1)  # -1 means loop indefinitely
-    music_playing = True
-except:
-    print("Warning: Could not load background music file 'game_music.mp3'")
-    music_playing = False
-
-# Load sound effects
-try:
-    food_sound = pygame.mixer.Sound("pop.mp3")
-    food_sound.set_volume(0.7)  # Set food sound volume to 70%
-    has_food_sound = True
-except:
-    print("Warning: Could not load sound effect file 'pop.mp3'")
-    has_food_sound = False
-
-# Load RSU logo
-try:
-    rsu_logo = pygame.image.load("rsu_logo.png")
-    rsu_logo = pygame.transform.scale(rsu_logo, (SNAKE_SIZE * 7, SNAKE_SIZE * 10))  # Size: 10x5 blocks
-    logo_position = (WIDTH - SNAKE_SIZE * 10 - 10, 10)  # Top right with 10px margin
-    has_logo = True
-except:
-    print("Warning: Could not load logo file 'rsu_logo.png'")
-    has_logo = False
+# Sizes the images are drawn at
+FLASH_SIZE = (SNAKE_SIZE * 3, SNAKE_SIZE * 3)
+SNOW_SIZE = (SNAKE_SIZE * 2, SNAKE_SIZE * 2)  # Smaller size (2x2 blocks)
+LOGO_SIZE = (SNAKE_SIZE * 7, SNAKE_SIZE * 10)  # Size: 10x5 blocks
+logo_position = (WIDTH - SNAKE_SIZE * 10 - 10, 10)  # Top right with 10px margin
+
+def init():
+    """Open the window and start loading the images; does nothing if already done"""
+    global screen, clock, assets, layers
+    if screen is not None:
+        return
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Python Chaser")  # Updated game title in window caption
+    clock = pygame.time.Clock()
+    layers = ScreenLayers(screen)
+
+    # Images load in a background thread while the first screen is showing;
+    # they are converted to the display format on first use
+    from assets import AssetManager
+    assets = AssetManager()
+    assets.start(images=["rsu_logo.png", "flash.png", "snow.jpg"])
+
+def init_fonts():
+    """Create the fonts the first time a screen needs them"""
+    global font, small_font
+    if font is not None:
+        return
+    pygame.font.init()
+    # Font(None) is the default font SysFont(None) picks, without scanning the system fonts
+    font = pygame.font.Font(None, 35)
+    small_font = pygame.font.Font(None, 25)
+
+def init_audio():
+    """Start the mixer and the music the first time a screen needs them"""
+    global music_playing
+    if pygame.mixer.get_init():
+        return
+    pygame.mixer.init()  # Initialize the mixer module for sound
+
+    # Load and set up background music
+    try:
+        pygame.mixer.music.load("game_music.mp3")
+        pygame.mixer.music.set_volume(0.5)  # Set volume to 50%
+        pygame.mixer.music.play(-1)  # -1 means loop indefinitely
+        music_playing = True
+    except:
+        print("Warning: Could not load background music file 'game_music.mp3'")
+        music_playing = False
+
+    # The sound effect is decoded in the background too
+    assets.start(sounds=["pop.mp3"])
 
 def draw_logo():
     """Draw the RSU logo in the top right corner if available"""
-    if has_logo:
+    rsu_logo = assets.image("rsu_logo.png", LOGO_SIZE)
+    if rsu_logo is not None:
         screen.blit(rsu_logo, logo_position)
 
+def powerup_image(name, size, color):
+    """A power-up's image, or a plain square of color if it could not be loaded"""
+    image = assets.image(name, size)
+    if image is None:
+        image = pygame.Surface(size)
+        image.fill(color)
+    return image
+
 def draw_snake(snake_list, color, direction=None):  # Remove head_image and direction parameters
+    if SNAKE_SPRITES:
+        shared_sprites.draw(screen, snake_list, color)  # White head
+        return
     for i, block in enumerate(snake_list):
         if i == len(snake_list) - 1:  # Head of the snake
             pygame.draw.rect(screen, WHITE, [block[0], block[1], SNAKE_SIZE, SNAKE_SIZE])  # White head
         else:
             pygame.draw.rect(screen, color, [block[0], block[1], SNAKE_SIZE, SNAKE_SIZE])
 
+def snake_items(snake_list, color):
+    """draw_snake as dirty-rect scene items"""
+    from dirty_rect import block_item
+    last = len(snake_list) - 1
+    return [block_item(WHITE if i == last else color, block[0], block[1])
+            for i, block in enumerate(snake_list)]
+
+def interpolated_body(previous, body, alpha):
+    """Snake blocks drawn alpha of the way from where they were before the last move"""
+    from fixed_timestep import lerp_position
+    # Pair blocks from the head back; a block that just grew starts at the old tail
+    current = list(body)
+    offset = len(current) - len(previous)
+    blocks = []
+    for i, block in enumerate(current):
+        before = previous[max(0, i - offset)] if previous else block
+        x, y = lerp_position(before, block, alpha, SNAKE_SIZE)
+        blocks.append((round(x), round(y)))
+    return blocks
+
 def display_message(msg, color, x, y):
-    text = font.render(msg, True, color)
+    text = shared_cache.render(font, msg, color)
     screen.blit(text, [x, y])
 
-# Bot pathfinding using Dijkstra's algorithm
-def find_path_to_food(snake_head, food_pos, obstacles, grid_width, grid_height):
-    # Convert positions to grid coordinates
-    start = (snake_head[0] // SNAKE_SIZE, snake_head[1] // SNAKE_SIZE)
-    goal = (food_pos[0] // SNAKE_SIZE, food_pos[1] // SNAKE_SIZE)
-    
-    # Create set of obstacles (snake bodies)
-    obstacle_set = set((pos[0] // SNAKE_SIZE, pos[1] // SNAKE_SIZE) for pos in obstacles)
+def build_intro_layer(layer):
+    """Static part of the intro screen: title with glow, logo, version and controls"""
+    title_font = pygame.font.SysFont("arial", 100, bold=True)
+
+    # Title with glow effect
+    title = "PYTHON CHASER"
+    glow_surface = title_font.render(title, True, (50, 50, 100))
+    for offset in range(3, 0, -1):
+        blit_premultiplied(layer, glow_surface, (WIDTH//2 - glow_surface.get_width()//2 + offset, 
+                                 HEIGHT//3 - offset))
     
-    # Queue for Dijkstra's algorithm
-    queue = [(0, start, [])]  # (cost, position, path)
-    visited = set()
+    title_surface = title_font.render(title, True, WHITE)
+    blit_premultiplied(layer, title_surface, (WIDTH//2 - title_surface.get_width()//2, HEIGHT//3))
     
-    # Possible moves: up, right, down, left
-    directions = [
-        (0, -1),  # up
-        (1, 0),   # right
-        (0, 1),   # down
-        (-1, 0)   # left
-    ]
+    # Logo if available
+    rsu_logo = assets.image("rsu_logo.png", LOGO_SIZE)
+    if rsu_logo is not None:
+        blit_premultiplied(layer, rsu_logo, logo_position)
     
-    while queue:
-        cost, current, path = heapq.heappop(queue)
-        
-        # Convert to grid coordinates
-        current_x, current_y = current
-        
-        # If we've reached the goal
-        if current == goal:
-            if not path:  # If path is empty, move in any valid direction
-                for dx, dy in directions:
-                    nx, ny = current_x + dx, current_y + dy
-                    if 0 <= nx < grid_width and 0 <= ny < grid_height and (nx, ny) not in obstacle_set:
-                        return (dx * SNAKE_SIZE, dy * SNAKE_SIZE)
-            else:
-                # Return the first step in the path
-                first_step = path[0]
-                dx = first_step[0] - start[0]
-                dy = first_step[1] - start[1]
-                return (dx * SNAKE_SIZE, dy * SNAKE_SIZE)
-        
-        # Skip if we've already visited this cell
-        if current in visited:
-            continue
-            
-        visited.add(current)
-        
-        # Check all adjacent cells
-        for dx, dy in directions:
-            nx, ny = current_x + dx, current_y + dy
-            
-            # Check if the new position is valid
-            if 0 <= nx < grid_width and 0 <= ny < grid_height and (nx, ny) not in obstacle_set and (nx, ny) not in visited:
-                # Calculate Manhattan distance to the goal as a heuristic
-                h = abs(nx - goal[0]) + abs(ny - goal[1])
-                new_cost = cost + 1 + h  # Cost so far + 1 step + heuristic
-                
-                # Add new position to the queue
-                new_path = path + [(nx, ny)]
-                heapq.heappush(queue, (new_cost, (nx, ny), new_path))
+    # Version and controls
+    version_text = small_font.render("Version 1.0", True, GRAY)
+    blit_premultiplied(layer, version_text, (10, HEIGHT - 30))
     
-    # If no path found, move in a random valid direction
-    random.shuffle(directions)
-    for dx, dy in directions:
-        nx, ny = start[0] + dx, start[1] + dy
-        if 0 <= nx < grid_width and 0 <= ny < grid_height and (nx, ny) not in obstacle_set:
-            return (dx * SNAKE_SIZE, dy * SNAKE_SIZE)
-            
-    # If completely stuck, just try to go up
-    return (0, -SNAKE_SIZE)
+    controls_text = small_font.render("M - Toggle Music | Q - Quit", True, GRAY)
+    blit_premultiplied(layer, controls_text, (WIDTH - controls_text.get_width() - 10, HEIGHT - 30))
 
 def show_intro_screen():
     """Display attractive introduction screen"""
+    init_fonts()
+    init_audio()
     screen.fill(BLACK)
     intro_running = True
     alpha = 0  # For fade in effect
@@ -182,9 +227,9 @@ def show_intro_screen():
     animation_speed = 0.15
     last_update = time.time()
 
-    # Load or create title font
-    title_font = pygame.font.SysFont("arial", 100, bold=True)
+    # The pulsing subtitle is rendered once; only its alpha changes
     subtitle_font = pygame.font.SysFont("arial", 40)
+    subtitle_surface = subtitle_font.render("Press SPACE to Start", True, WHITE)
     
     while intro_running:
         current_time = time.time()
@@ -211,42 +256,18 @@ def show_intro_screen():
         draw_snake(intro_red_snake['body'], RED)
         draw_snake(intro_blue_snake['body'], BLUE)
         
-        # Create semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(160)
-        overlay.fill((20, 20, 30))
-        screen.blit(overlay, (0, 0))
-        
-        # Draw title with glow effect
-        title = "PYTHON CHASER"
-        for offset in range(3, 0, -1):
-            glow_surface = title_font.render(title, True, (50, 50, 100))
-            screen.blit(glow_surface, (WIDTH//2 - glow_surface.get_width()//2 + offset, 
-                                     HEIGHT//3 - offset))
-        
-        title_surface = title_font.render(title, True, WHITE)
-        screen.blit(title_surface, (WIDTH//2 - title_surface.get_width()//2, HEIGHT//3))
+        # Semi-transparent overlay, then the title, logo, version and controls
+        screen.blit(layers.overlay((20, 20, 30), 160), (0, 0))
+        layers.blit('intro', (WIDTH, HEIGHT), build_intro_layer)
         
         # Draw subtitle with fade in
         if alpha < 255:
             alpha += 2
         
-        subtitle = "Press SPACE to Start"
-        subtitle_surface = subtitle_font.render(subtitle, True, WHITE)
         subtitle_surface.set_alpha(int(abs(math.sin(current_time * 2)) * 255))  # Pulsing effect
         screen.blit(subtitle_surface, 
                    (WIDTH//2 - subtitle_surface.get_width()//2, HEIGHT * 2//3))
         
-        # Draw logo if available
-        draw_logo()
-        
-        # Display version and controls
-        version_text = small_font.render("Version 1.0", True, GRAY)
-        screen.blit(version_text, (10, HEIGHT - 30))
-        
-        controls_text = small_font.render("M - Toggle Music | Q - Quit", True, GRAY)
-        screen.blit(controls_text, (WIDTH - controls_text.get_width() - 10, HEIGHT - 30))
-        
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
@@ -270,8 +291,56 @@ def show_intro_screen():
         last_update = current_time
         clock.tick(60)
 
+def build_mode_menu_layer(layer):
+    """Title of the game mode step, with shadow effect"""
+    title = "Select Game Mode"
+    title_font = pygame.font.Font(None, 60)
+    shadow = title_font.render(title, True, (50, 50, 50))
+    text = title_font.render(title, True, WHITE)
+    blit_premultiplied(layer, shadow, (WIDTH//2 - shadow.get_width()//2 + 2, 80 + 2))
+    blit_premultiplied(layer, text, (WIDTH//2 - text.get_width()//2, 80))
+
+def build_duration_menu_layer(layer):
+    """Title of the game duration step, with glow effect, and the controls legend"""
+    title = "Select Game Duration"
+    title_font = pygame.font.Font(None, 70)
+    
+    # Glow effect
+    glow = title_font.render(title, True, (30, 30, 100))
+    blit_premultiplied(layer, glow, (WIDTH//2 - glow.get_width()//2 + 2, 80 + 2))  # Moved up slightly
+    
+    # Main title
+    text = title_font.render(title, True, WHITE)
+    blit_premultiplied(layer, text, (WIDTH//2 - text.get_width()//2, 80))  # Moved up slightly
+
+    # Controls text at the very bottom of the screen
+    controls_text = "Press M to Toggle Music | Press Q to Quit"
+    controls = small_font.render(controls_text, True, (150, 150, 150))
+    blit_premultiplied(layer, controls, (WIDTH//2 - controls.get_width()//2, HEIGHT - 30))
+
+def draw_button(style, text, desc, hovered, button_rect):
+    """A menu button with its labels, drawn once per style, text and hover state"""
+    def build(layer):
+        rect = layer.get_rect()
+        pygame.draw.rect(layer, style['fill'][hovered], rect, 0, border_radius=style['fill_radius'])
+        if hovered:
+            pygame.draw.rect(layer, (100, 100, 255), rect, 3, border_radius=style['border_radius'])
+        else:
+            pygame.draw.rect(layer, GRAY, rect, 2, border_radius=style['border_radius'])
+
+        # Button text
+        button_text = font.render(text, True, WHITE)
+        blit_premultiplied(layer, button_text, (rect.centerx - button_text.get_width()//2, style['text_y']))
+        
+        # Description text
+        desc_text = small_font.render(desc, True, GRAY)
+        blit_premultiplied(layer, desc_text, (rect.centerx - desc_text.get_width()//2, style['desc_y']))
+    layers.blit(('button', text, hovered), style['size'], build, button_rect.topleft)
+
 def start_page():
     """Enhanced start page with animated snakes"""
+    init_fonts()
+    init_audio()
     selected_timer = 60
     game_mode = None
     running = True
@@ -320,20 +389,15 @@ def start_page():
         draw_snake(red_snake['body'], RED)
         draw_snake(blue_snake['body'], BLUE)
 
-        # Create stylish semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(160)
-        overlay.fill((20, 20, 30))  # Dark blue-ish background
-        screen.blit(overlay, (0, 0))
+        # Stylish semi-transparent overlay
+        screen.blit(layers.overlay((20, 20, 30), 160), (0, 0))  # Dark blue-ish background
+
+        # Title (and legend) of the current step, drawn once per step
+        layers.blit(('menu', game_mode is not None), (WIDTH, HEIGHT),
+                    build_duration_menu_layer if game_mode else build_mode_menu_layer)
+        mouse_pos = pygame.mouse.get_pos()
 
         if not game_mode:
-            # Draw title with shadow effect
-            title = "Select Game Mode"
-            title_font = pygame.font.SysFont(None, 60)
-            shadow = title_font.render(title, True, (50, 50, 50))
-            text = title_font.render(title, True, WHITE)
-            screen.blit(shadow, (WIDTH//2 - shadow.get_width()//2 + 2, 80 + 2))
-            screen.blit(text, (WIDTH//2 - text.get_width()//2, 80))
 
             # Create modern looking mode buttons
             mode_buttons = [
@@ -345,37 +409,10 @@ def start_page():
                 y_pos = HEIGHT//2 - 100 + idx * 120
                 button_rect = pygame.Rect(WIDTH//2 - 200, y_pos, 400, 80)
                 
-                # Button hover effect
-                mouse_pos = pygame.mouse.get_pos()
-                if button_rect.collidepoint(mouse_pos):
-                    pygame.draw.rect(screen, (60, 60, 70), button_rect, 0, border_radius=15)
-                    pygame.draw.rect(screen, (100, 100, 255), button_rect, 3, border_radius=15)
-                else:
-                    pygame.draw.rect(screen, (40, 40, 50), button_rect, 0, border_radius=15)
-                    pygame.draw.rect(screen, GRAY, button_rect, 2, border_radius=15)
-
-                # Mode text
-                mode_text = font.render(mode, True, WHITE)
-                screen.blit(mode_text, (button_rect.centerx - mode_text.get_width()//2, 
-                                      button_rect.y + 15))
-                
-                # Description text
-                desc_text = small_font.render(desc, True, GRAY)
-                screen.blit(desc_text, (button_rect.centerx - desc_text.get_width()//2, 
-                                       button_rect.y + 45))
+                # Button with hover effect
+                hovered = button_rect.collidepoint(mouse_pos)
+                draw_button(MODE_BUTTON, mode, desc, hovered, button_rect)
         else:
-            # Draw title with glow effect
-            title = "Select Game Duration"
-            title_font = pygame.font.SysFont(None, 70)
-            
-            # Glow effect
-            glow = title_font.render(title, True, (30, 30, 100))
-            screen.blit(glow, (WIDTH//2 - glow.get_width()//2 + 2, 80 + 2))  # Moved up slightly
-            
-            # Main title
-            text = title_font.render(title, True, WHITE)
-            screen.blit(text, (WIDTH//2 - text.get_width()//2, 80))  # Moved up slightly
-
             # Timer selection buttons with centered positioning
             timer_options = [
                 ("A. 1 Minute", "Quick Match", 60),
@@ -393,29 +430,9 @@ def start_page():
                 # Center buttons horizontally
                 button_rect = pygame.Rect(WIDTH//2 - 150, y_pos, 300, 70)
                 
-                # Hover effect
-                mouse_pos = pygame.mouse.get_pos()
-                if button_rect.collidepoint(mouse_pos):
-                    pygame.draw.rect(screen, (40, 40, 80), button_rect)
-                    pygame.draw.rect(screen, (100, 100, 255), button_rect, 3, border_radius=10)
-                else:
-                    pygame.draw.rect(screen, (30, 30, 60), button_rect)
-                    pygame.draw.rect(screen, GRAY, button_rect, 2, border_radius=10)
-
-                # Timer text
-                timer_text = font.render(text, True, WHITE)
-                screen.blit(timer_text, (button_rect.centerx - timer_text.get_width()//2, 
-                                       button_rect.y + 10))
-                
-                # Description text
-                desc_text = small_font.render(desc, True, GRAY)
-                screen.blit(desc_text, (button_rect.centerx - desc_text.get_width()//2, 
-                                      button_rect.y + 40))
-
-            # Move controls text to very bottom of screen
-            controls_text = "Press M to Toggle Music | Press Q to Quit"
-            controls = small_font.render(controls_text, True, (150, 150, 150))
-            screen.blit(controls, (WIDTH//2 - controls.get_width()//2, HEIGHT - 30))
+                # Button with hover effect
+                hovered = button_rect.collidepoint(mouse_pos)
+                draw_button(TIMER_BUTTON, text, desc, hovered, button_rect)
 
         # Event handling and key checks remain the same
         for event in pygame.event.get():
@@ -505,199 +522,208 @@ def display_end_screen(snake1_score, snake2_score, is_bot_game):
     
     return False  # Should not reach here
 
-def show_preparation_screen(is_bot_game):
-    waiting = True
-    
+def build_preparation_layer(layer, is_bot_game):
+    """Everything on the preparation screen except the pulsing start prompt"""
     # Font settings with more balanced sizes
     title_font = pygame.font.SysFont("arial", 36, bold=True)
     header_font = pygame.font.SysFont("arial", 33, bold=True)
     game_font = pygame.font.SysFont("consolas", 28)
     
-    while waiting:
-        screen.fill((15, 15, 35))
-        
-        # Title Box - Centered at top
-        title = "Get Ready!"
-        title_surface = title_font.render(title, True, WHITE)
-        title_box = pygame.Rect(WIDTH//2 - 90, 20, 180, 50)  # Moved up slightly
-        pygame.draw.rect(screen, (30, 30, 60), title_box, 0, 10)
-        pygame.draw.rect(screen, (100, 100, 255), title_box, 2, 10)
-        
-        # Center title text in box
-        title_x = title_box.centerx - title_surface.get_width()//2
-        title_y = title_box.centery - title_surface.get_height()//2
-        screen.blit(title_surface, (title_x, title_y))
-
-        # Controls Box - Adjusted height for better fit
-        controls_box = pygame.Rect(WIDTH//2 - 350, 90, 700, 280)
-        pygame.draw.rect(screen, (30, 30, 60), controls_box, 0, 15)
-        pygame.draw.rect(screen, (100, 100, 255), controls_box, 2, 15)
-        
-        # Controls Header
-        header_text = header_font.render("Game Controls", True, WHITE)
-        header_x = controls_box.centerx - header_text.get_width()//2
-        header_y = controls_box.y + 15
-        screen.blit(header_text, (header_x, header_y))
-
-        if is_bot_game:
-            # Player Box - Made smaller to fit
-            player_box = pygame.Rect(controls_box.x + 40, controls_box.y + 60, 260, 190)
-            pygame.draw.rect(screen, (40, 40, 70), player_box, 0, 10)
-            pygame.draw.rect(screen, RED, player_box, 2, 10)
-
-            # Bot Box - Made smaller to fit
-            bot_box = pygame.Rect(controls_box.right - 300, controls_box.y + 60, 260, 190)
-            pygame.draw.rect(screen, (40, 40, 70), bot_box, 0, 10)
-            pygame.draw.rect(screen, YELLOW, bot_box, 2, 10)
-
-            # Player Controls
-            title_text = game_font.render("Player (Red)", True, RED)
-            title_x = player_box.centerx - title_text.get_width()//2
-            title_y = player_box.y + 20
-            screen.blit(title_text, (title_x, title_y))
-
-            controls = [
-                ("W", "(Up)"),
-                ("A", "(Left)"),
-                ("S", "(Down)"),
-                ("D", "(Right)")
-            ]
-
-            start_y = player_box.y + 60
-            spacing = 30
-            for i, (key, direction) in enumerate(controls):
-                key_surface = game_font.render(key, True, WHITE)
-                key_x = player_box.centerx - 50
-                key_y = start_y + (i * spacing)
-                screen.blit(key_surface, (key_x, key_y))
-                
-                dash_surface = game_font.render("-", True, WHITE)
-                dash_x = player_box.centerx - 20
-                screen.blit(dash_surface, (dash_x, key_y))
-                
-                dir_surface = game_font.render(direction, True, GRAY)
-                dir_x = player_box.centerx + 10
-                screen.blit(dir_surface, (dir_x, key_y))
-
-            # Bot Info with explanation
-            bot_info = [
-                ("Bot (Yellow)", YELLOW),
-                ("AI Controlled", WHITE),
-                ("Finds Food", WHITE),
-                ("Avoids Walls", WHITE),
-                ("Auto Navigate", WHITE)
-            ]
-
-            # Display bot info with same spacing
-            start_y = bot_box.y + 20
-            for i, (text, color) in enumerate(bot_info):
-                text_surface = game_font.render(text, True, color)
-                text_x = bot_box.centerx - text_surface.get_width()//2
-                text_y = start_y + (i * spacing)
-                screen.blit(text_surface, (text_x, text_y))
-
-        else:
-            # PVP Mode - Similar adjustments for player boxes
-            player1_box = pygame.Rect(controls_box.x + 40, controls_box.y + 60, 260, 190)
-            pygame.draw.rect(screen, (40, 40, 70), player1_box, 0, 10)
-            pygame.draw.rect(screen, RED, player1_box, 2, 10)
-
-            player2_box = pygame.Rect(controls_box.right - 300, controls_box.y + 60, 260, 190)
-            pygame.draw.rect(screen, (40, 40, 70), player2_box, 0, 10)
-            pygame.draw.rect(screen, BLUE, player2_box, 2, 10)
-
-            # Player 1 Controls
-            title_text = game_font.render("Player 1 (Red)", True, RED)
-            title_x = player1_box.centerx - title_text.get_width()//2
-            title_y = player1_box.y + 20
-            screen.blit(title_text, (title_x, title_y))
-
-            p1_controls = [
-                ("W", "(Up)"),
-                ("A", "(Left)"),
-                ("S", "(Down)"),
-                ("D", "(Right)")
-            ]
+    layer.fill((15, 15, 35))
+    
+    # Title Box - Centered at top
+    title = "Get Ready!"
+    title_surface = title_font.render(title, True, WHITE)
+    title_box = pygame.Rect(WIDTH//2 - 90, 20, 180, 50)  # Moved up slightly
+    pygame.draw.rect(layer, (30, 30, 60), title_box, 0, 10)
+    pygame.draw.rect(layer, (100, 100, 255), title_box, 2, 10)
+    
+    # Center title text in box
+    title_x = title_box.centerx - title_surface.get_width()//2
+    title_y = title_box.centery - title_surface.get_height()//2
+    layer.blit(title_surface, (title_x, title_y))
+
+    # Controls Box - Adjusted height for better fit
+    controls_box = pygame.Rect(WIDTH//2 - 350, 90, 700, 280)
+    pygame.draw.rect(layer, (30, 30, 60), controls_box, 0, 15)
+    pygame.draw.rect(layer, (100, 100, 255), controls_box, 2, 15)
+    
+    # Controls Header
+    header_text = header_font.render("Game Controls", True, WHITE)
+    header_x = controls_box.centerx - header_text.get_width()//2
+    header_y = controls_box.y + 15
+    layer.blit(header_text, (header_x, header_y))
+
+    if is_bot_game:
+        # Player Box - Made smaller to fit
+        player_box = pygame.Rect(controls_box.x + 40, controls_box.y + 60, 260, 190)
+        pygame.draw.rect(layer, (40, 40, 70), player_box, 0, 10)
+        pygame.draw.rect(layer, RED, player_box, 2, 10)
+
+        # Bot Box - Made smaller to fit
+        bot_box = pygame.Rect(controls_box.right - 300, controls_box.y + 60, 260, 190)
+        pygame.draw.rect(layer, (40, 40, 70), bot_box, 0, 10)
+        pygame.draw.rect(layer, YELLOW, bot_box, 2, 10)
+
+        # Player Controls
+        title_text = game_font.render("Player (Red)", True, RED)
+        title_x = player_box.centerx - title_text.get_width()//2
+        title_y = player_box.y + 20
+        layer.blit(title_text, (title_x, title_y))
+
+        controls = [
+            ("W", "(Up)"),
+            ("A", "(Left)"),
+            ("S", "(Down)"),
+            ("D", "(Right)")
+        ]
+
+        start_y = player_box.y + 60
+        spacing = 30
+        for i, (key, direction) in enumerate(controls):
+            key_surface = game_font.render(key, True, WHITE)
+            key_x = player_box.centerx - 50
+            key_y = start_y + (i * spacing)
+            layer.blit(key_surface, (key_x, key_y))
+            
+            dash_surface = game_font.render("-", True, WHITE)
+            dash_x = player_box.centerx - 20
+            layer.blit(dash_surface, (dash_x, key_y))
+            
+            dir_surface = game_font.render(direction, True, GRAY)
+            dir_x = player_box.centerx + 10
+            layer.blit(dir_surface, (dir_x, key_y))
+
+        # Bot Info with explanation
+        bot_info = [
+            ("Bot (Yellow)", YELLOW),
+            ("AI Controlled", WHITE),
+            ("Finds Food", WHITE),
+            ("Avoids Walls", WHITE),
+            ("Auto Navigate", WHITE)
+        ]
+
+        # Display bot info with same spacing
+        start_y = bot_box.y + 20
+        for i, (text, color) in enumerate(bot_info):
+            text_surface = game_font.render(text, True, color)
+            text_x = bot_box.centerx - text_surface.get_width()//2
+            text_y = start_y + (i * spacing)
+            layer.blit(text_surface, (text_x, text_y))
 
-            start_y = player1_box.y + 60
-            spacing = 30
-            for i, (key, direction) in enumerate(p1_controls):
-                key_surface = game_font.render(key, True, WHITE)
-                key_x = player1_box.centerx - 50
-                key_y = start_y + (i * spacing)
-                screen.blit(key_surface, (key_x, key_y))
-                
-                dash_surface = game_font.render("-", True, WHITE)
-                dash_x = player1_box.centerx - 20
-                screen.blit(dash_surface, (dash_x, key_y))
-                
-                dir_surface = game_font.render(direction, True, GRAY)
-                dir_x = player1_box.centerx + 10
-                screen.blit(dir_surface, (dir_x, key_y))
-
-            # Player 2 Controls
-            title_text = game_font.render("Player 2 (Blue)", True, BLUE)
-            title_x = player2_box.centerx - title_text.get_width()//2
-            title_y = player2_box.y + 20
-            screen.blit(title_text, (title_x, title_y))
-
-            p2_controls = [
-                ("↑", "(Up)"),
-                ("←", "(Left)"),
-                ("↓", "(Down)"),
-                ("→", "(Right)")
-            ]
+    else:
+        # PVP Mode - Similar adjustments for player boxes
+        player1_box = pygame.Rect(controls_box.x + 40, controls_box.y + 60, 260, 190)
+        pygame.draw.rect(layer, (40, 40, 70), player1_box, 0, 10)
+        pygame.draw.rect(layer, RED, player1_box, 2, 10)
+
+        player2_box = pygame.Rect(controls_box.right - 300, controls_box.y + 60, 260, 190)
+        pygame.draw.rect(layer, (40, 40, 70), player2_box, 0, 10)
+        pygame.draw.rect(layer, BLUE, player2_box, 2, 10)
+
+        # Player 1 Controls
+        title_text = game_font.render("Player 1 (Red)", True, RED)
+        title_x = player1_box.centerx - title_text.get_width()//2
+        title_y = player1_box.y + 20
+        layer.blit(title_text, (title_x, title_y))
+
+        p1_controls = [
+            ("W", "(Up)"),
+            ("A", "(Left)"),
+            ("S", "(Down)"),
+            ("D", "(Right)")
+        ]
+
+        start_y = player1_box.y + 60
+        spacing = 30
+        for i, (key, direction) in enumerate(p1_controls):
+            key_surface = game_font.render(key, True, WHITE)
+            key_x = player1_box.centerx - 50
+            key_y = start_y + (i * spacing)
+            layer.blit(key_surface, (key_x, key_y))
+            
+            dash_surface = game_font.render("-", True, WHITE)
+            dash_x = player1_box.centerx - 20
+            layer.blit(dash_surface, (dash_x, key_y))
+            
+            dir_surface = game_font.render(direction, True, GRAY)
+            dir_x = player1_box.centerx + 10
+            layer.blit(dir_surface, (dir_x, key_y))
+
+        # Player 2 Controls
+        title_text = game_font.render("Player 2 (Blue)", True, BLUE)
+        title_x = player2_box.centerx - title_text.get_width()//2
+        title_y = player2_box.y + 20
+        layer.blit(title_text, (title_x, title_y))
+
+        p2_controls = [
+            ("↑", "(Up)"),
+            ("←", "(Left)"),
+            ("↓", "(Down)"),
+            ("→", "(Right)")
+        ]
+
+        start_y = player2_box.y + 60
+        for i, (key, direction) in enumerate(p2_controls):
+            key_surface = game_font.render(key, True, WHITE)
+            key_x = player2_box.centerx - 50
+            key_y = start_y + (i * spacing)
+            layer.blit(key_surface, (key_x, key_y))
+            
+            dash_surface = game_font.render("-", True, WHITE)
+            dash_x = player2_box.centerx - 20
+            layer.blit(dash_surface, (dash_x, key_y))
+            
+            dir_surface = game_font.render(direction, True, GRAY)
+            dir_x = player2_box.centerx + 10
+            layer.blit(dir_surface, (dir_x, key_y))
+
+    # Power-ups Box with header
+    powerup_box = pygame.Rect(WIDTH//2 - 300, controls_box.bottom + 20, 600, 100)
+    pygame.draw.rect(layer, (30, 30, 60), powerup_box, 0, 10)
+    pygame.draw.rect(layer, (100, 100, 255), powerup_box, 2, 10)
+
+    # Power-ups Header
+    powerup_header = header_font.render("Power-ups", True, WHITE)
+    powerup_x = powerup_box.centerx - powerup_header.get_width()//2
+    layer.blit(powerup_header, (powerup_x, powerup_box.y + 10))
+
+    # Display power-ups with icons
+    icon_size = 32
+    padding = 20
+
+    # Speed boost power-up
+    speed_x = powerup_box.x + 50
+    speed_y = powerup_box.centery + 5
+    layer.blit(powerup_image("flash.png", (icon_size, icon_size), YELLOW), (speed_x, speed_y))
+    speed_text = game_font.render("Speed Boost (5s)", True, WHITE)
+    layer.blit(speed_text, (speed_x + icon_size + 10, speed_y))
+
+    # Freeze power-up
+    freeze_x = powerup_box.centerx + 50
+    freeze_y = powerup_box.centery + 5
+    layer.blit(powerup_image("snow.jpg", (icon_size, icon_size), WHITE), (freeze_x, freeze_y))
+    freeze_text = game_font.render("Freeze (3s)", True, WHITE)
+    layer.blit(freeze_text, (freeze_x + icon_size + 10, freeze_y))
+
+    # Press Space Box at bottom
+    space_box = pygame.Rect(WIDTH//2 - 200, HEIGHT - 60, 400, 40)
+    pygame.draw.rect(layer, (30, 30, 60), space_box, 0, 10)
+    pygame.draw.rect(layer, (100, 100, 255), space_box, 2, 10)
 
-            start_y = player2_box.y + 60
-            for i, (key, direction) in enumerate(p2_controls):
-                key_surface = game_font.render(key, True, WHITE)
-                key_x = player2_box.centerx - 50
-                key_y = start_y + (i * spacing)
-                screen.blit(key_surface, (key_x, key_y))
-                
-                dash_surface = game_font.render("-", True, WHITE)
-                dash_x = player2_box.centerx - 20
-                screen.blit(dash_surface, (dash_x, key_y))
-                
-                dir_surface = game_font.render(direction, True, GRAY)
-                dir_x = player2_box.centerx + 10
-                screen.blit(dir_surface, (dir_x, key_y))
-
-        # Power-ups Box with header
-        powerup_box = pygame.Rect(WIDTH//2 - 300, controls_box.bottom + 20, 600, 100)
-        pygame.draw.rect(screen, (30, 30, 60), powerup_box, 0, 10)
-        pygame.draw.rect(screen, (100, 100, 255), powerup_box, 2, 10)
-
-        # Power-ups Header
-        powerup_header = header_font.render("Power-ups", True, WHITE)
-        powerup_x = powerup_box.centerx - powerup_header.get_width()//2
-        screen.blit(powerup_header, (powerup_x, powerup_box.y + 10))
-
-        # Display power-ups with icons
-        icon_size = 32
-        padding = 20
-
-        # Speed boost power-up
-        speed_x = powerup_box.x + 50
-        speed_y = powerup_box.centery + 5
-        screen.blit(pygame.transform.scale(flash_image, (icon_size, icon_size)), (speed_x, speed_y))
-        speed_text = game_font.render("Speed Boost (5s)", True, WHITE)
-        screen.blit(speed_text, (speed_x + icon_size + 10, speed_y))
-
-        # Freeze power-up
-        freeze_x = powerup_box.centerx + 50
-        freeze_y = powerup_box.centery + 5
-        screen.blit(pygame.transform.scale(snow_image, (icon_size, icon_size)), (freeze_x, freeze_y))
-        freeze_text = game_font.render("Freeze (3s)", True, WHITE)
-        screen.blit(freeze_text, (freeze_x + icon_size + 10, freeze_y))
-
-        # Press Space Box at bottom
-        space_box = pygame.Rect(WIDTH//2 - 200, HEIGHT - 60, 400, 40)
-        pygame.draw.rect(screen, (30, 30, 60), space_box, 0, 10)
-        pygame.draw.rect(screen, (100, 100, 255), space_box, 2, 10)
+def show_preparation_screen(is_bot_game):
+    waiting = True
+    
+    # The start prompt is rendered once; only its alpha pulses
+    game_font = pygame.font.SysFont("consolas", 28)
+    space_text = game_font.render("Press SPACE to Start", True, WHITE)
+    
+    while waiting:
+        # Boxes, legends and icons for this mode, drawn once
+        screen.blit(layers.layer(('preparation', is_bot_game), (WIDTH, HEIGHT),
+                                 lambda layer: build_preparation_layer(layer, is_bot_game), flags=0), (0, 0))
 
         # Press Space Text with pulsing effect
-        space_text = game_font.render("Press SPACE to Start", True, WHITE)
         space_alpha = abs(math.sin(time.time() * 2)) * 255
         space_text.set_alpha(int(space_alpha))
         screen.blit(space_text, (WIDTH//2 - space_text.get_width()//2, HEIGHT - 55))
@@ -722,64 +748,85 @@ def show_preparation_screen(is_bot_game):
         pygame.display.update()
         clock.tick(60)
 
-def game_loop(game_mode, game_duration):
-    """Main game loop separated as a function to allow restarting"""
+def game_loop(game_mode, game_duration, replay=None, playback_rate=1.0):
+    """Main game loop separated as a function to allow restarting
+
+    With replay (a MatchLog), the recorded match is played back instead,
+    playback_rate times as fast as real time.
+    """
+    # Only a match needs these, so they are imported here rather than with
+    # the game, which keeps the import (and the first screen) fast
+    from dirty_rect import DirtyRectRenderer, block_item, image_item, text_item
+    from fixed_timestep import FixedTimestep
+    from frame_profiler import FrameProfiler
+    from match_replay import MatchLog
+    from plan_scheduler import PlanScheduler
+    from snake_match import SnakeMatch, default_bot
+
+    init_fonts()
+    init_audio()
     is_bot_game = (game_mode == "PVE")
 
-    # Show preparation screen
-    show_preparation_screen(is_bot_game)
-
-    # Player 1 (Red Snake)
-    snake1_pos = [100, 50]
-    snake1_body = [[100, 50], [80, 50]]  # Start with 2 blocks
-    snake1_direction = 'RIGHT'
-    snake1_change = [SNAKE_SIZE, 0]
-    snake1_score = 0
-    snake1_fps = FPS  # Individual FPS for Player 1
-    snake1_speed_boost = 1.0  # Speed multiplier for snake 1
-    snake1_last_move_time = 0  # Last time snake 1 moved
-    snake1_frozen = False
-    snake1_frozen_start_time = None
-
-    # Player 2 (Blue Snake) / Bot
-    snake2_pos = [700, 550]
-    snake2_body = [[700, 550], [720, 550]]  # Start with 2 blocks
-    snake2_direction = 'LEFT'
-    snake2_change = [-SNAKE_SIZE, 0]
-    snake2_score = 0
-    snake2_fps = FPS  # Individual FPS for Player 2
-    snake2_speed_boost = 1.0  # Speed multiplier for snake 2
-    snake2_last_move_time = 0  # Last time snake 2 moved
-    snake2_frozen = False
-    snake2_frozen_start_time = None
-    bot_decision_time = 0  # Time tracker for bot decisions
-    bot_decision_interval = 0.1  # How often the bot makes decisions (in seconds)
-
-    # Food
-    food_pos = [random.randrange(1, (WIDTH // SNAKE_SIZE)) * SNAKE_SIZE,
-                random.randrange(1, (HEIGHT // SNAKE_SIZE)) * SNAKE_SIZE]
-    food_spawn = True
-
-    # Power-up variables
-    flash_powerup_pos = None
-    flash_powerup_active = False
-    powerup_effect_start_time_1 = None
-    powerup_effect_start_time_2 = None
-    powerup_effect_active_1 = False
-    powerup_effect_active_2 = False
-
-    # Freeze power-up variables
-    snow_powerup_pos = None
-    snow_powerup_active = False
-    snow_last_spawn_time = None
+    # All game rules live in the headless match engine; this loop only feeds
+    # it keyboard input and the frame time, and draws its state
+    if replay is not None:
+        match = replay.new_match()
+        bot_names = replay.bots
+    else:
+        # Show preparation screen
+        show_preparation_screen(is_bot_game)
+
+        bots = {}
+        bot_names = ['', '']
+        if is_bot_game:
+            bots[1] = default_bot
+            bot_names[1] = 'plan'
+            if BOT_MODE == "flow":
+                # The shared flow-field bot planner needs NumPy, so it is only imported when used
+                try:
+                    from flow_field import shared_flow_field_bot
+                    bots[1] = shared_flow_field_bot
+                    bot_names[1] = 'flow'
+                except ImportError:
+                    pass
+            elif BOT_MODE == "async":
+                from async_planner import async_bot
+                bots[1] = async_bot
+                bot_names[1] = 'async'
+        match = SnakeMatch(game_mode, game_duration, bots=bots)
+    snake1, snake2 = match.snakes
+    if replay is None and BOT_PLAN_BUDGET_MS is not None:
+        match.scheduler = PlanScheduler(BOT_PLAN_BUDGET_MS)
+    match_log = MatchLog.record(match, SIM_STEP, bot_names)
 
     # Game variables
-    start_time = time.time()
+    if replay is not None:
+        # Simulated time runs playback_rate times as fast as the clock
+        timestep = FixedTimestep(SIM_STEP, MAX_CATCH_UP_STEPS * max(1, math.ceil(playback_rate)),
+                                 clock=lambda: time.perf_counter() * playback_rate)
+    else:
+        timestep = FixedTimestep(SIM_STEP, MAX_CATCH_UP_STEPS)
+    flash_image = powerup_image("flash.png", FLASH_SIZE, YELLOW)
+    snow_image = powerup_image("snow.jpg", SNOW_SIZE, WHITE)
+    food_sound = assets.sound("pop.mp3")
+    if food_sound is not None:
+        food_sound.set_volume(0.7)  # Set food sound volume to 70%
+    previous_bodies = [list(snake1.body), list(snake2.body)]
+    inputs = []  # Key presses waiting for the next simulation step
+    renderer = DirtyRectRenderer(screen, BLACK, DIRTY_RECTS)
+    profiler = FrameProfiler(PROFILER)
+    match.profiler = renderer.profiler = profiler
+    if replay is None:
+        if match.scheduler is not None:
+            profiler.sources.append(match.scheduler)  # Replays defer what the recording deferred, untimed
+        if hasattr(snake2.planner, 'overlay_rows'):
+            profiler.sources.append(snake2.planner)
     running = True
 
     while running:
-        current_time = time.time()
-        screen.fill(BLACK)
+        profiler.begin_frame()
+        if match.scheduler is not None:
+            match.scheduler.begin_frame()
 
         # Event handling
         for event in pygame.event.get():
@@ -796,221 +843,132 @@ def game_loop(game_mode, game_duration):
                     else:
                         pygame.mixer.music.unpause()
                         music_playing = True
+
+                # Dirty-rect / full redraw toggle
+                if event.key == pygame.K_r:
+                    renderer.toggle()
+
+                # Profiler overlay toggle and CSV dump
+                if event.key == pygame.K_F3:
+                    profiler.toggle()
+                elif event.key == pygame.K_F4 and profiler.frames:
+                    print(f"Frame profile written to {profiler.dump_csv()}")
                 
                 # Player 1 controls (WASD)
-                if event.key == pygame.K_w and snake1_direction != 'DOWN':
-                    snake1_direction = 'UP'
-                    snake1_change = [0, -SNAKE_SIZE]
-                elif event.key == pygame.K_s and snake1_direction != 'UP':
-                    snake1_direction = 'DOWN'
-                    snake1_change = [0, SNAKE_SIZE]
-                elif event.key == pygame.K_a and snake1_direction != 'RIGHT':
-                    snake1_direction = 'LEFT'
-                    snake1_change = [-SNAKE_SIZE, 0]
-                elif event.key == pygame.K_d and snake1_direction != 'LEFT':
-                    snake1_direction = 'RIGHT'
-                    snake1_change = [SNAKE_SIZE, 0]
+                if event.key == pygame.K_w:
+                    inputs.append((0, 'UP'))
+                elif event.key == pygame.K_s:
+                    inputs.append((0, 'DOWN'))
+                elif event.key == pygame.K_a:
+                    inputs.append((0, 'LEFT'))
+                elif event.key == pygame.K_d:
+                    inputs.append((0, 'RIGHT'))
 
                 # Player 2 controls (Arrow keys) - Only if not a bot game
                 if not is_bot_game:
-                    if event.key == pygame.K_UP and snake2_direction != 'DOWN':
-                        snake2_direction = 'UP'
-                        snake2_change = [0, -SNAKE_SIZE]
-                    elif event.key == pygame.K_DOWN and snake2_direction != 'UP':
-                        snake2_direction = 'DOWN'
-                        snake2_change = [0, SNAKE_SIZE]
-                    elif event.key == pygame.K_LEFT and snake2_direction != 'RIGHT':
-                        snake2_direction = 'LEFT'
-                        snake2_change = [-SNAKE_SIZE, 0]
-                    elif event.key == pygame.K_RIGHT and snake2_direction != 'LEFT':
-                        snake2_direction = 'RIGHT'
-                        snake2_change = [SNAKE_SIZE, 0]
-
-        # Bot decision making (if in PVE mode)
-        if is_bot_game and not snake2_frozen and current_time - bot_decision_time > bot_decision_interval:
-            # Collect obstacles (both snake bodies minus the tail that will move)
-            obstacles = snake1_body[:-1] + snake2_body[:-1]
-            
-            # Find path to food
-            bot_change = find_path_to_food(snake2_pos, food_pos, obstacles, WIDTH // SNAKE_SIZE, HEIGHT // SNAKE_SIZE)
-            
-            # Update direction based on the next move
-            if bot_change == (0, -SNAKE_SIZE) and snake2_direction != 'DOWN':
-                snake2_direction = 'UP'
-                snake2_change = [0, -SNAKE_SIZE]
-            elif bot_change == (0, SNAKE_SIZE) and snake2_direction != 'UP':
-                snake2_direction = 'DOWN'
-                snake2_change = [0, SNAKE_SIZE]
-            elif bot_change == (-SNAKE_SIZE, 0) and snake2_direction != 'RIGHT':
-                snake2_direction = 'LEFT'
-                snake2_change = [-SNAKE_SIZE, 0]
-            elif bot_change == (SNAKE_SIZE, 0) and snake2_direction != 'LEFT':
-                snake2_direction = 'RIGHT'
-                snake2_change = [SNAKE_SIZE, 0]
-                
-            bot_decision_time = current_time
-
-        # Check if either snake is frozen and update frozen status
-        if snake1_frozen and current_time - snake1_frozen_start_time > 3:
-            snake1_frozen = False
-            
-        if snake2_frozen and current_time - snake2_frozen_start_time > 3:
-            snake2_frozen = False
-
-        # Move snakes based on their individual timing, if not frozen
-        if not snake1_frozen and current_time - snake1_last_move_time > (1.0 / (FPS * snake1_speed_boost)):
-            # Update snake 1 position
-            snake1_pos[0] += snake1_change[0]
-            snake1_pos[1] += snake1_change[1]
-            
-            # Wrap around screen edges
-            snake1_pos[0] %= WIDTH
-            snake1_pos[1] %= HEIGHT
-            
-            # Update snake1 body
-            snake1_body.append(list(snake1_pos))
-            
-            # Check if Player 1 eats the food
-            if abs(snake1_pos[0] - food_pos[0]) < SNAKE_SIZE and abs(snake1_pos[1] - food_pos[1]) < SNAKE_SIZE:
-                snake1_score += 1
-                food_spawn = False
-                # Play sound effect when food is eaten
-                if has_food_sound:
-                    food_sound.play()
-            else:
-                snake1_body.pop(0)
-                
-            snake1_last_move_time = current_time
-        
-        if not snake2_frozen and current_time - snake2_last_move_time > (1.0 / (FPS * snake2_speed_boost)):
-            # Update snake 2 position
-            snake2_pos[0] += snake2_change[0]
-            snake2_pos[1] += snake2_change[1]
-            
-            # Wrap around screen edges
-            snake2_pos[0] %= WIDTH
-            snake2_pos[1] %= HEIGHT
-            
-            # Update snake2 body
-            snake2_body.append(list(snake2_pos))
-            
-            # Check if Player 2 eats the food
-            if abs(snake2_pos[0] - food_pos[0]) < SNAKE_SIZE and abs(snake2_pos[1] - food_pos[1]) < SNAKE_SIZE:
-                snake2_score += 1
-                food_spawn = False
+                    if event.key == pygame.K_UP:
+                        inputs.append((1, 'UP'))
+                    elif event.key == pygame.K_DOWN:
+                        inputs.append((1, 'DOWN'))
+                    elif event.key == pygame.K_LEFT:
+                        inputs.append((1, 'LEFT'))
+                    elif event.key == pygame.K_RIGHT:
+                        inputs.append((1, 'RIGHT'))
+        profiler.mark('events')
+
+        # Advance the game rules in fixed steps to catch up with the clock
+        for _ in range(timestep.advance()):
+            # Keep where each snake was before its move (a snake that is due
+            # but frozen does not move, and is drawn where it is)
+            for index, snake in enumerate(match.snakes):
+                if snake.move_timer.due():
+                    previous_bodies[index] = list(snake.body)
+            profiler.mark('movement')
+            if replay is not None:
+                inputs = replay.inputs_at(match_log.ticks)  # The keyboard only controls the display
+            for event_name, _ in match_log.step(match, inputs):
                 # Play sound effect when food is eaten
-                if has_food_sound:
+                if event_name == 'food' and food_sound is not None:
                     food_sound.play()
-            else:
-                snake2_body.pop(0)
-                
-            snake2_last_move_time = current_time
-
-        # Respawn food
-        if not food_spawn:
-            food_pos = [random.randrange(1, (WIDTH // SNAKE_SIZE)) * SNAKE_SIZE,
-                        random.randrange(1, (HEIGHT // SNAKE_SIZE)) * SNAKE_SIZE]
-            food_spawn = True
-
-        # Power-up logic
-        elapsed_time = current_time - start_time
-
-        # Spawn speed power-up after 10 seconds and every 5 seconds after it disappears
-        if elapsed_time > 10 and not flash_powerup_active and not (powerup_effect_active_1 or powerup_effect_active_2):
-            flash_powerup_pos = [random.randrange(1, (WIDTH // (SNAKE_SIZE * 3))) * SNAKE_SIZE * 3,
-                           random.randrange(1, (HEIGHT // (SNAKE_SIZE * 3))) * SNAKE_SIZE * 3]
-            flash_powerup_active = True
-
-        # Spawn freeze power-up after 15 seconds and every 10 seconds after it disappears
-        if elapsed_time > 15 and not snow_powerup_active and (snow_last_spawn_time is None or current_time - snow_last_spawn_time > 10):
-            snow_powerup_pos = [random.randrange(1, (WIDTH // (SNAKE_SIZE * 3))) * SNAKE_SIZE * 3,
-                         random.randrange(1, (HEIGHT // (SNAKE_SIZE * 3))) * SNAKE_SIZE * 3]
-            snow_powerup_active = True
-            
-        # Check if a snake touches the speed power-up
-        if flash_powerup_active:
-            if (flash_powerup_pos[0] <= snake1_pos[0] < flash_powerup_pos[0] + SNAKE_SIZE * 3 and
-                flash_powerup_pos[1] <= snake1_pos[1] < flash_powerup_pos[1] + SNAKE_SIZE * 3):
-                flash_powerup_active = False
-                powerup_effect_active_1 = True
-                powerup_effect_start_time_1 = current_time
-                snake1_speed_boost = 1.3  # Increase Player 1's speed by 30%
-            elif (flash_powerup_pos[0] <= snake2_pos[0] < flash_powerup_pos[0] + SNAKE_SIZE * 3 and
-                  flash_powerup_pos[1] <= snake2_pos[1] < flash_powerup_pos[1] + SNAKE_SIZE * 3):
-                flash_powerup_active = False
-                powerup_effect_active_2 = True
-                powerup_effect_start_time_2 = current_time
-                snake2_speed_boost = 1.3  # Increase Player 2's speed by 30%
-
-        # Check if a snake touches the freeze power-up
-        if snow_powerup_active:
-            if (snow_powerup_pos[0] <= snake1_pos[0] < snow_powerup_pos[0] + SNAKE_SIZE * 3 and
-                snow_powerup_pos[1] <= snake1_pos[1] < snow_powerup_pos[1] + SNAKE_SIZE * 3):
-                snow_powerup_active = False
-                snow_last_spawn_time = current_time
-                snake2_frozen = True  # Freeze opponent (Player 2)
-                snake2_frozen_start_time = current_time
-            elif (snow_powerup_pos[0] <= snake2_pos[0] < snow_powerup_pos[0] + SNAKE_SIZE * 3 and
-                  snow_powerup_pos[1] <= snake2_pos[1] < snow_powerup_pos[1] + SNAKE_SIZE * 3):
-                snow_powerup_active = False
-                snow_last_spawn_time = current_time
-                snake1_frozen = True  # Freeze opponent (Player 1)
-                snake1_frozen_start_time = current_time
-
-        # End power-up effects
-        # End power-up effect after 5 seconds for Player 1
-        if powerup_effect_active_1 and current_time - powerup_effect_start_time_1 > 5:
-            powerup_effect_active_1 = False
-            snake1_speed_boost = 1.0  # Reset Player 1's speed to normal
-
-        # End power-up effect after 5 seconds for Player 2
-        if powerup_effect_active_2 and current_time - powerup_effect_start_time_2 > 5:
-            powerup_effect_active_2 = False
-            snake2_speed_boost = 1.0  # Reset Player 2's speed to normal
-
-        # Draw power-ups
-        if flash_powerup_active:
-            screen.blit(flash_image, (flash_powerup_pos[0], flash_powerup_pos[1]))
-            
-        if snow_powerup_active:
-            screen.blit(snow_image, (snow_powerup_pos[0], snow_powerup_pos[1]))
+            inputs = []
+            if match.finished:
+                break
 
-        # Draw food
-        pygame.draw.rect(screen, GREEN, [food_pos[0], food_pos[1], SNAKE_SIZE, SNAKE_SIZE])
+        # Describe the frame; the renderer works out what changed and draws that
+        scene = []
 
-        # Draw snakes with original rectangle-based heads
-        draw_snake(snake1_body, RED)
-        draw_snake(snake2_body, BLUE if not is_bot_game else YELLOW)  # Make bot yellow to distinguish
-
-        # Display scores and status effects
+        # Power-ups
+        if match.flash_powerup_active:
+            scene.append(image_item('flash', flash_image, *match.flash_powerup_pos))
+            
+        if match.snow_powerup_active:
+            scene.append(image_item('snow', snow_image, *match.snow_powerup_pos))
+
+        # Food
+        for food in match.foods:
+            scene.append(block_item(GREEN, food.pos[0], food.pos[1]))
+
+        # Snakes with original rectangle-based heads
+        # (between their last two moves, by how far each is towards its next
+        # one; move_timer already counts the last simulation step, so they
+        # are drawn the rest of that step behind, like alpha does for states)
+        since_step = (timestep.alpha - 1.0) * SIM_STEP
+        scene += snake_items(interpolated_body(previous_bodies[0], snake1.body, snake1.move_timer.phase(since_step)), RED)
+        scene += snake_items(interpolated_body(previous_bodies[1], snake2.body, snake2.move_timer.phase(since_step)), BLUE if not is_bot_game else YELLOW)  # Make bot yellow to distinguish
+
+        # Scores and status effects
         player1_name = "Player 1"
         player2_name = "Player 2" if not is_bot_game else "Bot"
         
-        display_message(f"{player1_name}: {snake1_score}", WHITE, 10, 10)
-        if snake1_frozen:
-            display_message("FROZEN!", WHITE, 10, 70)
-        display_message(f"{player2_name}: {snake2_score}", WHITE, 10, 40)
-        if snake2_frozen:
-            display_message("FROZEN!", WHITE, 10, 100)
+        scene.append(text_item(font, f"{player1_name}: {snake1.score}", WHITE, 10, 10))
+        if snake1.frozen:
+            scene.append(text_item(font, "FROZEN!", WHITE, 10, 70))
+        scene.append(text_item(font, f"{player2_name}: {snake2.score}", WHITE, 10, 40))
+        if snake2.frozen:
+            scene.append(text_item(font, "FROZEN!", WHITE, 10, 100))
 
-        # Display timer
-        remaining_time = max(0, GAME_DURATION - int(elapsed_time))
-        display_message(f"Time Left: {remaining_time}s", WHITE, WIDTH - 200, 10)
+        # Timer
+        remaining_time = max(0, GAME_DURATION - int(match.time))
+        scene.append(text_item(font, f"Time Left: {remaining_time}s", WHITE, WIDTH - 200, 10))
+
+        # Profiler overlay, under the timer
+        if profiler.enabled:
+            scene.append(profiler.overlay_item(WIDTH - 220, 45))
+
+        renderer.render(scene)
+        profiler.mark('display.update')
 
         # Check game duration
-        if current_time - start_time >= game_duration:
+        if match.finished:
             running = False
 
-        pygame.display.update()
-        
-        # Fixed frame rate for rendering only
+        # Cap the render frame rate; the simulation rate does not depend on it
         clock.tick(60)
 
-    # Return final scores
-    return snake1_score, snake2_score, is_bot_game
+    match_log.finish(match)
+    if replay is not None and match_log.scores != replay.scores:
+        print(f"Replay ended with scores {match_log.scores}, the recording with {replay.scores}")
+    elif replay is None and RECORD_MATCHES:
+        path = time.strftime("match_%Y%m%d_%H%M%S.snakelog")
+        match_log.save(path)
+        print(f"Match recorded to {path}")
 
-def main():
-    """Main function with game loop that can restart"""
+    # Return final scores
+    return snake1.score, snake2.score, is_bot_game
+
+def main(replay_path=None, playback_rate=1.0):
+    """Main function with game loop that can restart
+
+    With replay_path, plays that recorded match back and shows its end screen.
+    """
+    init()
+    if replay_path is not None:
+        from match_replay import MatchLog
+        replay = MatchLog.load(replay_path)
+        snake1_score, snake2_score, is_bot_game = game_loop(replay.game_mode, replay.duration, replay, playback_rate)
+        display_end_screen(snake1_score, snake2_score, is_bot_game)
+        pygame.quit()
+        return
     running = True
     
     # Show intro screen first
@@ -1033,4 +991,18 @@ def main():
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--replay", help="play back a recorded .snakelog match")
+    parser.add_argument("--rate", type=float, default=1.0, help="playback speed of --replay")
+    parser.add_argument("--connect", metavar="HOST[:PORT]",
+                        help="play PVP online against whoever joins a snake_net.py server")
+    args = parser.parse_args()
+    if args.connect:
+        import asyncio
+        from snake_net import PORT, play_online
+        host, _, port = args.connect.partition(":")
+        print(asyncio.run(play_online(host, int(port) if port else PORT)))
+    else:
+        main(args.replay, args.rate)
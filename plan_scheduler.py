@@ -0,0 +1,173 @@
+import time
+from collections import deque
+
+
+def plan_order(match, due, keys):
+    """The due bots in the order the scheduler decides them
+
+    Bots whose snake moves in this step come first (a decision after the
+    move is a move in the wrong direction), then bots whose plan no longer
+    holds (they have to search anyway), then the rest by how long they have
+    waited. Ties keep the snake index order.
+
+    Whether a plan holds is only asked (needs_search) when the bot's state
+    changed: keys maps each snake index to (planner, decision_time, food
+    position, needs search) from the last time, and is kept by the caller
+    between steps. A cut in a deferred bot's plan is noticed at its next
+    decision, not here.
+    """
+    order = []
+    food_pos = match.food_pos
+    for index in due:
+        snake = match.snakes[index]
+        key = keys.get(index)
+        if key is None or key[0] is not snake.planner or key[1] != snake.decision_time or key[2] != food_pos:
+            needs_search = getattr(snake.planner, 'needs_search', None)
+            invalid = needs_search(food_pos) if needs_search is not None else False
+            key = keys[index] = (snake.planner, snake.decision_time, food_pos, invalid)
+        order.append((not snake.move_timer.due(), not key[3], snake.decision_time, index))
+    order.sort()
+    return [entry[3] for entry in order]
+
+
+class PlanScheduler:
+    """Gives the bot decisions of each frame a time budget
+
+    SnakeMatch.step hands run() the bots due for a decision instead of
+    asking them all; they are decided in plan_order() while the next one is
+    expected to fit in what is left of budget_ms this frame, and the rest
+    are deferred. The time spent ordering them counts against the budget,
+    and a bot is expected to take as long as its last decision of the same
+    kind (search or not), or the whole budget before its first one. A
+    deferred bot keeps its old decision_time, so it is due again in the next
+    step and is among the first once its snake is about to move. At least
+    one bot is decided per frame, so a search slower than the whole budget
+    still happens. Apart from that forced decision, a frame only goes over
+    when a bot takes longer than expected.
+
+    game_loop calls begin_frame() once per rendered frame (the match may
+    step several times in it). The last history frames are kept as
+    (planning ms, decisions, deferred) for report() and the profiler overlay.
+    """
+
+    def __init__(self, budget_ms=2.0, history=600, clock=time.perf_counter):
+        self.budget = budget_ms / 1000.0
+        self.clock = clock
+        self.frames = deque(maxlen=history)  # (planning ms, decisions, deferred) per frame
+        self.keys = {}  # plan_order's cache, per snake index
+        self.estimates = {}  # (snake index, needs search) -> seconds its last such decision took
+        self.spent = 0.0  # Planning seconds in the current frame
+        self.decisions = 0
+        self.deferred = 0
+        self.total_decisions = 0
+        self.total_deferred = 0
+
+    def begin_frame(self):
+        """Close the current frame's counts and give the next frame a fresh budget"""
+        self.frames.append((1000 * self.spent, self.decisions, self.deferred))
+        self.spent = 0.0
+        self.decisions = self.deferred = 0
+
+    def run(self, match, due, now):
+        """Decide the due bots that fit in the budget; returns the deferred ones"""
+        start = self.clock()
+        order = plan_order(match, due, self.keys)
+        self.spent += self.clock() - start
+        for i, index in enumerate(order):
+            kind = (index, self.keys[index][3])
+            if self.decisions and self.spent + self.estimates.get(kind, self.budget) > self.budget:
+                deferred = order[i:]
+                self.deferred += len(deferred)
+                self.total_deferred += len(deferred)
+                return deferred
+            start = self.clock()
+            match.decide(index, now)
+            cost = self.clock() - start
+            self.estimates[kind] = cost
+            self.spent += cost
+            self.decisions += 1
+            self.total_decisions += 1
+        return []
+
+    def report(self, frames=60):
+        """Mean and peak planning ms, and decisions and deferrals, over the last frames"""
+        recent = list(self.frames)[-frames:]
+        if not recent:
+            return {'mean_ms': 0.0, 'max_ms': 0.0, 'decisions': 0, 'deferred': 0}
+        return {
+            'mean_ms': sum(sample[0] for sample in recent) / len(recent),
+            'max_ms': max(sample[0] for sample in recent),
+            'decisions': sum(sample[1] for sample in recent),
+            'deferred': sum(sample[2] for sample in recent)
+        }
+
+    def overlay_rows(self):
+        """(label, value) rows for the FrameProfiler overlay"""
+        stats = self.report()
+        return [("plan budget", f"{stats['mean_ms']:.2f}/{1000 * self.budget:.1f} ms"),
+                ("plan peak", f"{stats['max_ms']:.2f} ms"),
+                ("decided/deferred", f"{stats['decisions']}/{stats['deferred']}")]
+
+
+if __name__ == "__main__":
+    from snake_match import SnakeMatch, search_bot
+
+    # Budget check on a fake clock: each reading of it takes 0.01 ms, bot 0
+    # decisions 0.3 ms and bot 1 decisions 0.2 ms, and the match steps six
+    # times per frame (a 10 fps render), so both bots are due in most
+    # frames. With a 0.45 ms budget the two never fit in one frame
+    fake_now = [0.0]
+
+    def fake_clock():
+        fake_now[0] += 0.00001
+        return fake_now[0]
+
+    def costly_bot(cost):
+        def make_bot(grid_width, grid_height, occupancy, rng):
+            bot = search_bot(grid_width, grid_height, occupancy, rng)
+            next_move = bot.next_move
+
+            def slow_next_move(snake_head, food_pos):
+                fake_now[0] += cost
+                return next_move(snake_head, food_pos)
+            bot.next_move = slow_next_move
+            return bot
+        return make_bot
+
+    scheduler = PlanScheduler(0.45, clock=fake_clock)
+    match = SnakeMatch("PVE", 60, 0, bots={0: costly_bot(0.0003), 1: costly_bot(0.0002)})
+    match.scheduler = scheduler
+    while not match.finished:
+        scheduler.begin_frame()
+        for _ in range(6):
+            match.step((), 1.0 / 60)
+            # Only a frame's one forced decision may take it over the budget
+            assert scheduler.spent <= scheduler.budget or scheduler.decisions == 1, \
+                (1000 * scheduler.spent, scheduler.decisions)
+    assert scheduler.total_deferred, "the check never had to defer"
+    print(f"fake clock: {scheduler.total_decisions} decisions, {scheduler.total_deferred} deferred, "
+          f"no frame over the budget")
+
+    # Bot vs bot with from-scratch searches, one step per frame: planning
+    # time per frame with every due bot decided, and with a 0.2 ms budget.
+    # A single search can take longer than the budget, so the worst frame
+    # is one search either way; what the budget removes are the frames
+    # where several decisions pile up
+    budget_ms = 0.2
+    for budget in (None, budget_ms):
+        frames = []
+        for seed in range(5):
+            match = SnakeMatch("PVE", 60, seed, bots={0: search_bot, 1: search_bot})
+            scheduler = PlanScheduler(budget if budget is not None else float('inf'), history=None)
+            match.scheduler = scheduler
+            while not match.finished:
+                scheduler.begin_frame()
+                match.step((), 1.0 / 60)
+            scheduler.begin_frame()
+            frames.extend(scheduler.frames)
+        over = [sample for sample in frames if sample[0] > budget_ms]
+        planning = sorted(sample[0] for sample in frames)
+        label = "no budget" if budget is None else f"{budget} ms budget"
+        print(f"{label:>14}: p99 frame {planning[int(0.99 * len(planning))]:.3f} ms, worst {planning[-1]:.3f} ms "
+              f"planning; {len(over)} frames over {budget_ms} ms, "
+              f"{sum(1 for sample in over if sample[1] > 1)} of them with more than one decision")
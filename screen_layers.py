@@ -0,0 +1,62 @@
+import pygame
+
+
+def blit_premultiplied(layer, surface, pos):
+    """Blit a (straight alpha) surface onto a transparent layer"""
+    # premul_alpha() comes out blank for font.render surfaces unless converted first
+    layer.blit(surface.convert_alpha().premul_alpha(), pos, special_flags=pygame.BLEND_PREMULTIPLIED)
+
+
+class ScreenLayers:
+    """Static parts of the menu screens, drawn once into cached surfaces
+
+    The intro, menu and preparation screens used to redraw (and re-render
+    the text of) every box, title and legend 60 times a second, although
+    only the snakes, the pulsing text and the hovered button ever change.
+    Each static part is now built once by a build(surface) function and
+    cached under a key; the key includes whatever the content depends on
+    (game mode, hover state), so a mode change picks a different layer
+    instead of redrawing. All layers are dropped and rebuilt when the
+    screen size changes.
+
+    Layers are transparent (SRCALPHA) unless flags says otherwise.
+    Transparent layers hold premultiplied colors: builders draw text and
+    images onto them with blit_premultiplied(), and blit() draws the layer
+    with BLEND_PREMULTIPLIED, so antialiased edges come out the same as
+    drawing the parts straight onto the screen.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.size = screen.get_size()
+        self.surfaces = {}
+        self.builds = 0  # layers built so far, to check nothing is rebuilt every frame
+
+    def layer(self, key, size, build, flags=pygame.SRCALPHA):
+        """The cached surface for key, built with build(surface) the first time"""
+        if self.screen.get_size() != self.size:
+            self.invalidate()
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = pygame.Surface(size, flags)
+            build(surface)
+            self.surfaces[key] = surface
+            self.builds += 1
+        return surface
+
+    def blit(self, key, size, build, pos=(0, 0)):
+        """Draw the transparent layer for key on the screen at pos"""
+        surface = self.layer(key, size, build)
+        self.screen.blit(surface, pos, special_flags=pygame.BLEND_PREMULTIPLIED)
+
+    def overlay(self, color, alpha):
+        """A full-screen surface of one color, blitted with the given alpha"""
+        def build(surface):
+            surface.fill(color)
+            surface.set_alpha(alpha)
+        return self.layer(('overlay', color, alpha), self.screen.get_size(), build, flags=0)
+
+    def invalidate(self):
+        """Drop every layer (after a resize or anything else they depend on)"""
+        self.surfaces.clear()
+        self.size = self.screen.get_size()
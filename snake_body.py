@@ -0,0 +1,84 @@
+from array import array
+
+
+class SnakeBody:
+    """Snake segments as a ring buffer of packed positions (tail first, head last)
+
+    Replaces the list of [x, y] lists: push_head and pop_tail are O(1) and
+    allocate nothing, instead of list(pos) + pop(0) shifting the whole list
+    every move. Iterating yields (x, y) pixel positions from tail to head,
+    so draw_snake can use it like the old list.
+
+    Positions are packed as y * width + x in pixels rather than as cell
+    indices, because the starting rows (y=50, y=550) are not cell aligned and
+    the food check depends on the exact pixel position.
+
+    The buffer starts with room for capacity segments and doubles if a snake
+    ever outgrows it.
+    """
+
+    def __init__(self, width, capacity=64):
+        self.width = width  # screen width in pixels, the row stride of a packed position
+        self.slots = array('i', bytes(4 * capacity))
+        self.start = 0  # index of the tail in slots
+        self.length = 0
+
+    @classmethod
+    def from_positions(cls, width, positions, capacity=64):
+        """Build a body from pixel positions ordered tail to head"""
+        body = cls(width, max(capacity, len(positions)))
+        for pos in positions:
+            body.push_head(pos)
+        return body
+
+    def to_list(self):
+        """The body in the old format, a list of [x, y] lists from tail to head"""
+        return [list(pos) for pos in self]
+
+    def pack(self, pos):
+        return pos[1] * self.width + pos[0]
+
+    def position(self, packed):
+        y, x = divmod(packed, self.width)
+        return (x, y)
+
+    def _grow(self):
+        # Unroll the ring into a buffer twice the size
+        slots = self.slots
+        capacity = len(slots)
+        grown = array('i', bytes(8 * capacity))
+        for i in range(self.length):
+            grown[i] = slots[(self.start + i) % capacity]
+        self.slots = grown
+        self.start = 0
+
+    def push_head(self, pos):
+        if self.length == len(self.slots):
+            self._grow()
+        self.slots[(self.start + self.length) % len(self.slots)] = self.pack(pos)
+        self.length += 1
+
+    def pop_tail(self):
+        """Remove the tail segment and return its pixel position"""
+        if self.length == 0:
+            raise IndexError("pop from empty snake body")
+        packed = self.slots[self.start]
+        self.start = (self.start + 1) % len(self.slots)
+        self.length -= 1
+        return self.position(packed)
+
+    def head(self):
+        return self.position(self.slots[(self.start + self.length - 1) % len(self.slots)])
+
+    def tail(self):
+        return self.position(self.slots[self.start])
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        slots = self.slots
+        capacity = len(slots)
+        position = self.position
+        for i in range(self.length):
+            yield position(slots[(self.start + i) % capacity])
@@ -0,0 +1,344 @@
+import random
+
+from fixed_timestep import TickRate
+from snake_body import SnakeBody
+from snake_pathfinding import SNAKE_SIZE, BotPlanner, OccupancyGrid, SearchBot
+from spatial_hash import SpatialHash
+
+# Board settings (must match the games)
+WIDTH, HEIGHT = 800, 600
+FPS = 10
+
+# Rule settings, as in game_loop
+BOT_DECISION_INTERVAL = 0.1  # How often a bot makes decisions (in seconds)
+FREEZE_DURATION = 3  # Snow power-up freezes the opponent for 3s
+BOOST_DURATION = 5  # Flash power-up lasts 5s
+BOOST_MULTIPLIER = 1.3  # and makes the snake 30% faster
+FLASH_FIRST_SPAWN = 10  # Flash power-up appears after 10s
+SNOW_FIRST_SPAWN = 15  # Snow power-up appears after 15s
+SNOW_RESPAWN_DELAY = 10  # and again 10s after it was picked up
+POWERUP_SIZE = SNAKE_SIZE * 3
+
+# Direction name -> position change
+MOVES = {
+    'UP': (0, -SNAKE_SIZE),
+    'DOWN': (0, SNAKE_SIZE),
+    'LEFT': (-SNAKE_SIZE, 0),
+    'RIGHT': (SNAKE_SIZE, 0)
+}
+OPPOSITE = {'UP': 'DOWN', 'DOWN': 'UP', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT'}
+DIRECTION_OF_CHANGE = {change: direction for direction, change in MOVES.items()}
+
+
+class SnakeState:
+    """Everything game_loop tracked as snakeN_* locals, for one snake"""
+
+    def __init__(self, pos, body, direction):
+        self.pos = list(pos)
+        self.body = SnakeBody.from_positions(WIDTH, body)
+        self.direction = direction
+        self.change = MOVES[direction]
+        self.score = 0
+        self.speed_boost = 1.0  # Speed multiplier
+        self.move_timer = TickRate(FPS)  # Moves on the first step, then FPS * speed_boost times a second
+        self.frozen = False
+        self.frozen_start_time = None
+        self.boost_active = False
+        self.boost_start_time = None
+        self.planner = None  # Set for bot-controlled snakes
+        self.decision_time = float('-inf')
+
+
+class Pickup:
+    """Something on the board a snake collects: food or a power-up"""
+
+    def __init__(self, kind, pos, size):
+        self.kind = kind  # 'food', 'flash' or 'snow'
+        self.pos = pos
+        self.size = size
+
+
+def default_bot(grid_width, grid_height, occupancy, rng):
+    """The game's PVE bot: a persistent A* planner on the wrapping board"""
+    return BotPlanner(grid_width, grid_height, wrap=True, occupancy=occupancy, rng=rng)
+
+
+def search_bot(grid_width, grid_height, occupancy, rng):
+    """A from-scratch A* search every decision, like find_path_to_food"""
+    return SearchBot(grid_width, grid_height, wrap=True, occupancy=occupancy, rng=rng)
+
+
+class SnakeMatch:
+    """Headless, deterministic version of the rules in game_loop
+
+    Owns the snakes, scores, food, power-ups and the freeze/boost timers, and
+    advances them with step(inputs, dt) on its own clock instead of
+    time.time(). It is meant to be stepped with a fixed dt (see
+    FixedTimestep), and each snake moves on its own TickRate. All randomness
+    comes from one seeded random.Random, and nothing here touches pygame, so
+    matches can be simulated (and replayed) much faster than real time.
+
+    bots maps a snake index (0 = red, 1 = blue/yellow) to a factory
+    f(grid_width, grid_height, occupancy, rng) returning an object with
+    next_move(snake_head, food_pos); "PVE" defaults to default_bot for snake 1.
+
+    Food and power-ups are Pickups in a SpatialHash (pickups), so a snake
+    head finds what it is on with one cell lookup however many there are;
+    food_count foods are kept on the board, and bots head for the first.
+
+    Set profiler to a FrameProfiler to have step() time its bot, movement
+    and power-up phases, and scheduler to a PlanScheduler to give the bot
+    decisions a time budget (the bots it defers are listed in deferred).
+    """
+
+    def __init__(self, game_mode="PVE", duration=60, seed=None, bots=None, food_count=1):
+        self.game_mode = game_mode
+        self.duration = duration
+        if seed is None:
+            # Still pick a concrete seed, so any match can be recorded and replayed
+            seed = random.randrange(2 ** 63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.grid_width = WIDTH // SNAKE_SIZE
+        self.grid_height = HEIGHT // SNAKE_SIZE
+
+        # Player 1 (Red Snake) and Player 2 (Blue Snake) / Bot, each starting with 2 blocks
+        self.snakes = [
+            SnakeState([100, 50], [[100, 50], [80, 50]], 'RIGHT'),
+            SnakeState([700, 550], [[700, 550], [720, 550]], 'LEFT')
+        ]
+
+        # Which cells the snake bodies cover, updated on every head append and tail pop
+        self.occupancy = OccupancyGrid(self.grid_width, self.grid_height)
+        self.occupancy.reset([pos for snake in self.snakes for pos in snake.body])
+
+        if bots is None:
+            bots = {1: default_bot} if game_mode == "PVE" else {}
+        for index, make_bot in bots.items():
+            self.snakes[index].planner = make_bot(self.grid_width, self.grid_height, self.occupancy, self.rng)
+
+        # Food and power-ups, indexed by the cells they cover
+        self.pickups = SpatialHash(SNAKE_SIZE)
+        self.foods = [self.spawn('food', self.random_food_position(), SNAKE_SIZE) for _ in range(food_count)]
+        self.flash_powerup = None
+        self.snow_powerup = None
+        self.snow_last_spawn_time = None
+
+        self.time = 0.0  # Seconds since the match started
+        self.finished = False
+        self.profiler = None
+        self.scheduler = None
+        self.deferred = []  # Bots whose decision the scheduler put off in the last step
+        self.ticks = 0  # Steps so far
+
+    @property
+    def food_pos(self):
+        return self.foods[0].pos
+
+    @property
+    def flash_powerup_active(self):
+        return self.flash_powerup is not None
+
+    @property
+    def flash_powerup_pos(self):
+        return self.flash_powerup.pos if self.flash_powerup is not None else None
+
+    @property
+    def snow_powerup_active(self):
+        return self.snow_powerup is not None
+
+    @property
+    def snow_powerup_pos(self):
+        return self.snow_powerup.pos if self.snow_powerup is not None else None
+
+    def spawn(self, kind, pos, size):
+        """Put a pickup on the board"""
+        pickup = Pickup(kind, pos, size)
+        self.pickups.insert(pickup, pos[0], pos[1], size, size)
+        return pickup
+
+    def despawn(self, pickup):
+        self.pickups.remove(pickup)
+
+    def respawn(self, pickup, pos):
+        """Move a pickup to a new position"""
+        pickup.pos = pos
+        self.pickups.insert(pickup, pos[0], pos[1], pickup.size, pickup.size)
+
+    def random_food_position(self):
+        return [self.rng.randrange(1, (WIDTH // SNAKE_SIZE)) * SNAKE_SIZE,
+                self.rng.randrange(1, (HEIGHT // SNAKE_SIZE)) * SNAKE_SIZE]
+
+    def random_powerup_position(self):
+        return [self.rng.randrange(1, (WIDTH // POWERUP_SIZE)) * POWERUP_SIZE,
+                self.rng.randrange(1, (HEIGHT // POWERUP_SIZE)) * POWERUP_SIZE]
+
+    def turn(self, index, direction):
+        """Change a snake's direction, unless it would reverse onto itself"""
+        snake = self.snakes[index]
+        if snake.direction != OPPOSITE[direction]:
+            snake.direction = direction
+            snake.change = MOVES[direction]
+
+    def step(self, inputs=(), dt=0.0):
+        """Advance the match by dt seconds
+
+        inputs is a sequence of (snake index, direction name) in the order the
+        keys were pressed. Returns a list of (event, snake index) tuples for
+        things the front end reacts to: 'food', 'flash' and 'snow'.
+        """
+        self.time += dt
+        now = self.time
+        events = []
+        snakes = self.snakes
+
+        for index, direction in inputs:
+            self.turn(index, direction)
+
+        # Bot decision making, within the scheduler's time budget if there is one
+        due = [index for index, snake in enumerate(snakes)
+               if snake.planner and not snake.frozen and now - snake.decision_time > BOT_DECISION_INTERVAL]
+        self.deferred = []
+        if self.scheduler is not None:
+            if due:
+                self.deferred = self.scheduler.run(self, due, now)
+        else:
+            for index in due:
+                self.decide(index, now)
+        if self.profiler is not None:
+            self.profiler.mark('bot')
+
+        # Check if either snake is frozen and update frozen status
+        for snake in snakes:
+            if snake.frozen and now - snake.frozen_start_time > FREEZE_DURATION:
+                snake.frozen = False
+
+        # Move snakes based on their individual tick rates, if not frozen
+        eaten = []
+        moved = False
+        for index, snake in enumerate(snakes):
+            if snake.frozen or not snake.move_timer.advance(dt):
+                continue
+            moved = True
+
+            # Wrap around screen edges
+            snake.pos[0] = (snake.pos[0] + snake.change[0]) % WIDTH
+            snake.pos[1] = (snake.pos[1] + snake.change[1]) % HEIGHT
+
+            snake.body.push_head(snake.pos)
+            self.occupancy.add(snake.pos)
+
+            # Check if the snake eats food its head overlaps (both can eat it in the same step)
+            foods = [pickup for pickup in self.pickups.query(snake.pos[0], snake.pos[1], SNAKE_SIZE, SNAKE_SIZE)
+                     if pickup.kind == 'food']
+            if foods:
+                for food in foods:
+                    snake.score += 1
+                    events.append(('food', index))
+                    if food not in eaten:
+                        eaten.append(food)
+            else:
+                self.occupancy.remove(snake.body.pop_tail())
+
+        # Respawn eaten food
+        for food in eaten:
+            self.respawn(food, self.random_food_position())
+        if self.profiler is not None:
+            self.profiler.mark('movement')
+
+        # Spawn speed power-up after 10 seconds, again once nobody is boosted
+        spawned = False
+        if (now > FLASH_FIRST_SPAWN and self.flash_powerup is None
+                and not any(snake.boost_active for snake in snakes)):
+            self.flash_powerup = self.spawn('flash', self.random_powerup_position(), POWERUP_SIZE)
+            spawned = True
+
+        # Spawn freeze power-up after 15 seconds and every 10 seconds after it disappears
+        if (now > SNOW_FIRST_SPAWN and self.snow_powerup is None
+                and (self.snow_last_spawn_time is None or now - self.snow_last_spawn_time > SNOW_RESPAWN_DELAY)):
+            self.snow_powerup = self.spawn('snow', self.random_powerup_position(), POWERUP_SIZE)
+            spawned = True
+
+        # The pickups under each snake's head. A head can only have reached
+        # one if a snake moved or a power-up spawned in this step; otherwise
+        # the last step already collected everything that was touched.
+        touching = None
+        if (moved or spawned) and (self.flash_powerup is not None or self.snow_powerup is not None):
+            touching = [self.pickups.at(snake.pos[0], snake.pos[1]) for snake in snakes]
+
+        # Check if a snake touches the speed power-up (Player 1 checked first)
+        if touching is not None and self.flash_powerup is not None:
+            for index, snake in enumerate(snakes):
+                if self.flash_powerup in touching[index]:
+                    self.despawn(self.flash_powerup)
+                    self.flash_powerup = None
+                    snake.boost_active = True
+                    snake.boost_start_time = now
+                    snake.speed_boost = BOOST_MULTIPLIER
+                    snake.move_timer.rate = FPS * BOOST_MULTIPLIER
+                    events.append(('flash', index))
+                    break
+
+        # Check if a snake touches the freeze power-up, which freezes the opponent
+        if touching is not None and self.snow_powerup is not None:
+            for index, snake in enumerate(snakes):
+                if self.snow_powerup in touching[index]:
+                    self.despawn(self.snow_powerup)
+                    self.snow_powerup = None
+                    self.snow_last_spawn_time = now
+                    opponent = snakes[1 - index]
+                    opponent.frozen = True
+                    opponent.frozen_start_time = now
+                    events.append(('snow', index))
+                    break
+
+        # End power-up effects after 5 seconds
+        for snake in snakes:
+            if snake.boost_active and now - snake.boost_start_time > BOOST_DURATION:
+                snake.boost_active = False
+                snake.speed_boost = 1.0
+                snake.move_timer.rate = FPS
+
+        # Check game duration
+        if now >= self.duration:
+            self.finished = True
+        if self.profiler is not None:
+            self.profiler.mark('power-ups')
+
+        self.ticks += 1
+        return events
+
+    def decide(self, index, now):
+        """Ask a bot for its next move and turn its snake"""
+        snake = self.snakes[index]
+        bot_change = snake.planner.next_move(snake.pos, self.food_pos)
+        if bot_change in DIRECTION_OF_CHANGE:
+            self.turn(index, DIRECTION_OF_CHANGE[bot_change])
+        snake.decision_time = now
+
+    def scores(self):
+        return [snake.score for snake in self.snakes]
+
+
+def run_headless(game_mode="PVE", duration=60, seed=None, bots=None, dt=1.0 / 60):
+    """Play a whole match with a null renderer at fixed dt; returns the match"""
+    match = SnakeMatch(game_mode, duration, seed, bots)
+    while not match.finished:
+        match.step((), dt)
+    return match
+
+
+if __name__ == "__main__":
+    import time
+
+    # Bot vs bot at the game's 60 fps frame rate, as fast as possible
+    start = time.perf_counter()
+    ticks = 0
+    for seed in range(10):
+        match = SnakeMatch("PVE", 60, seed, bots={0: default_bot, 1: default_bot})
+        while not match.finished:
+            match.step((), 1.0 / 60)
+            ticks += 1
+        print(f"seed {seed}: scores {match.scores()}")
+    elapsed = time.perf_counter() - start
+    print(f"{ticks} ticks in {elapsed:.2f}s ({ticks / elapsed:.0f} ticks/s)")
@@ -0,0 +1,645 @@
+import asyncio
+import random
+import struct
+import time
+from collections import deque
+
+from fixed_timestep import EPSILON, FixedTimestep
+from snake_match import (WIDTH, HEIGHT, FPS, BOOST_MULTIPLIER, FREEZE_DURATION, BOOST_DURATION, MOVES, OPPOSITE,
+                         SnakeMatch)
+from snake_pathfinding import SNAKE_SIZE
+from spatial_hash import overlaps
+
+PORT = 5555
+PROTOCOL_VERSION = 1
+
+# The server runs the rules at the games' fixed rate
+SIM_STEP = 1.0 / 60
+MAX_CATCH_UP_STEPS = 5
+MAX_SEND_BUFFER = 256 * 1024  # A client this far behind on reading is disconnected, never waited for
+
+# Every position in the game is a multiple of 10 pixels (snakes start at
+# y=50, food is on the 20 pixel grid, power-ups on the 60 pixel grid), so
+# a position is sent as one u16: (y // 10) * (WIDTH // 10) + x // 10
+POSITION_UNIT = 10
+POSITION_ROW = WIDTH // POSITION_UNIT
+NO_POSITION = 0xFFFF
+DIRECTIONS = ['UP', 'DOWN', 'LEFT', 'RIGHT']  # as in match_replay
+
+# Messages (little endian), each framed by a u16 length:
+#   JOIN      client -> server  type, protocol version
+#   WELCOME   server -> client  type, room, snake index, seed, duration, step
+#   INPUT     client -> server  type, input number, direction (only sent when it changes)
+#   SNAPSHOT  server -> client  type, tick, last input number applied, changed fields, fields
+JOIN, WELCOME, INPUT, SNAPSHOT = 1, 2, 3, 4
+LENGTH = struct.Struct("<H")
+JOIN_MESSAGE = struct.Struct("<BB")
+WELCOME_MESSAGE = struct.Struct("<BIBQdd")
+INPUT_MESSAGE = struct.Struct("<BIB")
+SNAPSHOT_HEADER = struct.Struct("<BIIB")
+U8 = struct.Struct("<B")
+U16 = struct.Struct("<H")
+
+# Snapshot fields, in payload order; only the changed ones are sent
+FULL = 1  # bodies: whole bodies (u16 count + positions) instead of pushed heads and popped tails
+BODIES = 2  # per snake: u8 pushed, pushed head positions, u8 popped tails
+FOOD = 4  # food position
+SCORES = 8  # u16 per snake
+POWERUPS = 16  # flash and snow positions, NO_POSITION when not on the board
+EFFECTS = 32  # per snake: frozen and boosted milliseconds left
+HEADINGS = 64  # per snake: direction index
+FINISHED = 128
+
+
+def pack_position(pos):
+    return (pos[1] // POSITION_UNIT) * POSITION_ROW + pos[0] // POSITION_UNIT
+
+
+def unpack_position(packed):
+    y, x = divmod(packed, POSITION_ROW)
+    return (x * POSITION_UNIT, y * POSITION_UNIT)
+
+
+def frame(message):
+    return LENGTH.pack(len(message)) + message
+
+
+async def read_frame(reader):
+    (length,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+    return await reader.readexactly(length)
+
+
+def capture(match):
+    """What a snapshot is computed from: the parts of a match clients see"""
+    snakes = tuple((tuple(snake.pos), len(snake.body), snake.direction, snake.score,
+                    snake.frozen, snake.boost_active) for snake in match.snakes)
+    return (snakes, tuple(match.food_pos), match.flash_powerup_pos and tuple(match.flash_powerup_pos),
+            match.snow_powerup_pos and tuple(match.snow_powerup_pos), match.finished)
+
+
+def encode_delta(previous, current, match):
+    """(changed fields, payload) from capture previous to capture current; everything if previous is None"""
+    snakes, food, flash, snow, finished = current
+    mask = 0
+    out = bytearray()
+
+    if previous is None:
+        mask |= FULL | BODIES
+        for snake in match.snakes:
+            out += U16.pack(len(snake.body))
+            for pos in snake.body:
+                out += U16.pack(pack_position(pos))
+    elif any(before[0] != after[0] for before, after in zip(previous[0], snakes)):
+        mask |= BODIES
+        for snake, before, after in zip(match.snakes, previous[0], snakes):
+            pushed = 1 if after[0] != before[0] else 0  # A snake moves at most once a step
+            out += U8.pack(pushed)
+            if pushed:
+                out += U16.pack(pack_position(after[0]))
+            out += U8.pack(before[1] + pushed - after[1])
+
+    if previous is None or food != previous[1]:
+        mask |= FOOD
+        out += U16.pack(pack_position(food))
+    if previous is None or any(before[3] != after[3] for before, after in zip(previous[0], snakes)):
+        mask |= SCORES
+        for snake in snakes:
+            out += U16.pack(snake[3])
+    if previous is None or (flash, snow) != previous[2:4]:
+        mask |= POWERUPS
+        for pos in (flash, snow):
+            out += U16.pack(pack_position(pos) if pos is not None else NO_POSITION)
+    if previous is None or any(before[4:6] != after[4:6] for before, after in zip(previous[0], snakes)):
+        mask |= EFFECTS
+        now = match.time
+        for snake in match.snakes:
+            frozen = FREEZE_DURATION - (now - snake.frozen_start_time) if snake.frozen else 0.0
+            boosted = BOOST_DURATION - (now - snake.boost_start_time) if snake.boost_active else 0.0
+            out += U16.pack(max(0, int(1000 * frozen))) + U16.pack(max(0, int(1000 * boosted)))
+    if previous is None or any(before[2] != after[2] for before, after in zip(previous[0], snakes)):
+        mask |= HEADINGS
+        for snake in snakes:
+            out += U8.pack(DIRECTIONS.index(snake[2]))
+    if finished:
+        mask |= FINISHED
+    return mask, bytes(out)
+
+
+class Room:
+    """One authoritative match and the clients playing it"""
+
+    def __init__(self, room_id, seed, duration, size=2):
+        self.id = room_id
+        self.seed = seed
+        self.duration = duration
+        self.clients = []
+        self.size = size
+        self.match = None  # Created once every seat is taken
+        self.state = None  # capture() of the last snapshot sent
+        self.inputs = []  # (snake index, direction) received since the last step
+
+
+class ServerClient:
+    def __init__(self, writer, room, index):
+        self.writer = writer
+        self.room = room
+        self.index = index
+        self.received = 0  # Last input number read
+        self.acked = 0  # Last input number applied by a step
+        self.sent_ack = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.connected = True
+
+    def send(self, message):
+        """Queue a message; never waits, a client that cannot keep up is dropped"""
+        if not self.connected:
+            return
+        if self.writer.transport.get_write_buffer_size() > MAX_SEND_BUFFER:
+            self.connected = False
+            self.writer.close()
+            return
+        data = frame(message)
+        self.writer.write(data)
+        self.bytes_sent += len(data)
+
+
+class SnakeServer:
+    """Authoritative asyncio server running PVP matches at a fixed tick
+
+    Clients are seated two to a Room as they connect; when a room is full
+    its SnakeMatch starts. A client that disconnects before then gives its
+    seat to the next one to connect. Every SIM_STEP the server steps each
+    running match with the direction changes received since the last step,
+    then sends its clients a SNAPSHOT of what that step changed (see
+    encode_delta): the pushed heads and popped tails rather than whole
+    bodies, and scores, power-ups, effect timers and headings only when
+    they changed. The first snapshot of a match is a full one. Steps where
+    nothing changed send nothing, except the input acknowledgement a
+    client's prediction waits for. The payload is built once per room and
+    shared by its clients.
+
+    Sending never waits: writes are queued on the transport, and a client
+    whose queue passes MAX_SEND_BUFFER is disconnected. Step times (the
+    tick's work) are kept in tick_times.
+    """
+
+    def __init__(self, duration=60, room_size=2, step=SIM_STEP, seed=None):
+        self.duration = duration
+        self.room_size = room_size
+        self.step = step
+        self.rng = random.Random(seed)
+        self.rooms = {}  # Running and filling rooms by id
+        self.finished = []  # Rooms whose match ended
+        self.open_room = None
+        self.next_room = 0
+        self.server = None
+        self.port = None
+        self.tick_times = deque(maxlen=10000)
+        self.timestep = FixedTimestep(step, MAX_CATCH_UP_STEPS)
+        self._ticker = None
+
+    async def start(self, host="127.0.0.1", port=PORT):
+        self.server = await asyncio.start_server(self._serve_client, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self._ticker = asyncio.get_running_loop().create_task(self._run_ticks())
+        return self
+
+    async def close(self):
+        if self._ticker is not None:
+            self._ticker.cancel()
+        for room in list(self.rooms.values()):
+            for client in room.clients:
+                client.writer.close()
+        self.server.close()
+        await self.server.wait_closed()
+
+    def _seat(self, writer):
+        room = self.open_room
+        if room is None:
+            room = Room(self.next_room, self.rng.randrange(2 ** 63), self.duration, self.room_size)
+            self.next_room += 1
+            self.rooms[room.id] = room
+            self.open_room = room
+        # The lowest free seat: one left by a client that disconnected before the match started is reused
+        taken = {client.index for client in room.clients}
+        index = min(index for index in range(room.size) if index not in taken)
+        client = ServerClient(writer, room, index)
+        room.clients.append(client)
+        client.send(WELCOME_MESSAGE.pack(WELCOME, room.id, client.index, room.seed, room.duration, self.step))
+        if len(room.clients) == room.size:
+            room.match = SnakeMatch("PVP", room.duration, room.seed, bots={})
+            self.open_room = None
+        return client
+
+    def _unseat(self, client):
+        """Free the seat of a client that left a room still filling, with its inputs"""
+        room = client.room
+        room.clients.remove(client)
+        room.inputs = [entry for entry in room.inputs if entry[0] != client.index]
+
+    async def _serve_client(self, reader, writer):
+        client = None
+        try:
+            message = await read_frame(reader)
+            kind, version = JOIN_MESSAGE.unpack(message)
+            if kind != JOIN or version != PROTOCOL_VERSION:
+                return
+            client = self._seat(writer)
+            while True:
+                message = await read_frame(reader)
+                client.bytes_received += LENGTH.size + len(message)
+                kind, number, direction = INPUT_MESSAGE.unpack(message)
+                if kind == INPUT and number > client.received and direction < len(DIRECTIONS):
+                    client.received = number
+                    client.room.inputs.append((client.index, DIRECTIONS[direction]))
+        except (asyncio.IncompleteReadError, ConnectionError, struct.error):
+            pass
+        finally:
+            if client is not None:
+                client.connected = False
+                if client.room.match is None:
+                    self._unseat(client)
+            writer.close()
+
+    async def _run_ticks(self):
+        timestep = self.timestep
+        timestep.reset()
+        while True:
+            for _ in range(timestep.advance()):
+                start = time.perf_counter()
+                self.tick()
+                self.tick_times.append(time.perf_counter() - start)
+            await asyncio.sleep(max(0.0, self.step - timestep.accumulator))
+
+    def tick(self):
+        """Step every running match once and send its snapshot"""
+        for room in list(self.rooms.values()):
+            match = room.match
+            if match is None:
+                continue
+            if room.state is None:
+                # First snapshot of the match: everything
+                room.state = capture(match)
+                mask, payload = encode_delta(None, room.state, match)
+                for client in room.clients:
+                    client.send(SNAPSHOT_HEADER.pack(SNAPSHOT, 0, 0, mask) + payload)
+
+            inputs, room.inputs = room.inputs, []
+            for client in room.clients:
+                client.acked = client.received
+            match.step(inputs, self.step)
+            state = capture(match)
+            mask, payload = encode_delta(room.state, state, match)
+            room.state = state
+
+            for client in room.clients:
+                if mask or client.acked != client.sent_ack:
+                    client.send(SNAPSHOT_HEADER.pack(SNAPSHOT, match.ticks, client.acked, mask) + payload)
+                    client.sent_ack = client.acked
+
+            if match.finished or not any(client.connected for client in room.clients):
+                del self.rooms[room.id]
+                self.finished.append(room)
+                for client in room.clients:
+                    client.writer.close()  # Sends what is still queued first
+
+
+class MirrorState:
+    """A client's copy of a match, rebuilt from snapshots"""
+
+    def __init__(self, players=2):
+        self.tick = 0
+        self.bodies = [deque() for _ in range(players)]  # Pixel positions, tail first
+        self.directions = ['RIGHT', 'LEFT'][:players]
+        self.scores = [0] * players
+        self.food_pos = None
+        self.flash_powerup_pos = None
+        self.snow_powerup_pos = None
+        self.frozen_until = [0.0] * players  # Match time the effect ends
+        self.boosted_until = [0.0] * players
+        self.last_move_tick = [0] * players
+        self.finished = False
+
+    @property
+    def time(self):
+        return self.tick * SIM_STEP
+
+    def apply(self, tick, mask, payload):
+        """Apply one SNAPSHOT's fields"""
+        self.tick = tick
+        players = len(self.bodies)
+        offset = 0
+        if mask & BODIES:
+            for index, body in enumerate(self.bodies):
+                if mask & FULL:
+                    (count,) = U16.unpack_from(payload, offset)
+                    offset += 2
+                    body.clear()
+                    for _ in range(count):
+                        body.append(unpack_position(U16.unpack_from(payload, offset)[0]))
+                        offset += 2
+                    self.last_move_tick[index] = tick
+                    continue
+                (pushed,) = U8.unpack_from(payload, offset)
+                offset += 1
+                for _ in range(pushed):
+                    body.append(unpack_position(U16.unpack_from(payload, offset)[0]))
+                    offset += 2
+                (popped,) = U8.unpack_from(payload, offset)
+                offset += 1
+                for _ in range(popped):
+                    body.popleft()
+                if pushed:
+                    self.last_move_tick[index] = tick
+        if mask & FOOD:
+            self.food_pos = unpack_position(U16.unpack_from(payload, offset)[0])
+            offset += 2
+        if mask & SCORES:
+            self.scores = list(struct.unpack_from(f"<{players}H", payload, offset))
+            offset += 2 * players
+        if mask & POWERUPS:
+            flash, snow = struct.unpack_from("<HH", payload, offset)
+            offset += 4
+            self.flash_powerup_pos = unpack_position(flash) if flash != NO_POSITION else None
+            self.snow_powerup_pos = unpack_position(snow) if snow != NO_POSITION else None
+        if mask & EFFECTS:
+            for index in range(players):
+                frozen, boosted = struct.unpack_from("<HH", payload, offset)
+                offset += 4
+                self.frozen_until[index] = self.time + frozen / 1000
+                self.boosted_until[index] = self.time + boosted / 1000
+        if mask & HEADINGS:
+            for index in range(players):
+                self.directions[index] = DIRECTIONS[payload[offset]]
+                offset += 1
+        if mask & FINISHED:
+            self.finished = True
+
+
+class SnakeClient:
+    """Loopback-testable client: sends direction changes, mirrors snapshots, predicts its snake
+
+    send_direction() sends an INPUT only when the direction changes and
+    keeps it as pending until a snapshot acknowledges its number. The time
+    from sending to the acknowledgement is the input latency (in latencies).
+    predicted_body() is the snake as it should look now: the last
+    snapshot's body, moved on by the moves that are due since its last move
+    (at the FPS rate, faster while boosted) in the newest pending direction,
+    so a key press shows before the server confirms it. Each snapshot
+    replaces the prediction with the server's state.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.state = MirrorState()
+        self.reader = None
+        self.writer = None
+        self.room = None
+        self.index = None
+        self.seed = None
+        self.duration = None
+        self.input_number = 0
+        self.pending = deque()  # (input number, direction, send time) not acknowledged yet
+        self.snapshot_time = 0.0  # When the last snapshot arrived
+        self.started = asyncio.Event()  # Set by the first snapshot
+        self.done = asyncio.Event()  # Set when the match finished or the connection dropped
+        self.latencies = deque(maxlen=10000)
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.snapshots = 0
+        self._receiver = None
+
+    async def connect(self, host="127.0.0.1", port=PORT):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self._send(JOIN_MESSAGE.pack(JOIN, PROTOCOL_VERSION))
+        message = await read_frame(self.reader)
+        self.bytes_received += LENGTH.size + len(message)
+        _, self.room, self.index, self.seed, self.duration, _ = WELCOME_MESSAGE.unpack(message)
+        self._receiver = asyncio.get_running_loop().create_task(self._receive())
+        return self
+
+    async def close(self):
+        if self._receiver is not None:
+            self._receiver.cancel()
+        if self.writer is not None:
+            self.writer.close()
+
+    def _send(self, message):
+        data = frame(message)
+        self.writer.write(data)
+        self.bytes_sent += len(data)
+
+    def send_direction(self, direction):
+        """Ask the server to turn our snake, if that changes anything"""
+        current = self.pending[-1][1] if self.pending else self.state.directions[self.index]
+        if direction == current or direction == OPPOSITE[current] or self.state.finished:
+            return
+        self.input_number += 1
+        self._send(INPUT_MESSAGE.pack(INPUT, self.input_number, DIRECTIONS.index(direction)))
+        self.pending.append((self.input_number, direction, self.clock()))
+
+    async def _receive(self):
+        try:
+            while True:
+                message = await read_frame(self.reader)
+                self.bytes_received += LENGTH.size + len(message)
+                _, tick, acked, mask = SNAPSHOT_HEADER.unpack_from(message)
+                self.state.apply(tick, mask, message[SNAPSHOT_HEADER.size:])
+                self.snapshots += 1
+                now = self.clock()
+                self.snapshot_time = now
+                while self.pending and self.pending[0][0] <= acked:
+                    self.latencies.append(now - self.pending.popleft()[2])
+                self.started.set()
+                if self.state.finished:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.done.set()
+
+    def server_tick(self):
+        """Estimate of the server's tick now"""
+        return self.state.tick + (self.clock() - self.snapshot_time) / SIM_STEP
+
+    def predicted_body(self, index=None):
+        """Pixel positions of a snake (ours by default) with our pending turns and due moves applied"""
+        if index is None:
+            index = self.index
+        state = self.state
+        body = list(state.bodies[index])
+        if index != self.index or not body or state.finished:
+            return body
+        now = self.server_tick()
+        if now * SIM_STEP < state.frozen_until[index]:
+            return body
+        rate = FPS * (BOOST_MULTIPLIER if now * SIM_STEP < state.boosted_until[index] else 1.0)
+        moves = min(2, int((now - state.last_move_tick[index]) * SIM_STEP * rate + EPSILON))
+        direction = self.pending[-1][1] if self.pending else state.directions[index]
+        for _ in range(moves):
+            x, y = body[-1]
+            body.append(((x + MOVES[direction][0]) % WIDTH, (y + MOVES[direction][1]) % HEIGHT))
+            # Grows when the head overlaps the food, the test the server's pickups query makes
+            # (player 1's rows are 10 px off the food grid, so the positions are never equal)
+            if not overlaps((*body[-1], SNAKE_SIZE, SNAKE_SIZE), (*state.food_pos, SNAKE_SIZE, SNAKE_SIZE)):
+                body.pop(0)
+        return body
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def load_test(clients=200, seconds=10.0, host=None, port=PORT, turns_per_second=2.0, seed=0):
+    """Play seconds-long matches with simulated clients over loopback; returns the measurements
+
+    Without host a server is started in this process on a free port (its
+    step times are then reported too; the clients share its CPU). Every
+    client turns at random about turns_per_second times a second. At the
+    end each client's mirrored match is checked against the server's.
+    """
+    if clients % 2:
+        raise ValueError("clients are seated in pairs, use an even number")
+    server = None
+    if host is None:
+        server = await SnakeServer(seconds, seed=seed).start("127.0.0.1", 0)
+        host, port = "127.0.0.1", server.port
+    rng = random.Random(seed)
+
+    async def play(client):
+        await client.started.wait()
+        while not client.done.is_set():
+            await asyncio.sleep(rng.expovariate(turns_per_second))
+            client.send_direction(rng.choice(DIRECTIONS))
+
+    simulated = [SnakeClient() for _ in range(clients)]
+    started = time.perf_counter()
+    await asyncio.gather(*(client.connect(host, port) for client in simulated))
+    players = [asyncio.get_running_loop().create_task(play(client)) for client in simulated]
+    try:
+        await asyncio.wait_for(asyncio.gather(*(client.done.wait() for client in simulated)), seconds + 30)
+    finally:
+        for task in players:
+            task.cancel()
+        elapsed = time.perf_counter() - started
+        for client in simulated:
+            await client.close()
+
+    result = {
+        'clients': clients,
+        'down_bytes_per_second': sorted(client.bytes_received / elapsed for client in simulated),
+        'up_bytes_per_second': sorted(client.bytes_sent / elapsed for client in simulated),
+        'snapshots_per_second': sum(client.snapshots for client in simulated) / elapsed / clients,
+        'input_latency': sorted(latency for client in simulated for latency in client.latencies),
+        'mismatches': 0
+    }
+    if server is not None:
+        result['tick_times'] = sorted(server.tick_times)
+        result['dropped_time'] = server.timestep.dropped_time
+        rooms = {room.id: room for room in server.finished}
+        for client in simulated:
+            match = rooms[client.room].match
+            if ([list(body) for body in client.state.bodies] != [list(snake.body) for snake in match.snakes]
+                    or client.state.scores != match.scores()):
+                result['mismatches'] += 1
+        await server.close()
+    return result
+
+
+def print_load_test(result):
+    down, up, latency = result['down_bytes_per_second'], result['up_bytes_per_second'], result['input_latency']
+    print(f"{result['clients']} clients, {result['snapshots_per_second']:.1f} snapshots/s each")
+    print(f"  down {sum(down) / len(down):.0f} B/s per client (max {down[-1]:.0f}), "
+          f"up {sum(up) / len(up):.0f} B/s (max {up[-1]:.0f})")
+    print(f"  input to acknowledgement: p50 {1000 * percentile(latency, 0.5):.1f} ms, "
+          f"p95 {1000 * percentile(latency, 0.95):.1f} ms, p99 {1000 * percentile(latency, 0.99):.1f} ms")
+    if 'tick_times' in result:
+        ticks = result['tick_times']
+        print(f"  server tick: mean {1000 * sum(ticks) / len(ticks):.3f} ms, p99 {1000 * percentile(ticks, 0.99):.3f} ms, "
+              f"max {1000 * ticks[-1]:.3f} ms, {result['dropped_time']:.2f} s dropped")
+        print(f"  {result['mismatches']} clients ended with a different match than the server")
+
+
+async def play_online(host="127.0.0.1", port=PORT):
+    """Play a networked PVP match in a window: arrows or WASD steer your snake, Esc quits"""
+    import pygame
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Python Chaser Online")
+    font = pygame.font.Font(None, 35)
+    colors = [(255, 0, 0), (0, 0, 255)]
+    controls = {pygame.K_UP: 'UP', pygame.K_DOWN: 'DOWN', pygame.K_LEFT: 'LEFT', pygame.K_RIGHT: 'RIGHT',
+                pygame.K_w: 'UP', pygame.K_s: 'DOWN', pygame.K_a: 'LEFT', pygame.K_d: 'RIGHT'}
+
+    client = await SnakeClient().connect(host, port)
+    running = True
+    while running and not client.done.is_set():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key in controls and client.started.is_set():
+                client.send_direction(controls[event.key])
+
+        screen.fill((0, 0, 0))
+        state = client.state
+        if not client.started.is_set():
+            text = font.render(f"Waiting for an opponent (you are player {client.index + 1})", True, (255, 255, 255))
+            screen.blit(text, (40, HEIGHT // 2))
+        else:
+            if state.flash_powerup_pos is not None:
+                pygame.draw.rect(screen, (255, 200, 0), (*state.flash_powerup_pos, 60, 60))
+            if state.snow_powerup_pos is not None:
+                pygame.draw.rect(screen, (150, 220, 255), (*state.snow_powerup_pos, 60, 60))
+            pygame.draw.rect(screen, (0, 255, 0), (*state.food_pos, 20, 20))
+            for index, color in enumerate(colors):
+                body = client.predicted_body(index)
+                for i, (x, y) in enumerate(body):
+                    pygame.draw.rect(screen, (255, 255, 255) if i == len(body) - 1 else color, (x, y, 20, 20))
+            left = max(0, int(client.duration - state.time))
+            hud = f"P1: {state.scores[0]}   P2: {state.scores[1]}   Time: {left}s   (you are P{client.index + 1})"
+            screen.blit(font.render(hud, True, (255, 255, 255)), (10, 10))
+        pygame.display.flip()
+        await asyncio.sleep(1 / 60)
+
+    await client.close()
+    pygame.quit()
+    return client.state.scores
+
+
+async def serve(host, port, duration):
+    server = await SnakeServer(duration).start(host, port)
+    print(f"Serving PVP matches of {duration:g} s on {host}:{server.port}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Networked PVP: authoritative server, client and load tester")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="run the match server")
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=PORT)
+    serve_parser.add_argument("--duration", type=float, default=60, help="match length in seconds")
+    play_parser = commands.add_parser("play", help="join a server in a window")
+    play_parser.add_argument("host", nargs="?", default="127.0.0.1")
+    play_parser.add_argument("--port", type=int, default=PORT)
+    load_parser = commands.add_parser("loadtest", help="measure bandwidth and latency with simulated clients")
+    load_parser.add_argument("--clients", type=int, default=200)
+    load_parser.add_argument("--seconds", type=float, default=10, help="match length in seconds")
+    load_parser.add_argument("--host", help="test a running server instead of one started here")
+    load_parser.add_argument("--port", type=int, default=PORT)
+    load_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        asyncio.run(serve(args.host, args.port, args.duration))
+    elif args.command == "play":
+        print(asyncio.run(play_online(args.host, args.port)))
+    else:
+        print_load_test(asyncio.run(load_test(args.clients, args.seconds, args.host, args.port, seed=args.seed)))
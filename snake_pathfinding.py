@@ -0,0 +1,513 @@
+import copy
+import heapq
+import random
+
+# Snake settings (must match the games)
+SNAKE_SIZE = 20
+
+# Possible moves: up, right, down, left
+DIRECTIONS = [
+    (0, -1),  # up
+    (1, 0),   # right
+    (0, 1),   # down
+    (-1, 0)   # left
+]
+
+# Node expansion counters, used to compare planning modes
+search_stats = {
+    'searches': 0,
+    'expansions': 0,
+    'last_expansions': 0
+}
+
+def reset_search_stats():
+    for key in search_stats:
+        search_stats[key] = 0
+
+def expansions_per_search():
+    """Average number of expanded nodes per search since the last reset"""
+    if search_stats['searches'] == 0:
+        return 0.0
+    return search_stats['expansions'] / search_stats['searches']
+
+
+class SearchGrid:
+    """Flat, integer-indexed grid with precomputed tables reused by every search
+
+    Cell (x, y) is stored at index y * width + x. The score/parent arrays are
+    allocated once per grid size and "cleared" by bumping a generation counter,
+    so a search never pays for the cells it does not touch.
+
+    With wrap=True the grid is a torus, matching the games' screen wrap:
+    neighbors cross the edges and the heuristic uses the shorter way around.
+    """
+
+    def __init__(self, width, height, wrap=False):
+        self.width = width
+        self.height = height
+        self.wrap = wrap
+        self.size = width * height
+
+        # Coordinates of each cell index (avoids divmod in the inner loop)
+        self.cell_x = [i % width for i in range(self.size)]
+        self.cell_y = [i // width for i in range(self.size)]
+
+        # neighbors[i] is a tuple of (neighbor index, direction index) pairs
+        self.neighbors = []
+        for y in range(height):
+            for x in range(width):
+                cell_neighbors = []
+                for d, (dx, dy) in enumerate(DIRECTIONS):
+                    nx, ny = x + dx, y + dy
+                    if wrap:
+                        nx %= width
+                        ny %= height
+                    if 0 <= nx < width and 0 <= ny < height:
+                        cell_neighbors.append((ny * width + nx, d))
+                self.neighbors.append(tuple(cell_neighbors))
+
+        # Per-search scratch space
+        self.g_score = [0] * self.size
+        self.parent = [-1] * self.size
+        self.seen = [0] * self.size  # generation in which g_score/parent were set
+        self.closed = [0] * self.size  # generation in which the cell was expanded
+        self.generation = 0
+
+        # Reusable obstacle buffer for callers that pass pixel coordinates
+        self.blocked = bytearray(self.size)
+
+    def index(self, x, y):
+        return y * self.width + x
+
+    def direction_to(self, cell, neighbor):
+        """Direction index of the move from cell to an adjacent cell, or None"""
+        for other, d in self.neighbors[cell]:
+            if other == neighbor:
+                return d
+        return None
+
+    def fork(self):
+        """New grid sharing the static tables but with its own search scratch space"""
+        grid = copy.copy(self)
+        grid.g_score = [0] * self.size
+        grid.parent = [-1] * self.size
+        grid.seen = [0] * self.size
+        grid.closed = [0] * self.size
+        grid.generation = 0
+        grid.blocked = bytearray(self.size)
+        return grid
+
+    def heuristic(self, cell, goal):
+        """Manhattan distance between two cell indices (toroidal when wrapping)"""
+        dx = abs(self.cell_x[cell] - self.cell_x[goal])
+        dy = abs(self.cell_y[cell] - self.cell_y[goal])
+        if self.wrap:
+            dx = min(dx, self.width - dx)
+            dy = min(dy, self.height - dy)
+        return dx + dy
+
+
+class OccupancyGrid:
+    """Per-cell counters of snake segments, kept up to date as the snakes move
+
+    game_loop calls add() for every new head and remove() for every popped
+    tail, so the grid is always the current answer to "is this cell
+    occupied" without rebuilding lists or sets. Counters (rather than flags)
+    let snakes overlap without losing track of a cell.
+
+    Planners that cache results register themselves in watchers and are told
+    about every change through cell_blocked/cell_freed/cells_reset.
+    """
+
+    def __init__(self, grid_width, grid_height):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.counts = bytearray(grid_width * grid_height)
+        self.watchers = []
+
+    def cell(self, pos):
+        """Flat cell index of a pixel position"""
+        return (pos[1] // SNAKE_SIZE) * self.grid_width + pos[0] // SNAKE_SIZE
+
+    def add(self, pos):
+        cell = self.cell(pos)
+        self.counts[cell] += 1
+        for watcher in self.watchers:
+            watcher.cell_blocked(cell)
+
+    def remove(self, pos):
+        cell = self.cell(pos)
+        if self.counts[cell]:
+            self.counts[cell] -= 1
+            for watcher in self.watchers:
+                watcher.cell_freed(cell)
+
+    def reset(self, positions):
+        """Replace the whole grid with the given pixel positions"""
+        counts = self.counts
+        for i in range(len(counts)):
+            counts[i] = 0
+        for pos in positions:
+            counts[self.cell(pos)] += 1
+        for watcher in self.watchers:
+            watcher.cells_reset()
+
+    def is_occupied(self, pos):
+        return self.counts[self.cell(pos)] != 0
+
+
+_grids = {}
+
+def get_search_grid(grid_width, grid_height, wrap=False):
+    """Return the cached SearchGrid for the given board size and edge mode"""
+    key = (grid_width, grid_height, wrap)
+    grid = _grids.get(key)
+    if grid is None:
+        grid = SearchGrid(grid_width, grid_height, wrap)
+        _grids[key] = grid
+    return grid
+
+def search(grid, start, goal, blocked, stats=search_stats):
+    """A* from start to goal over cell indices
+
+    blocked is a bytearray (or any indexable) where a non-zero entry marks an
+    occupied cell. Returns True if the goal was reached; the route is then
+    left in grid.parent as parent pointers from goal back to start. The
+    search is counted in stats (search_stats unless given).
+    """
+    if blocked[goal]:
+        # An occupied goal can never be entered, don't flood the whole grid
+        _record_search(0, stats)
+        return False
+
+    grid.generation += 1
+    generation = grid.generation
+    neighbors = grid.neighbors
+    g_score = grid.g_score
+    parent = grid.parent
+    seen = grid.seen
+    closed = grid.closed
+    heuristic = grid.heuristic
+
+    g_score[start] = 0
+    parent[start] = -1
+    seen[start] = generation
+
+    # Open list entries are (f, h, cell); stale entries are skipped on pop
+    open_list = [(heuristic(start, goal), 0, start)]
+    expansions = 0
+
+    while open_list:
+        _, _, current = heapq.heappop(open_list)
+
+        if closed[current] == generation:
+            continue
+        closed[current] = generation
+
+        if current == goal:
+            _record_search(expansions, stats)
+            return True
+
+        next_g = g_score[current] + 1
+        for neighbor, _ in neighbors[current]:
+            if blocked[neighbor] or closed[neighbor] == generation:
+                continue
+            # Only push if this is the best route found so far to the neighbor
+            if seen[neighbor] == generation and g_score[neighbor] <= next_g:
+                continue
+            seen[neighbor] = generation
+            g_score[neighbor] = next_g
+            parent[neighbor] = current
+            h = heuristic(neighbor, goal)
+            heapq.heappush(open_list, (next_g + h, h, neighbor))
+        expansions += 1
+
+    _record_search(expansions, stats)
+    return False
+
+def find_first_step(grid, start, goal, blocked):
+    """Direction index of the first step from start towards goal, or None if unreachable"""
+    if not search(grid, start, goal, blocked):
+        return None
+
+    # Walk the parent pointers back to the cell right after start
+    parent = grid.parent
+    step = goal
+    while parent[step] != start:
+        step = parent[step]
+    return grid.direction_to(start, step)
+
+def find_path(grid, start, goal, blocked, stats=search_stats):
+    """Cells from goal back to the first step (start excluded), or None if unreachable
+
+    The list is reversed so the next step can be consumed with pop().
+    """
+    if not search(grid, start, goal, blocked, stats):
+        return None
+
+    parent = grid.parent
+    path = []
+    step = goal
+    while step != start:
+        path.append(step)
+        step = parent[step]
+    return path
+
+def _record_search(expansions, stats=search_stats):
+    stats['searches'] += 1
+    stats['expansions'] += expansions
+    stats['last_expansions'] = expansions
+
+def merge_search_stats(stats):
+    """Add counts kept in a separate stats dict (e.g. by a worker) to search_stats"""
+    search_stats['searches'] += stats['searches']
+    search_stats['expansions'] += stats['expansions']
+    if stats['searches']:
+        search_stats['last_expansions'] = stats['last_expansions']
+
+def random_free_move(grid, start, blocked, rng=random):
+    """Move from start in a random unblocked direction, or up if completely stuck"""
+    options = list(grid.neighbors[start])
+    rng.shuffle(options)
+    for neighbor, d in options:
+        if not blocked[neighbor]:
+            return (DIRECTIONS[d][0] * SNAKE_SIZE, DIRECTIONS[d][1] * SNAKE_SIZE)
+
+    # If completely stuck, just try to go up
+    return (0, -SNAKE_SIZE)
+
+# Bot pathfinding using A* with parent pointers over a flat grid
+def find_path_to_food(snake_head, food_pos, obstacles, grid_width, grid_height, wrap=False):
+    grid = get_search_grid(grid_width, grid_height, wrap)
+
+    # Convert positions to grid coordinates
+    start = grid.index(snake_head[0] // SNAKE_SIZE, snake_head[1] // SNAKE_SIZE)
+    goal = grid.index(food_pos[0] // SNAKE_SIZE, food_pos[1] // SNAKE_SIZE)
+
+    # Mark obstacles (snake bodies) in the shared buffer
+    blocked = grid.blocked
+    marked = []
+    for pos in obstacles:
+        cell = grid.index(pos[0] // SNAKE_SIZE, pos[1] // SNAKE_SIZE)
+        if not blocked[cell]:
+            blocked[cell] = 1
+            marked.append(cell)
+
+    try:
+        if start == goal:
+            # Already on the food, move in any valid direction
+            for neighbor, d in grid.neighbors[start]:
+                if not blocked[neighbor]:
+                    return (DIRECTIONS[d][0] * SNAKE_SIZE, DIRECTIONS[d][1] * SNAKE_SIZE)
+        else:
+            d = find_first_step(grid, start, goal, blocked)
+            if d is not None:
+                return (DIRECTIONS[d][0] * SNAKE_SIZE, DIRECTIONS[d][1] * SNAKE_SIZE)
+
+        # If no path found, move in a random valid direction
+        return random_free_move(grid, start, blocked)
+    finally:
+        # Reset only the cells we marked so the buffer is clean for next time
+        for cell in marked:
+            blocked[cell] = 0
+
+
+class BotPlanner:
+    """Persistent planner for one bot that repairs its last plan between decisions
+
+    Obstacles come from an OccupancyGrid that is updated as the snakes move,
+    instead of being rebuilt for every decision; the planner watches it to
+    notice new obstacles. As long as the food has not moved and no new one lands on
+    the remaining plan, a decision is just a lookup of the next planned cell.
+    When an obstacle does cut the plan, only the broken part is re-searched
+    (from the head to the first intact cell past the cut) and spliced back in.
+    """
+
+    def __init__(self, grid_width, grid_height, wrap=False, occupancy=None, rng=random):
+        self.rng = rng  # source of the random fallback moves
+        # Own scratch space, so the last search tree is not clobbered by other planners
+        self.grid = get_search_grid(grid_width, grid_height, wrap).fork()
+        if occupancy is None:
+            occupancy = OccupancyGrid(grid_width, grid_height)
+        self.occupancy = occupancy
+        self.blocked = occupancy.counts  # read directly, never copied
+        occupancy.watchers.append(self)
+        self.on_plan = bytearray(self.grid.size)  # 1 if the cell is on the current plan
+        self.plan = []  # remaining cells, goal first and next step last
+        self.goal = None
+        self.cut_cells = []  # plan cells that became occupied since the last decision
+        self.plan_reset = False  # every obstacle changed, the plan must be checked
+
+        self.stats = {
+            'decisions': 0,
+            'lookups': 0,
+            'repairs': 0,
+            'replans': 0
+        }
+
+    def cell(self, pos):
+        """Cell index of a pixel position"""
+        return self.grid.index(pos[0] // SNAKE_SIZE, pos[1] // SNAKE_SIZE)
+
+    # OccupancyGrid watcher callbacks
+    def cell_blocked(self, cell):
+        if self.on_plan[cell]:
+            self.cut_cells.append(cell)
+
+    def cell_freed(self, cell):
+        pass  # a freed cell never invalidates the plan
+
+    def cells_reset(self):
+        self.plan_reset = True
+
+    def _plan_broken(self):
+        """True if an obstacle landed on a cell the plan still has to visit"""
+        if self.plan_reset:
+            return True
+        for cell in self.cut_cells:
+            if self.on_plan[cell] and self.blocked[cell]:
+                return True
+        # Only cells we already passed (e.g. our own new head) were hit
+        self.cut_cells.clear()
+        return False
+
+    def needs_search(self, food_pos):
+        """True if the next decision has to search: the food moved, there is no plan, or it was cut"""
+        return self.cell(food_pos) != self.goal or not self.plan or self._plan_broken()
+
+    def _set_plan(self, plan):
+        for cell in self.plan:
+            self.on_plan[cell] = 0
+        self.plan = plan if plan is not None else []
+        for cell in self.plan:
+            self.on_plan[cell] = 1
+        self.cut_cells.clear()
+        self.plan_reset = False
+
+    def _replan(self, start):
+        self.stats['replans'] += 1
+        self._set_plan(find_path(self.grid, start, self.goal, self.blocked))
+
+    def _repair(self, start):
+        """Re-search only the broken part of the plan and splice it onto the intact tail"""
+        plan = self.plan
+        blocked = self.blocked
+
+        # The blocked cell closest to the goal decides where we can rejoin the plan
+        cut = None
+        for i, cell in enumerate(plan):
+            if blocked[cell]:
+                cut = i
+                break
+
+        if cut is None:
+            self.cut_cells.clear()
+            self.plan_reset = False
+            return
+        if cut == 0:
+            # The goal itself is blocked, nothing to rejoin
+            self._replan(start)
+            return
+
+        rejoin = plan[cut - 1]
+        detour = find_path(self.grid, start, rejoin, blocked)
+        if detour is None:
+            self._replan(start)
+            return
+
+        self.stats['repairs'] += 1
+        # detour already ends with rejoin at index 0, so drop it from the tail part
+        self._set_plan(plan[:cut - 1] + detour)
+
+    def next_move(self, snake_head, food_pos):
+        """Next move for the bot, with the same return contract as find_path_to_food"""
+        self.stats['decisions'] += 1
+        grid = self.grid
+        start = self.cell(snake_head)
+        goal = self.cell(food_pos)
+
+        # Drop the cells the head has already reached
+        plan = self.plan
+        while plan and plan[-1] == start:
+            self.on_plan[plan.pop()] = 0
+
+        if start != goal:
+            if goal != self.goal:
+                # Food respawned, the old plan is useless
+                self.goal = goal
+                self._replan(start)
+            elif not plan or grid.direction_to(start, plan[-1]) is None:
+                # Snake left the plan (or we never had one)
+                self._replan(start)
+            elif self._plan_broken():
+                self._repair(start)
+            else:
+                self.stats['lookups'] += 1
+
+            if self.plan:
+                d = grid.direction_to(start, self.plan[-1])
+                if d is not None:
+                    return (DIRECTIONS[d][0] * SNAKE_SIZE, DIRECTIONS[d][1] * SNAKE_SIZE)
+        else:
+            # Already on the food, move in any valid direction
+            for neighbor, d in grid.neighbors[start]:
+                if not self.blocked[neighbor]:
+                    return (DIRECTIONS[d][0] * SNAKE_SIZE, DIRECTIONS[d][1] * SNAKE_SIZE)
+
+        # If no path found, move in a random valid direction
+        return random_free_move(grid, start, self.blocked, self.rng)
+
+
+class SearchBot:
+    """Bot without memory: a fresh A* search for every decision
+
+    This is what find_path_to_food does, but reading an OccupancyGrid like
+    the other planners, so it can be compared with them in SnakeMatch.
+    """
+
+    def __init__(self, grid_width, grid_height, wrap=False, occupancy=None, rng=random):
+        self.rng = rng
+        self.grid = get_search_grid(grid_width, grid_height, wrap).fork()
+        if occupancy is None:
+            occupancy = OccupancyGrid(grid_width, grid_height)
+        self.occupancy = occupancy
+        self.stats = {'decisions': 0}
+
+    def next_move(self, snake_head, food_pos):
+        self.stats['decisions'] += 1
+        grid = self.grid
+        blocked = self.occupancy.counts
+        start = self.occupancy.cell(snake_head)
+        goal = self.occupancy.cell(food_pos)
+
+        if start == goal:
+            # Already on the food, move in any valid direction
+            for neighbor, d in grid.neighbors[start]:
+                if not blocked[neighbor]:
+                    return (DIRECTIONS[d][0] * SNAKE_SIZE, DIRECTIONS[d][1] * SNAKE_SIZE)
+        else:
+            d = find_first_step(grid, start, goal, blocked)
+            if d is not None:
+                return (DIRECTIONS[d][0] * SNAKE_SIZE, DIRECTIONS[d][1] * SNAKE_SIZE)
+
+        # If no path found, move in a random valid direction
+        return random_free_move(grid, start, blocked, self.rng)
+
+
+if __name__ == "__main__":
+    # Compare node expansions with and without screen wrap on random boards
+    grid_width, grid_height = 40, 30
+    rng = random.Random(0)
+    scenarios = []
+    for _ in range(500):
+        obstacles = [(rng.randrange(grid_width) * SNAKE_SIZE, rng.randrange(grid_height) * SNAKE_SIZE)
+                     for _ in range(60)]
+        head = (rng.randrange(grid_width) * SNAKE_SIZE, rng.randrange(grid_height) * SNAKE_SIZE)
+        food = (rng.randrange(grid_width) * SNAKE_SIZE, rng.randrange(grid_height) * SNAKE_SIZE)
+        scenarios.append((head, food, [pos for pos in obstacles if pos != head]))
+
+    for wrap in (False, True):
+        reset_search_stats()
+        for head, food, obstacles in scenarios:
+            find_path_to_food(head, food, obstacles, grid_width, grid_height, wrap)
+        print(f"wrap={wrap}: {expansions_per_search():.1f} expanded nodes per decision")
@@ -0,0 +1,95 @@
+import pygame
+
+SNAKE_SIZE = 20
+WHITE = (255, 255, 255)
+
+
+class SnakeSprites:
+    """Pre-rendered square sprites for snake blocks, one per color
+
+    draw_snake used to call pygame.draw.rect once per segment from a Python
+    loop. Here each color is filled into a SNAKE_SIZE square once,
+    converted to the display format (so blitting it needs no pixel
+    conversion), and a whole snake is drawn with one Surface.blits call
+    (fblits where pygame has it). The player colors (red, blue, the yellow
+    bot) are just different variants of the same sprite.
+    """
+
+    def __init__(self, size=SNAKE_SIZE):
+        self.size = size
+        self.sprites = {}
+
+    def sprite(self, color):
+        """The block sprite for color, made on first use"""
+        sprite = self.sprites.get(color)
+        if sprite is None:
+            sprite = pygame.Surface((self.size, self.size))
+            sprite.fill(color)
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert()
+            self.sprites[color] = sprite
+        return sprite
+
+    def variant(self, color, head_color=WHITE):
+        """(segment, head) sprites for a snake of the given color"""
+        return self.sprite(color), self.sprite(head_color)
+
+    def blit_sequence(self, blocks, color, head_color=WHITE):
+        """(sprite, position) pairs for blits(), tail first, head last"""
+        segment, head = self.variant(color, head_color)
+        sequence = [(segment, block) for block in blocks]
+        if sequence:
+            sequence[-1] = (head, sequence[-1][1])
+        return sequence
+
+    def draw(self, surface, blocks, color, head_color=WHITE):
+        """Draw a snake (tail first, head last) with one batched blit"""
+        sequence = self.blit_sequence(blocks, color, head_color)
+        if hasattr(surface, 'fblits'):
+            surface.fblits(sequence)
+        else:
+            surface.blits(sequence, doreturn=False)
+
+
+# One set of sprites shared by the screens and the renderer
+shared_sprites = SnakeSprites()
+
+
+if __name__ == "__main__":
+    import os
+    import time
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+
+    def draw_rects(blocks, color, size):
+        # The old draw_snake
+        for i, block in enumerate(blocks):
+            if i == len(blocks) - 1:
+                pygame.draw.rect(screen, WHITE, [block[0], block[1], size, size])
+            else:
+                pygame.draw.rect(screen, color, [block[0], block[1], size, size])
+
+    # Per-rect drawing against batched sprites, for a few snake lengths and
+    # counts. 1px blocks leave only the per-segment call overhead; at full
+    # size the pixel copying counts too, which depends on the video driver.
+    colors = [(255, 0, 0), (0, 0, 255), (255, 255, 0)]
+    frames = 50
+    for size in (SNAKE_SIZE, 1):
+        sprites = SnakeSprites(size)
+        print(f"{size}px blocks")
+        print(f"{'snakes':>7}{'length':>8}{'rects ms':>10}{'sprites ms':>12}{'speedup':>9}")
+        for count, length in [(2, 10), (2, 100), (2, 1000), (20, 100), (20, 1000)]:
+            snakes = [[((i * 20 + s * 40) % 800, (i * 20 // 800 * 20 + s * 60) % 600) for i in range(length)]
+                      for s in range(count)]
+            timings = []
+            for draw in (lambda blocks, color: draw_rects(blocks, color, size),
+                         lambda blocks, color: sprites.draw(screen, blocks, color)):
+                start = time.perf_counter()
+                for _ in range(frames):
+                    for s, blocks in enumerate(snakes):
+                        draw(blocks, colors[s % len(colors)])
+                timings.append(1000 * (time.perf_counter() - start) / frames)
+            print(f"{count:>7}{length:>8}{timings[0]:>10.3f}{timings[1]:>12.3f}{timings[0] / timings[1]:>8.1f}x")
+    pygame.quit()
@@ -0,0 +1,114 @@
+def overlaps(a, b):
+    """True if two (x, y, width, height) footprints overlap, half-open as in SpatialHash"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+
+class SpatialHash:
+    """Uniform grid spatial hash of rectangular entities
+
+    The board is divided into cell_size squares; every cell lists the
+    entities whose footprint (x, y, width, height in pixels) covers part of
+    it, so finding what lies under a snake head only looks at the one to
+    four cells the head touches, however many entities there are.
+    insert() and remove() update just the cells of that entity's footprint,
+    so spawning and despawning costs O(footprint), never a rebuild.
+
+    Entities can be any hashable object; the footprint is kept here.
+    Footprints are half-open rectangles: x <= px < x + width.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}  # (cell x, cell y) -> list of entities covering it
+        self.footprints = {}  # entity -> (x, y, width, height)
+
+    def cells_of(self, x, y, width, height):
+        """The (cell x, cell y) keys a rectangle covers"""
+        size = self.cell_size
+        return [(cx, cy)
+                for cy in range(y // size, (y + height - 1) // size + 1)
+                for cx in range(x // size, (x + width - 1) // size + 1)]
+
+    def insert(self, entity, x, y, width, height):
+        if entity in self.footprints:
+            self.remove(entity)
+        self.footprints[entity] = (x, y, width, height)
+        for cell in self.cells_of(x, y, width, height):
+            self.cells.setdefault(cell, []).append(entity)
+
+    def remove(self, entity):
+        footprint = self.footprints.pop(entity, None)
+        if footprint is None:
+            return
+        for cell in self.cells_of(*footprint):
+            entities = self.cells[cell]
+            entities.remove(entity)
+            if not entities:
+                del self.cells[cell]
+
+    def query(self, x, y, width, height):
+        """Entities whose footprint overlaps the rectangle (see at() for a point)"""
+        size = self.cell_size
+        right, bottom = x + width, y + height
+        rect = (x, y, width, height)
+        found = []
+        for cy in range(y // size, (bottom - 1) // size + 1):
+            for cx in range(x // size, (right - 1) // size + 1):
+                entities = self.cells.get((cx, cy))
+                if not entities:
+                    continue
+                for entity in entities:
+                    if overlaps(self.footprints[entity], rect) and entity not in found:
+                        found.append(entity)
+        return found
+
+    def at(self, x, y):
+        """Entities covering the point, from a single cell"""
+        entities = self.cells.get((x // self.cell_size, y // self.cell_size))
+        if not entities:
+            return []
+        found = []
+        for entity in entities:
+            ex, ey, ew, eh = self.footprints[entity]
+            if ex <= x < ex + ew and ey <= y < ey + eh:
+                found.append(entity)
+        return found
+
+    def __contains__(self, entity):
+        return entity in self.footprints
+
+    def __len__(self):
+        return len(self.footprints)
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    # Head-cell queries against a growing number of pickups: checking every
+    # pickup (as the game used to) against looking up the hashed cells
+    WIDTH, HEIGHT, SNAKE_SIZE = 800, 600, 20
+    rng = random.Random(0)
+    heads = [(rng.randrange(WIDTH // SNAKE_SIZE) * SNAKE_SIZE, rng.randrange(HEIGHT // SNAKE_SIZE) * SNAKE_SIZE + 10)
+             for _ in range(20000)]
+    print(f"{'pickups':>8}{'scan us':>10}{'hash us':>10}{'speedup':>9}")
+    for count in (3, 10, 100, 1000):
+        pickups = []
+        index = SpatialHash(SNAKE_SIZE)
+        for i in range(count):
+            size = SNAKE_SIZE * (3 if i % 3 else 1)  # foods and 3x3 power-ups
+            pickup = (rng.randrange(WIDTH // size) * size, rng.randrange(HEIGHT // size) * size, size, i)
+            pickups.append(pickup)
+            index.insert(pickup, pickup[0], pickup[1], size, size)
+
+        start = time.perf_counter()
+        scanned = [[p for p in pickups if p[0] - SNAKE_SIZE < x < p[0] + p[2] and p[1] - SNAKE_SIZE < y < p[1] + p[2]]
+                   for x, y in heads]
+        scan = time.perf_counter() - start
+        start = time.perf_counter()
+        hashed = [index.query(x, y, SNAKE_SIZE, SNAKE_SIZE) for x, y in heads]
+        hashing = time.perf_counter() - start
+        assert [sorted(a) for a in scanned] == [sorted(b) for b in hashed]
+        print(f"{count:>8}{1e6 * scan / len(heads):>10.2f}{1e6 * hashing / len(heads):>10.2f}{scan / hashing:>8.1f}x")
@@ -0,0 +1,53 @@
+from collections import OrderedDict
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces
+
+    font.render rasterizes the glyphs every call, but the HUD draws the same
+    few strings ("Player 1: 3", "Time Left: 42s", "FROZEN!") every frame and
+    they only change about once a second. Surfaces are keyed by (font, text,
+    color, antialias, background); once a string has been drawn, drawing it
+    again is a dict lookup. The least recently used surfaces are dropped
+    beyond maxsize, so a counting timer cannot grow the cache forever.
+
+    Surfaces are shared between callers: blit them, never draw on them.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True, background=None):
+        key = (font, text, tuple(color), antialias, None if background is None else tuple(background))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        if background is None:
+            surface = font.render(text, antialias, color)
+        else:
+            surface = font.render(text, antialias, color, background)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.maxsize:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+
+# One cache shared by the game screens and the dirty-rect renderer
+shared_cache = TextCache()